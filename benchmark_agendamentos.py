@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark de gravação concorrente de agendamentos
+
+Vários terminais (threads) tentam agendar, ao mesmo tempo, os mesmos
+horários dos mesmos barbeiros. Mede a vazão e confere que o servidor
+recusou (409) todas as sobreposições, sem nenhum conflito gravado.
+
+Uso (com o servidor rodando, de preferência em modo de produção):
+    python server.py --producao --workers 4
+    python benchmark_agendamentos.py --escritores 32 --tentativas 50
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+import requests
+
+SERVER_URL = "http://localhost:5000"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de agendamentos concorrentes")
+    parser.add_argument("--url", default=SERVER_URL, help=f"URL do servidor (padrão: {SERVER_URL})")
+    parser.add_argument("--escritores", type=int, default=32, help="Threads gravando ao mesmo tempo")
+    parser.add_argument("--tentativas", type=int, default=50, help="Agendamentos tentados por thread")
+    parser.add_argument("--funcionarios", type=int, default=3, help="Barbeiros disputados")
+    parser.add_argument("--dia", default=None,
+                        help="Dia usado (AAAA-MM-DD; padrão: daqui a um ano, para não misturar com dados reais)")
+    return parser.parse_args()
+
+
+def _criar_funcionarios(url: str, quantidade: int) -> list:
+    """Cria os barbeiros usados no teste e retorna seus IDs"""
+    ids = []
+    for i in range(quantidade):
+        response = requests.post(f"{url}/api/funcionarios", json={
+            'nome': f"Benchmark {i + 1}", 'telefone': '', 'email': '', 'cargo': 'Barbeiro', 'ativo': True
+        }, timeout=10)
+        response.raise_for_status()
+        ids.append(response.json()['funcionario']['id'])
+    return ids
+
+
+def _escritor(url: str, funcionarios: list, dia: datetime, tentativas: int,
+              resultados: Counter, latencias: list, lock: threading.Lock):
+    """Thread que tenta gravar agendamentos de 30 minutos em horários aleatórios"""
+    sessao = requests.Session()
+    for _ in range(tentativas):
+        inicio = dia + timedelta(minutes=15 * random.randrange(0, 40))
+        fim = inicio + timedelta(minutes=30)
+        agendamento = {
+            'cliente_id': 1, 'funcionario_id': random.choice(funcionarios), 'servico_id': 1,
+            'data_agendamento': inicio.isoformat(), 'horario_inicio': inicio.isoformat(),
+            'horario_fim': fim.isoformat(), 'status': 'agendado', 'valor_total': 0.0,
+            'observacoes': 'benchmark'
+        }
+        antes = time.perf_counter()
+        try:
+            status = sessao.post(f"{url}/api/agendamentos", json=agendamento, timeout=30).status_code
+        except requests.RequestException:
+            status = 'erro de conexão'
+        duracao = time.perf_counter() - antes
+        with lock:
+            resultados[status] += 1
+            latencias.append(duracao)
+
+
+def _contar_sobreposicoes(url: str, funcionarios: list, dia: datetime) -> int:
+    """Conta pares de agendamentos gravados que se sobrepõem"""
+    sobreposicoes = 0
+    for funcionario_id in funcionarios:
+        response = requests.get(f"{url}/api/agendamentos", params={
+            'funcionario_id': funcionario_id,
+            'data_inicio': dia.date().isoformat(), 'data_fim': dia.date().isoformat()
+        }, timeout=30)
+        response.raise_for_status()
+        intervalos = sorted(
+            (datetime.fromisoformat(a['horario_inicio']), datetime.fromisoformat(a['horario_fim']))
+            for a in response.json() if a['status'] not in ('cancelado', 'concluido')
+        )
+        for anterior, atual in zip(intervalos, intervalos[1:]):
+            if atual[0] < anterior[1]:
+                sobreposicoes += 1
+    return sobreposicoes
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.dia:
+        dia = datetime.fromisoformat(args.dia)
+    else:
+        dia = datetime.combine(datetime.now().date() + timedelta(days=365), datetime.min.time())
+    dia = dia.replace(hour=8)
+
+    funcionarios = _criar_funcionarios(args.url, args.funcionarios)
+    print(f"{args.escritores} escritores x {args.tentativas} tentativas, "
+          f"{args.funcionarios} barbeiros, dia {dia.date().isoformat()}")
+
+    resultados: Counter = Counter()
+    latencias: list = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_escritor, args=(args.url, funcionarios, dia, args.tentativas,
+                                                 resultados, latencias, lock))
+        for _ in range(args.escritores)
+    ]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    requisicoes = len(latencias)
+    print(f"Requisições: {requisicoes} em {total:.2f}s ({requisicoes / total:.0f}/s, "
+          f"{requisicoes / total * 60:.0f}/min)")
+    if latencias:
+        print(f"Latência: mediana {latencias[requisicoes // 2] * 1000:.1f} ms, "
+              f"p95 {latencias[int(requisicoes * 0.95)] * 1000:.1f} ms, "
+              f"máx {latencias[-1] * 1000:.1f} ms")
+    print(f"Gravados (201): {resultados[201]}  Conflitos (409): {resultados[409]}  "
+          f"Outros: {requisicoes - resultados[201] - resultados[409]}")
+
+    sobreposicoes = _contar_sobreposicoes(args.url, funcionarios, dia)
+    if sobreposicoes:
+        print(f"FALHA: {sobreposicoes} agendamentos sobrepostos gravados")
+        raise SystemExit(1)
+    print("OK: nenhum agendamento sobreposto")
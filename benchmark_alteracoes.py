@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Verificação do envio só do que mudou (save_* com rastreamento de alterações)
+
+Carrega 5.000 clientes no cache do ApiClient como se viessem do servidor
+(rastreados), altera o telefone de um deles e chama save_clientes com a
+lista inteira. Confere que a outbox recebeu uma única gravação: um PATCH do
+cliente alterado contendo só o campo telefone. Mostra o tempo do
+save_clientes e o tamanho do corpo enviado comparado com a lista inteira.
+Não precisa do servidor: o envio fica na outbox (em memória) e o script
+termina sem gravar nada em disco.
+
+Uso:
+    python benchmark_alteracoes.py --registros 5000
+"""
+
+import argparse
+import json
+import sys
+import time
+from client.models import Cliente
+from client.repositories.api_client import ApiClient
+from client.repositories.colecao import ColecaoIndexada
+
+# Endereço sem servidor: as gravações permanecem na outbox
+SERVER_URL = "http://127.0.0.1:9"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Verificação do envio só do que mudou")
+    parser.add_argument("--registros", type=int, default=5000, help="Clientes no cache (padrão: 5000)")
+    return parser.parse_args()
+
+
+def _clientes(quantidade: int) -> ColecaoIndexada:
+    """Clientes como recebidos do servidor (rastreamento ligado)"""
+    return ColecaoIndexada(
+        Cliente.from_dict({
+            'id': i, 'nome': f"Cliente {i}", 'telefone': '(11) 99999-0000',
+            'email': f"cliente{i}@exemplo.com", 'data_cadastro': '2025-01-01T08:00:00',
+            'observacoes': '', 'ativo': True
+        }).rastrear()
+        for i in range(1, quantidade + 1)
+    )
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    api = ApiClient(server_url=SERVER_URL, tentativas=0)
+    try:
+        clientes = _clientes(args.registros)
+        api._clientes = clientes
+        alterado = clientes[len(clientes) // 2]
+        alterado.telefone = '(11) 91234-5678'
+
+        inicio = time.perf_counter()
+        api.save_clientes(clientes)
+        duracao = time.perf_counter() - inicio
+
+        pendencias = api._outbox.pendentes('clientes')
+        lista_inteira = len(json.dumps({'clientes': [c.to_dict() for c in clientes]}))
+        enviado = sum(len(json.dumps(p.dados)) for p in pendencias)
+        print(f"save_clientes com {args.registros} clientes: {duracao * 1000:.1f} ms")
+        print(f"Gravações na outbox: {len(pendencias)}")
+        for pendencia in pendencias:
+            print(f"  {pendencia.metodo} /api/clientes/{pendencia.registro_id} {json.dumps(pendencia.dados)}")
+        print(f"Corpo enviado: {enviado} bytes (lista inteira: {lista_inteira / 1024:.0f} KB)")
+
+        esperado = [('PATCH', alterado.id, {'telefone': alterado.telefone})]
+        obtido = [(p.metodo, p.registro_id, p.dados) for p in pendencias]
+        if obtido != esperado:
+            print(f"FALHOU: esperado {esperado}")
+            sys.exit(1)
+        print("OK: apenas o registro alterado, com apenas o campo alterado")
+    finally:
+        api.encerrar()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Verificação dos planos de consulta das rotas (EXPLAIN QUERY PLAN)
+
+Cria um banco temporário com os índices declarados nos modelos, preenche
+agendamentos e cadastros e faz as requisições das consultas mais usadas
+(agenda do barbeiro, relatórios, filtros da tela de agendamentos,
+verificação de conflito, sincronização com ?since). Os SELECTs executados
+por cada requisição são capturados e passados ao EXPLAIN QUERY PLAN; o
+script falha (código de saída 1) se algum índice esperado não aparecer no
+plano ou se alguma consulta percorrer uma tabela grande inteira (SCAN),
+por exemplo quando uma alteração na consulta deixa de usar o índice.
+
+Uso:
+    python benchmark_indices.py --agendamentos 20000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# (descrição, método, caminho, corpo, índices que o plano precisa usar)
+CASOS = [
+    ("agenda do barbeiro no dia", 'GET',
+     "/api/agendamentos?funcionario_id=3&data_inicio={dia}&data_fim={dia}", None,
+     ["ix_agendamentos_funcionario_data"]),
+    ("concluídos no período", 'GET',
+     "/api/agendamentos?status=concluido&data_inicio={inicio_mes}&data_fim={fim_mes}", None,
+     ["ix_agendamentos_status_data"]),
+    ("agendamentos de um cliente", 'GET', "/api/agendamentos?cliente_id=42", None,
+     ["ix_agendamentos_cliente"]),
+    ("agendamentos do período", 'GET', "/api/agendamentos?data_inicio={dia}&data_fim={dia}", None,
+     ["ix_agendamentos_data"]),
+    ("horários disponíveis", 'GET', "/api/funcionarios/3/disponibilidade?data={dia}", None,
+     ["ix_agendamentos_funcionario_data"]),
+    ("conflito ao agendar", 'POST', "/api/agendamentos", 'novo_agendamento',
+     ["ix_agendamentos_funcionario_horario"]),
+    ("relatório do período", 'GET', "/api/relatorios?inicio={inicio_mes}&fim={fim_mes}", None,
+     ["ix_agendamentos_status_data", "ix_clientes_ativo", "ix_funcionarios_ativo"]),
+    ("dashboard", 'GET', "/api/dashboard?data={dia}", None,
+     ["ix_clientes_ativo", "ix_funcionarios_ativo"]),
+    ("alterações de clientes (since)", 'GET', "/api/clientes?since={since}", None,
+     ["ix_clientes_versao", "ix_exclusoes_tabela_versao"]),
+    ("alterações de agendamentos (since)", 'GET', "/api/agendamentos?since={since}", None,
+     ["ix_agendamentos_versao"]),
+]
+
+# Tabelas que crescem com o uso: nenhuma consulta das rotas deve percorrê-las inteiras
+TABELAS_GRANDES = ('agendamentos', 'clientes', 'funcionarios', 'servicos', 'exclusoes')
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Verificação dos planos de consulta das rotas")
+    parser.add_argument("--agendamentos", type=int, default=20000, help="Agendamentos no banco (padrão: 20000)")
+    parser.add_argument("--cadastros", type=int, default=1000,
+                        help="Clientes, funcionários e serviços no banco (padrão: 1000)")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Roda ANALYZE antes (estatísticas do planejador; o banco do servidor não tem)")
+    parser.add_argument("--verbose", action="store_true", help="Mostra o plano de todos os casos")
+    return parser.parse_args()
+
+
+def _popular(engine, agendamentos: int, cadastros: int):
+    """Insere os cadastros e agendamentos espalhados por um ano"""
+    from sqlalchemy import insert
+    from shared.database import ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB, VersaoTabelaDB
+
+    base = datetime(2025, 1, 1, 8, 0)
+    status = ('agendado', 'confirmado', 'concluido', 'cancelado')
+    with engine.begin() as conn:
+        conn.execute(insert(ClienteDB), [
+            {'nome': f"Cliente {i}", 'telefone': '', 'email': '', 'data_cadastro': base,
+             'observacoes': '', 'ativo': i % 10 != 0, 'versao': i}
+            for i in range(cadastros)
+        ])
+        conn.execute(insert(FuncionarioDB), [
+            {'nome': f"Funcionário {i}", 'telefone': '', 'email': '', 'cargo': 'Barbeiro',
+             'data_admissao': base, 'salario': 2500.0, 'ativo': i % 10 != 0, 'versao': i}
+            for i in range(cadastros)
+        ])
+        conn.execute(insert(ServicoDB), [
+            {'nome': f"Serviço {i}", 'descricao': '', 'preco': Decimal('35.00'),
+             'duracao_minutos': 30, 'ativo': True, 'versao': i}
+            for i in range(cadastros)
+        ])
+        linhas = []
+        for i in range(agendamentos):
+            inicio = base + timedelta(days=i % 365, minutes=30 * (i // 365 % 20))
+            linhas.append({
+                'cliente_id': i % cadastros + 1, 'funcionario_id': i % 50 + 1, 'servico_id': i % 20 + 1,
+                'data_agendamento': inicio, 'horario_inicio': inicio,
+                'horario_fim': inicio + timedelta(minutes=30), 'status': status[i % len(status)],
+                'observacoes': '', 'valor_total': Decimal('35.00'), 'versao': i
+            })
+        conn.execute(insert(AgendamentoDB), linhas)
+        conn.execute(insert(VersaoTabelaDB), [
+            {'tabela': tabela, 'versao': versao}
+            for tabela, versao in (('clientes', cadastros), ('funcionarios', cadastros),
+                                   ('servicos', cadastros), ('agendamentos', agendamentos))
+        ])
+
+
+def _capturar_selects(engine, executar):
+    """Executa executar() e retorna os SELECTs (sql, parâmetros) enviados ao banco"""
+    from sqlalchemy import event
+
+    capturados = []
+
+    def ouvir(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            capturados.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", ouvir)
+    try:
+        executar()
+    finally:
+        event.remove(engine, "before_cursor_execute", ouvir)
+    return capturados
+
+
+def _planos(engine, consultas) -> list:
+    """Linhas de EXPLAIN QUERY PLAN de cada consulta capturada"""
+    linhas = []
+    with engine.connect() as conn:
+        for sql, parametros in consultas:
+            for _id, _pai, _nao_usado, detalhe in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros):
+                linhas.append(detalhe)
+    return linhas
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    # O servidor usa data/barbearia.db relativo à pasta atual: trabalhar em
+    # uma pasta temporária para não tocar no banco real
+    pasta = tempfile.mkdtemp(prefix="barbearia-indices-")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(pasta)
+    from shared.database import engine
+    from server import create_app
+
+    app = create_app()
+    print(f"Inserindo {args.agendamentos} agendamentos e {args.cadastros} cadastros por tabela...")
+    _popular(engine, args.agendamentos, args.cadastros)
+    if args.analyze:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
+    dia = datetime(2025, 3, 10)
+    valores = {
+        'dia': dia.date().isoformat(),
+        'inicio_mes': dia.replace(day=1).date().isoformat(),
+        'fim_mes': dia.replace(day=31).date().isoformat(),
+        'since': min(args.agendamentos, args.cadastros) - 10,
+    }
+    corpos = {
+        'novo_agendamento': {
+            'cliente_id': 1, 'funcionario_id': 3, 'servico_id': 1,
+            'data_agendamento': (dia + timedelta(days=400)).isoformat(),
+            'horario_inicio': (dia + timedelta(days=400, hours=9)).isoformat(),
+            'horario_fim': (dia + timedelta(days=400, hours=9, minutes=30)).isoformat(),
+        },
+    }
+
+    cliente = app.test_client()
+    falhas = 0
+    for descricao, metodo, caminho, corpo, esperados in CASOS:
+        url = caminho.format(**valores)
+
+        def requisitar():
+            resposta = cliente.open(url, method=metodo, json=corpos.get(corpo))
+            if resposta.status_code >= 400:
+                raise RuntimeError(f"{metodo} {url}: HTTP {resposta.status_code} {resposta.get_data(as_text=True)}")
+
+        plano = _planos(engine, _capturar_selects(engine, requisitar))
+        ausentes = [indice for indice in esperados if not any(indice in linha for linha in plano)]
+        varreduras = [linha for linha in plano if linha.split()[:2] in (['SCAN', t] for t in TABELAS_GRANDES)]
+        falhou = bool(ausentes or varreduras)
+        print(f"{'FALHA' if falhou else 'OK   '} {descricao:<36} {metodo} {url}")
+        if ausentes:
+            print(f"      índices ausentes do plano: {', '.join(ausentes)}")
+        if varreduras:
+            print(f"      tabelas percorridas inteiras: {', '.join(linha.split()[1] for linha in varreduras)}")
+        if falhou:
+            falhas += 1
+        if falhou or args.verbose:
+            for linha in plano:
+                print(f"        {linha}")
+
+    engine.dispose()
+    shutil.rmtree(pasta, ignore_errors=True)
+    print(f"\n{len(CASOS) - falhas}/{len(CASOS)} consultas usam os índices esperados")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da decodificação dos modelos do cliente
+
+Gera N agendamentos no formato enviado pela API (JSON decodificado) e
+compara o caminho antigo (Agendamento.from_dict linha a linha) com o
+decodificador em lote (decodificar), criando os modelos normais e as
+variantes compactas com __slots__, e com a decodificação da resposta
+colunar (decodificar_colunas; aqui o tempo inclui o json.loads das duas
+respostas, para comparar o custo total de leitura). Para cada caminho mede
+o tempo de CPU e a memória ocupada pela lista resultante (tracemalloc).
+Os horários gerados são quase todos distintos: é o pior caso para a
+decodificação colunar, que reaproveita as datas repetidas.
+
+Uso:
+    python benchmark_modelos.py --linhas 100000
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from client.models import Agendamento, decodificar, decodificar_colunas
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Microbenchmark da decodificação dos modelos")
+    parser.add_argument("--linhas", type=int, default=100000, help="Agendamentos gerados (padrão: 100000)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por caminho; vale a melhor")
+    return parser.parse_args()
+
+
+def _gerar(linhas: int) -> list:
+    """Linhas como o cliente as recebe: JSON do servidor já decodificado"""
+    base = datetime(2025, 1, 1, 8, 0)
+    status = ('agendado', 'confirmado', 'concluido', 'cancelado')
+    dados = [
+        {'id': i + 1, 'cliente_id': i % 1000 + 1, 'funcionario_id': i % 10 + 1, 'servico_id': i % 20 + 1,
+         'data_agendamento': (base + timedelta(hours=i)).isoformat(),
+         'horario_inicio': (base + timedelta(hours=i)).isoformat(),
+         'horario_fim': (base + timedelta(hours=i, minutes=30)).isoformat(),
+         'status': status[i % len(status)], 'observacoes': '', 'valor_total': 35.5 + i % 5}
+        for i in range(linhas)
+    ]
+    return json.loads(json.dumps(dados))
+
+
+def _colunar(linhas: list) -> dict:
+    """As mesmas linhas como a resposta colunar (datas em microssegundos, valores em centavos)"""
+    epoca = datetime(1970, 1, 1)
+    colunas = list(linhas[0]) if linhas else []
+    datas = {'data_agendamento', 'horario_inicio', 'horario_fim'}
+
+    def valor(campo, dado):
+        if campo in datas:
+            return (datetime.fromisoformat(dado) - epoca) // timedelta(microseconds=1)
+        if campo == 'valor_total':
+            return round(dado * 100)
+        return dado
+    return {'colunas': colunas, 'linhas': [[valor(c, linha[c]) for c in colunas] for linha in linhas]}
+
+
+def _medir_tempo(funcao, repeticoes: int) -> float:
+    """Melhor tempo de CPU (s) entre as repetições"""
+    melhor = None
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.process_time()
+        funcao()
+        duracao = time.process_time() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+
+def _medir_memoria(funcao) -> int:
+    """Bytes ainda alocados pelo resultado da função (a lista de modelos)"""
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return atual
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    print(f"Gerando {args.linhas} agendamentos...")
+    linhas = _gerar(args.linhas)
+    texto_json = json.dumps(linhas)
+    texto_colunar = json.dumps(_colunar(linhas))
+    print(f"Resposta JSON: {len(texto_json) / 2 ** 20:.1f} MB; colunar: {len(texto_colunar) / 2 ** 20:.1f} MB")
+
+    def ler_colunar(compacto=False):
+        dados = json.loads(texto_colunar)
+        return decodificar_colunas('agendamentos', dados['colunas'], dados['linhas'], compacto)
+
+    caminhos = [
+        ('from_dict', lambda: [Agendamento.from_dict(linha) for linha in linhas]),
+        ('decodificar', lambda: decodificar('agendamentos', linhas)),
+        ('compacto', lambda: decodificar('agendamentos', linhas, compacto=True)),
+        ('json+dec.', lambda: decodificar('agendamentos', json.loads(texto_json))),
+        ('colunar', ler_colunar),
+        ('col.compacto', lambda: ler_colunar(compacto=True)),
+    ]
+
+    print(f"\n{'caminho':<14}{'tempo':>12}{'memória':>14}{'ganho':>9}{'economia':>10}")
+    referencia = None
+    for nome, funcao in caminhos:
+        tempo = _medir_tempo(funcao, args.repeticoes)
+        memoria = _medir_memoria(funcao)
+        if referencia is None:
+            referencia = (tempo, memoria)
+        print(f"{nome:<14}{tempo * 1000:>9.0f} ms{memoria / 2 ** 20:>11.1f} MB"
+              f"{referencia[0] / tempo:>8.1f}x{1 - memoria / referencia[1]:>9.0%}")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da serialização das listagens
+
+Compara, para cada entidade, o caminho antigo (objetos ORM + *_to_dict +
+jsonify) com o caminho rápido usado pelas rotas (select() do Core + função
+de conversão gerada + orjson, quando instalado) e com o formato colunar
+(?format=columns), mostrando também o tamanho das duas respostas. Usa um
+banco temporário, sem tocar em data/barbearia.db.
+
+Uso:
+    python benchmark_serializacao.py --linhas 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from shared.database import Base, ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB
+from server.utils import serializacao
+from server.utils import (
+    cliente_to_dict, funcionario_to_dict, servico_to_dict, agendamento_to_dict,
+    cliente_serializador, funcionario_serializador, servico_serializador, agendamento_serializador
+)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Microbenchmark da serialização das listagens")
+    parser.add_argument("--linhas", type=int, default=100000, help="Registros por entidade (padrão: 100000)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por caminho; vale a melhor")
+    return parser.parse_args()
+
+
+def _popular(engine, linhas: int):
+    """Insere 'linhas' registros de cada entidade"""
+    base = datetime(2025, 1, 1, 8, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(ClienteDB), [
+            {'nome': f"Cliente {i}", 'telefone': '(11) 99999-0000', 'email': f"cliente{i}@exemplo.com",
+             'data_cadastro': base + timedelta(minutes=i), 'observacoes': '', 'ativo': True}
+            for i in range(linhas)
+        ])
+        conn.execute(insert(FuncionarioDB), [
+            {'nome': f"Funcionário {i}", 'telefone': '(11) 98888-0000', 'email': f"func{i}@exemplo.com",
+             'cargo': 'Barbeiro', 'data_admissao': base + timedelta(minutes=i), 'salario': 2500.0, 'ativo': True}
+            for i in range(linhas)
+        ])
+        conn.execute(insert(ServicoDB), [
+            {'nome': f"Serviço {i}", 'descricao': 'Corte e acabamento', 'preco': Decimal('35.50'),
+             'duracao_minutos': 30, 'ativo': True}
+            for i in range(linhas)
+        ])
+        conn.execute(insert(AgendamentoDB), [
+            {'cliente_id': i % 1000 + 1, 'funcionario_id': i % 10 + 1, 'servico_id': i % 20 + 1,
+             'data_agendamento': base + timedelta(hours=i), 'horario_inicio': base + timedelta(hours=i),
+             'horario_fim': base + timedelta(hours=i, minutes=30), 'status': 'agendado',
+             'observacoes': '', 'valor_total': Decimal('35.50')}
+            for i in range(linhas)
+        ])
+
+
+def _medir(funcao, repeticoes: int):
+    """Retorna (melhor tempo de CPU em segundos, tamanho da saída em bytes)"""
+    melhor = None
+    tamanho = 0
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        tamanho = len(funcao())
+        duracao = time.process_time() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, tamanho
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    provedor_json = Flask(__name__).json  # o mesmo usado por jsonify
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}")
+        Base.metadata.create_all(engine)
+        print(f"Inserindo {args.linhas} registros por entidade...")
+        _popular(engine, args.linhas)
+
+        entidades = [
+            ('clientes', ClienteDB, cliente_to_dict, cliente_serializador),
+            ('funcionarios', FuncionarioDB, funcionario_to_dict, funcionario_serializador),
+            ('servicos', ServicoDB, servico_to_dict, servico_serializador),
+            ('agendamentos', AgendamentoDB, agendamento_to_dict, agendamento_serializador),
+        ]
+        backend = "orjson" if serializacao.orjson is not None else "json (orjson não instalado)"
+        print(f"Serializador rápido: {backend}\n")
+        print(f"{'entidade':<14}{'ORM+jsonify':>14}{'Core+json':>14}{'Core+rápido':>14}{'ganho':>9}"
+              f"{'colunar':>12}{'JSON':>11}{'colunar':>11}{'redução':>9}")
+
+        with Session(engine) as db:
+            for nome, model, to_dict, serializador in entidades:
+                def atual():
+                    registros = db.query(model).order_by(model.id).all()
+                    texto = provedor_json.dumps([to_dict(r) for r in registros])
+                    db.expunge_all()
+                    return texto
+
+                def core_json():
+                    linhas = db.execute(serializador.select().order_by(model.id))
+                    return json.dumps(serializador.converter(linhas), ensure_ascii=False, separators=(',', ':'))
+
+                def core_rapido():
+                    linhas = db.execute(serializador.select().order_by(model.id))
+                    return serializacao.dumps(serializador.converter(linhas))
+
+                def colunar():
+                    linhas = db.execute(serializador.select(colunar=True).order_by(model.id))
+                    return serializacao.dumps(serializador.tabela(linhas))
+
+                t_atual, _ = _medir(atual, args.repeticoes)
+                t_json, _ = _medir(core_json, args.repeticoes)
+                t_rapido, tamanho = _medir(core_rapido, args.repeticoes)
+                t_colunar, tamanho_colunar = _medir(colunar, args.repeticoes)
+                print(f"{nome:<14}{t_atual * 1000:>11.0f} ms{t_json * 1000:>11.0f} ms"
+                      f"{t_rapido * 1000:>11.0f} ms{t_atual / t_rapido:>8.1f}x{t_colunar * 1000:>9.0f} ms"
+                      f"{tamanho / 2 ** 20:>8.1f} MB{tamanho_colunar / 2 ** 20:>8.1f} MB"
+                      f"{1 - tamanho_colunar / tamanho:>9.0%}")
+        engine.dispose()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark da gravação em lote (upsert) dos POST /api/<coleção>
+
+Grava lotes de 1, 100 e 10.000 clientes (metade atualizações de registros
+existentes, metade inserções) em uma tabela com 1 milhão de linhas,
+comparando upsert_em_lote com o caminho antigo das rotas (leitura de todos
+os IDs da tabela e uma consulta por registro). Cada lote é desfeito depois
+da medição, então todas as execuções encontram a mesma tabela. Usa um
+banco temporário, sem tocar em data/barbearia.db.
+
+Uso:
+    python benchmark_upsert.py --linhas 1000000 --lotes 1,100,10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from shared.database import Base, ClienteDB
+from server.utils import cliente_from_dict, upsert_em_lote
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark da gravação em lote (upsert)")
+    parser.add_argument("--linhas", type=int, default=1000000, help="Registros já na tabela (padrão: 1000000)")
+    parser.add_argument("--lotes", default="1,100,10000", help="Tamanhos de lote separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por lote; vale a melhor")
+    parser.add_argument("--sem-antigo", action="store_true",
+                        help="Não mede o caminho antigo (lento em tabelas grandes)")
+    return parser.parse_args()
+
+
+def _popular(engine, linhas: int):
+    """Insere 'linhas' clientes em blocos"""
+    base = datetime(2025, 1, 1, 8, 0)
+    bloco = 100000
+    with engine.begin() as conn:
+        for inicio in range(0, linhas, bloco):
+            conn.execute(insert(ClienteDB), [
+                {'nome': f"Cliente {i}", 'telefone': '(11) 99999-0000', 'email': f"cliente{i}@exemplo.com",
+                 'data_cadastro': base + timedelta(minutes=i), 'observacoes': '', 'ativo': True, 'versao': 0}
+                for i in range(inicio, min(inicio + bloco, linhas))
+            ])
+
+
+def _lote(tamanho: int, linhas: int) -> list:
+    """Registros como enviados pelo cliente: metade com IDs existentes, metade novos"""
+    registros = []
+    for i in range(tamanho):
+        registro = {'nome': f"Cliente alterado {i}", 'telefone': '(11) 97777-0000',
+                    'email': f"alterado{i}@exemplo.com", 'observacoes': 'benchmark', 'ativo': True}
+        if i % 2 == 0:
+            # IDs espalhados pela tabela
+            registro['id'] = 1 + (i * 7919) % linhas
+        registros.append(registro)
+    return registros
+
+
+def _antigo(db: Session, registros: list):
+    """Caminho das rotas antes do upsert: todos os IDs da tabela e uma consulta por registro"""
+    existentes = {c.id for c in db.query(ClienteDB).all()}
+    for registro in registros:
+        if registro.get('id') and registro['id'] in existentes:
+            cliente_db = db.query(ClienteDB).filter(ClienteDB.id == registro['id']).first()
+            if cliente_db:
+                for campo, valor in cliente_from_dict(registro).items():
+                    setattr(cliente_db, campo, valor)
+        else:
+            db.add(ClienteDB(**cliente_from_dict(registro)))
+            db.flush()
+    db.flush()
+
+
+def _medir(engine, funcao, registros: list, repeticoes: int) -> float:
+    """Melhor tempo (s) de funcao(db, registros), desfazendo a gravação a cada execução"""
+    melhor = None
+    for _ in range(repeticoes):
+        with Session(engine) as db:
+            inicio = time.perf_counter()
+            funcao(db, registros)
+            duracao = time.perf_counter() - inicio
+            db.rollback()
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    tamanhos = [int(t) for t in args.lotes.split(',') if t.strip()]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}")
+        Base.metadata.create_all(engine)
+        print(f"Inserindo {args.linhas} clientes...")
+        _popular(engine, args.linhas)
+
+        def upsert(db, registros):
+            upsert_em_lote(db, ClienteDB, registros, cliente_from_dict)
+            db.flush()
+
+        print(f"\n{'lote':>8}{'upsert':>13}{'por registro':>15}", end="")
+        print("" if args.sem_antigo else f"{'antigo':>13}{'ganho':>9}")
+        for tamanho in tamanhos:
+            registros = _lote(tamanho, args.linhas)
+            t_upsert = _medir(engine, upsert, registros, args.repeticoes)
+            linha = f"{tamanho:>8}{t_upsert * 1000:>10.1f} ms{t_upsert / tamanho * 1e6:>12.1f} µs"
+            if not args.sem_antigo:
+                t_antigo = _medir(engine, _antigo, registros, args.repeticoes)
+                linha += f"{t_antigo * 1000:>10.0f} ms{t_antigo / t_upsert:>8.0f}x"
+            print(linha)
+        engine.dispose()
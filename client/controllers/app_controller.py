@@ -8,6 +8,7 @@ import tkinter as tk
 from tkinter import messagebox
 from ..views import LoginWindow, HomeWindow
 from ..utils import StyleManager
+from ..repositories import get_api_client
 
 class BarbeariaApp:
     """Classe principal da aplicação"""
@@ -25,6 +26,9 @@ class BarbeariaApp:
             # Configurar estilos
             StyleManager.configure_styles()
             
+            # Respostas do servidor entregues na thread da interface
+            get_api_client().vincular_interface(self.root)
+            
             # Mostra a tela de login
             self.login_window = LoginWindow(self.root, self.on_login_success, self.on_login_cancel)
             self.login_window.run()
@@ -60,6 +64,7 @@ class BarbeariaApp:
     def on_window_close(self):
         """Handler chamado quando a janela principal é fechada"""
         if messagebox.askyesno("Confirmar", "Deseja realmente sair do sistema?"):
+            get_api_client().encerrar()
             if self.home_window:
                 self.home_window.window.destroy()
             if self.root:
@@ -6,5 +6,10 @@ from .cliente import Cliente
 from .servico import Servico
 from .funcionario import Funcionario
 from .agendamento import Agendamento
+from .rastreavel import Rastreavel
+from .compacto import (ClienteCompacto, FuncionarioCompacto, ServicoCompacto, AgendamentoCompacto,
+                       decodificar, decodificar_colunas)
 
-__all__ = ['Cliente', 'Servico', 'Funcionario', 'Agendamento']
+__all__ = ['Cliente', 'Servico', 'Funcionario', 'Agendamento', 'Rastreavel',
+           'ClienteCompacto', 'FuncionarioCompacto', 'ServicoCompacto', 'AgendamentoCompacto', 'decodificar',
+           'decodificar_colunas']
@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
+from .rastreavel import Rastreavel
 
 @dataclass
-class Agendamento:
+class Agendamento(Rastreavel):
     """Modelo para representar um agendamento de serviço"""
     id: Optional[int] = None
     cliente_id: int = 0
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
+from .rastreavel import Rastreavel
 
 @dataclass
-class Cliente:
+class Cliente(Rastreavel):
     """Modelo para representar um cliente da barbearia"""
     id: Optional[int] = None
     nome: str = ""
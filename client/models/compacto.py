@@ -0,0 +1,324 @@
+"""
+Variantes compactas dos modelos e decodificação em lote
+
+As classes *Compacto têm os mesmos campos, a mesma ordem de argumentos e o
+mesmo to_dict dos modelos, mas usam __slots__ (sem __dict__ por instância),
+ocupando bem menos memória em listas grandes (ex: histórico de
+agendamentos). Não têm rastreamento de alterações: servem para consulta.
+
+decodificar() converte de uma vez as linhas recebidas do servidor em
+modelos (normais ou compactos): os campos são lidos com um único
+itemgetter, as datas com datetime.fromisoformat (o formato que o servidor
+envia) e valores monetários e textos repetidos são convertidos uma vez e
+compartilhados entre as linhas.
+
+decodificar_colunas() faz o mesmo com a resposta colunar da API
+(?format=columns): cada linha é uma lista de valores na ordem de
+'colunas', as datas chegam em microssegundos desde 1970-01-01 e os valores
+monetários em centavos.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from operator import itemgetter
+from typing import Iterable, List, Sequence
+from .cliente import Cliente
+from .funcionario import Funcionario
+from .servico import Servico
+from .agendamento import Agendamento
+
+
+class _Compacto:
+    """Base das variantes compactas: comparação e repr pelos campos"""
+
+    __slots__ = ()
+
+    # Sem rastreamento de alterações (ver Rastreavel)
+    rastreado = False
+
+    # Modelo equivalente (definido nas subclasses)
+    _modelo = None
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Cria o objeto a partir de um dicionário (aceita campos ausentes, como o modelo)"""
+        modelo = cls._modelo.from_dict(data)
+        return cls(*(getattr(modelo, campo) for campo in cls.__slots__))
+
+    def __eq__(self, outro):
+        if type(outro) is not type(self):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        campos = ', '.join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+
+class ClienteCompacto(_Compacto):
+    """Cliente sem __dict__ (mesmos campos e to_dict de Cliente)"""
+
+    __slots__ = ('id', 'nome', 'telefone', 'email', 'data_cadastro', 'observacoes', 'ativo')
+    _modelo = Cliente
+    to_dict = Cliente.to_dict
+
+    def __init__(self, id=None, nome="", telefone="", email="", data_cadastro=None,
+                 observacoes="", ativo=True):
+        self.id = id
+        self.nome = nome
+        self.telefone = telefone
+        self.email = email
+        self.data_cadastro = data_cadastro if data_cadastro is not None else datetime.now()
+        self.observacoes = observacoes
+        self.ativo = ativo
+
+
+class FuncionarioCompacto(_Compacto):
+    """Funcionário sem __dict__ (mesmos campos e to_dict de Funcionario)"""
+
+    __slots__ = ('id', 'nome', 'telefone', 'email', 'cargo', 'data_admissao', 'salario', 'ativo')
+    _modelo = Funcionario
+    to_dict = Funcionario.to_dict
+
+    def __init__(self, id=None, nome="", telefone="", email="", cargo="", data_admissao=None,
+                 salario=0.0, ativo=True):
+        self.id = id
+        self.nome = nome
+        self.telefone = telefone
+        self.email = email
+        self.cargo = cargo
+        self.data_admissao = data_admissao if data_admissao is not None else datetime.now()
+        self.salario = salario
+        self.ativo = ativo
+
+
+class ServicoCompacto(_Compacto):
+    """Serviço sem __dict__ (mesmos campos e to_dict de Servico)"""
+
+    __slots__ = ('id', 'nome', 'descricao', 'preco', 'duracao_minutos', 'ativo')
+    _modelo = Servico
+    to_dict = Servico.to_dict
+
+    def __init__(self, id=None, nome="", descricao="", preco=Decimal('0.00'), duracao_minutos=30, ativo=True):
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.preco = preco
+        self.duracao_minutos = duracao_minutos
+        self.ativo = ativo
+
+
+class AgendamentoCompacto(_Compacto):
+    """Agendamento sem __dict__ (mesmos campos e to_dict de Agendamento)"""
+
+    __slots__ = ('id', 'cliente_id', 'funcionario_id', 'servico_id', 'data_agendamento',
+                 'horario_inicio', 'horario_fim', 'status', 'observacoes', 'valor_total')
+    _modelo = Agendamento
+    to_dict = Agendamento.to_dict
+
+    def __init__(self, id=None, cliente_id=0, funcionario_id=0, servico_id=0, data_agendamento=None,
+                 horario_inicio=None, horario_fim=None, status="agendado", observacoes="",
+                 valor_total=Decimal('0.00')):
+        self.id = id
+        self.cliente_id = cliente_id
+        self.funcionario_id = funcionario_id
+        self.servico_id = servico_id
+        self.data_agendamento = data_agendamento
+        self.horario_inicio = horario_inicio
+        self.horario_fim = horario_fim
+        self.status = status
+        self.observacoes = observacoes
+        self.valor_total = valor_total
+
+
+def _decimais():
+    """Conversor float -> Decimal que reaproveita os valores já vistos"""
+    vistos = {}
+
+    def converter(valor):
+        decimal = vistos.get(valor)
+        if decimal is None:
+            decimal = vistos[valor] = Decimal(str(valor if valor is not None else 0.0))
+        return decimal
+    return converter
+
+
+# Origem das datas do formato colunar (as datas não têm fuso, como no banco)
+_EPOCA = datetime(1970, 1, 1)
+
+
+def _datas():
+    """
+    Conversor microssegundos desde 1970-01-01 -> datetime que reaproveita os
+    valores já vistos (muitos agendamentos têm o mesmo dia e os mesmos horários)
+    """
+    vistos = {}
+
+    def converter(microssegundos):
+        data = vistos.get(microssegundos)
+        if data is None and microssegundos is not None:
+            data = vistos[microssegundos] = _EPOCA + timedelta(0, 0, microssegundos)
+        return data
+    return converter
+
+
+def _centavos():
+    """Conversor centavos -> Decimal que reaproveita os valores já vistos"""
+    vistos = {}
+
+    def converter(centavos):
+        decimal = vistos.get(centavos)
+        if decimal is None:
+            decimal = vistos[centavos] = Decimal(centavos or 0).scaleb(-2)
+        return decimal
+    return converter
+
+
+def _decodificar_clientes(linhas, classe):
+    campos = itemgetter('id', 'nome', 'telefone', 'email', 'data_cadastro', 'observacoes', 'ativo')
+    data = datetime.fromisoformat
+    return [
+        classe(id_, nome, telefone, email, data(cadastro) if cadastro else None, observacoes, ativo)
+        for id_, nome, telefone, email, cadastro, observacoes, ativo in map(campos, linhas)
+    ]
+
+
+def _decodificar_funcionarios(linhas, classe):
+    campos = itemgetter('id', 'nome', 'telefone', 'email', 'cargo', 'data_admissao', 'salario', 'ativo')
+    data = datetime.fromisoformat
+    cargos = {}
+    return [
+        classe(id_, nome, telefone, email, cargos.setdefault(cargo, cargo),
+               data(admissao) if admissao else None, salario, ativo)
+        for id_, nome, telefone, email, cargo, admissao, salario, ativo in map(campos, linhas)
+    ]
+
+
+def _decodificar_servicos(linhas, classe):
+    campos = itemgetter('id', 'nome', 'descricao', 'preco', 'duracao_minutos', 'ativo')
+    decimal = _decimais()
+    return [
+        classe(id_, nome, descricao, decimal(preco), duracao, ativo)
+        for id_, nome, descricao, preco, duracao, ativo in map(campos, linhas)
+    ]
+
+
+def _decodificar_agendamentos(linhas, classe):
+    campos = itemgetter('id', 'cliente_id', 'funcionario_id', 'servico_id', 'data_agendamento',
+                        'horario_inicio', 'horario_fim', 'status', 'observacoes', 'valor_total')
+    data = datetime.fromisoformat
+    decimal = _decimais()
+    # Poucos status distintos: todas as linhas compartilham a mesma string
+    status_vistos = {}
+    return [
+        classe(id_, cliente_id, funcionario_id, servico_id,
+               data(dia) if dia else None, data(inicio) if inicio else None, data(fim) if fim else None,
+               status_vistos.setdefault(status, status), observacoes, decimal(valor))
+        for (id_, cliente_id, funcionario_id, servico_id, dia, inicio, fim, status, observacoes, valor)
+        in map(campos, linhas)
+    ]
+
+
+def _colunas_clientes(linhas, classe, campos):
+    data = _datas()
+    return [
+        classe(id_, nome, telefone, email, data(cadastro), observacoes, ativo)
+        for id_, nome, telefone, email, cadastro, observacoes, ativo in map(campos, linhas)
+    ]
+
+
+def _colunas_funcionarios(linhas, classe, campos):
+    data = _datas()
+    cargos = {}
+    return [
+        classe(id_, nome, telefone, email, cargos.setdefault(cargo, cargo), data(admissao),
+               salario / 100 if salario is not None else 0.0, ativo)
+        for id_, nome, telefone, email, cargo, admissao, salario, ativo in map(campos, linhas)
+    ]
+
+
+def _colunas_servicos(linhas, classe, campos):
+    decimal = _centavos()
+    return [
+        classe(id_, nome, descricao, decimal(preco), duracao, ativo)
+        for id_, nome, descricao, preco, duracao, ativo in map(campos, linhas)
+    ]
+
+
+def _colunas_agendamentos(linhas, classe, campos):
+    data = _datas()
+    decimal = _centavos()
+    status_vistos = {}
+    return [
+        classe(id_, cliente_id, funcionario_id, servico_id, data(dia), data(inicio), data(fim),
+               status_vistos.setdefault(status, status), observacoes, decimal(valor))
+        for (id_, cliente_id, funcionario_id, servico_id, dia, inicio, fim, status, observacoes, valor)
+        in map(campos, linhas)
+    ]
+
+
+# Coleção -> decodificador do formato colunar
+_DECODIFICADORES_COLUNAS = {
+    'clientes': _colunas_clientes,
+    'funcionarios': _colunas_funcionarios,
+    'servicos': _colunas_servicos,
+    'agendamentos': _colunas_agendamentos,
+}
+
+
+# Coleção -> (decodificador, modelo, variante compacta)
+_DECODIFICADORES = {
+    'clientes': (_decodificar_clientes, Cliente, ClienteCompacto),
+    'funcionarios': (_decodificar_funcionarios, Funcionario, FuncionarioCompacto),
+    'servicos': (_decodificar_servicos, Servico, ServicoCompacto),
+    'agendamentos': (_decodificar_agendamentos, Agendamento, AgendamentoCompacto),
+}
+
+
+def decodificar(colecao: str, linhas: Iterable[dict], compacto: bool = False) -> List:
+    """
+    Converte em uma passada as linhas de uma coleção recebidas do servidor
+
+    Args:
+        colecao: 'clientes', 'funcionarios', 'servicos' ou 'agendamentos'
+        linhas: Dicionários completos, como enviados pela API (pode ser um
+            gerador; é percorrido uma única vez)
+        compacto: Cria as variantes com __slots__ em vez dos modelos
+
+    Returns:
+        Lista de modelos na ordem das linhas
+
+    Raises:
+        KeyError: Se a coleção for desconhecida ou faltar algum campo em uma linha
+    """
+    decodificador, modelo, variante = _DECODIFICADORES[colecao]
+    return decodificador(linhas, variante if compacto else modelo)
+
+
+def decodificar_colunas(colecao: str, colunas: Sequence[str], linhas: Iterable[Sequence],
+                        compacto: bool = False) -> List:
+    """
+    Converte em uma passada as linhas de uma resposta colunar (?format=columns)
+
+    Args:
+        colecao: 'clientes', 'funcionarios', 'servicos' ou 'agendamentos'
+        colunas: Nomes das colunas enviados pelo servidor (a ordem pode
+            diferir da dos campos do modelo; colunas a mais são ignoradas)
+        linhas: Listas de valores na ordem de colunas (pode ser um gerador;
+            é percorrido uma única vez)
+        compacto: Cria as variantes com __slots__ em vez dos modelos
+
+    Returns:
+        Lista de modelos na ordem das linhas
+
+    Raises:
+        KeyError: Se a coleção for desconhecida ou faltar alguma coluna
+    """
+    decodificador = _DECODIFICADORES_COLUNAS[colecao]
+    _, modelo, variante = _DECODIFICADORES[colecao]
+    posicoes = {coluna: indice for indice, coluna in enumerate(colunas)}
+    # Um único itemgetter reordena cada linha na ordem dos campos do modelo
+    campos = itemgetter(*(posicoes[campo] for campo in variante.__slots__))
+    return decodificador(linhas, variante if compacto else modelo, campos)
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
+from .rastreavel import Rastreavel
 
 @dataclass
-class Funcionario:
+class Funcionario(Rastreavel):
     """Modelo para representar um funcionário da barbearia"""
     id: Optional[int] = None
     nome: str = ""
@@ -0,0 +1,98 @@
+from typing import Dict, FrozenSet
+
+# Campos que não contam como alteração (o ID é atribuído pelo servidor)
+CAMPOS_IGNORADOS = frozenset({'id'})
+
+
+class Rastreavel:
+    """
+    Rastreamento opcional de alterações para os modelos (dataclasses)
+
+    Desligado por padrão: depois de rastrear() cada atribuição que muda o
+    valor de um campo do dataclass é registrada, e alterados informa quais
+    campos mudaram desde a última chamada a limpar_alteracoes(). Usado pelo
+    ApiClient para enviar apenas os registros e campos modificados.
+
+    Os objetos sem rastreamento usam a atribuição normal (sem custo extra na
+    criação dos modelos): rastrear() troca a classe do objeto por uma
+    subclasse que registra as alterações.
+    """
+
+    def rastrear(self):
+        """Liga o rastreamento a partir do estado atual e retorna o próprio objeto"""
+        object.__setattr__(self, '_alterados', set())
+        classe = type(self)
+        if not issubclass(classe, _AtribuicaoRastreada):
+            self.__class__ = _subclasse_rastreada(classe)
+        return self
+
+    @property
+    def rastreado(self) -> bool:
+        """Indica se o rastreamento está ligado"""
+        return self.__dict__.get('_alterados') is not None
+
+    @property
+    def alterados(self) -> FrozenSet[str]:
+        """Campos alterados desde a última limpeza (vazio sem rastreamento)"""
+        return frozenset(self.__dict__.get('_alterados') or ())
+
+    @property
+    def modificado(self) -> bool:
+        """Indica se algum campo foi alterado desde a última limpeza"""
+        return bool(self.__dict__.get('_alterados'))
+
+    def limpar_alteracoes(self, campos=None):
+        """
+        Marca o estado atual como enviado (mantém o rastreamento ligado)
+
+        Args:
+            campos: Campos enviados (None limpa todos)
+        """
+        if not self.rastreado:
+            return
+        if campos is None:
+            self._alterados.clear()
+        else:
+            self._alterados.difference_update(campos)
+
+
+class _AtribuicaoRastreada:
+    """Base das subclasses criadas por rastrear(): registra as atribuições"""
+
+    __slots__ = ()
+
+    # Modelo original (ex: Cliente) da subclasse rastreada
+    _modelo = None
+
+    def __setattr__(self, nome, valor):
+        alterados = self.__dict__.get('_alterados')
+        if (alterados is not None and nome in self.__dataclass_fields__
+                and nome not in CAMPOS_IGNORADOS and getattr(self, nome) != valor):
+            alterados.add(nome)
+        object.__setattr__(self, nome, valor)
+
+    def __eq__(self, outro):
+        # O __eq__ do dataclass exige a mesma classe; um registro rastreado
+        # continua igual ao mesmo registro sem rastreamento
+        if getattr(type(outro), '_modelo', type(outro)) is not self._modelo:
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outro, campo)
+                   for campo, definicao in self.__dataclass_fields__.items() if definicao.compare)
+
+
+# Modelo -> subclasse rastreada
+_SUBCLASSES: Dict[type, type] = {}
+
+
+def _subclasse_rastreada(classe: type) -> type:
+    """Subclasse de classe que registra as alterações (mesmo nome, criada uma vez)"""
+    subclasse = _SUBCLASSES.get(classe)
+    if subclasse is None:
+        # O modelo vem primeiro nas bases (senão o CPython recusa a troca de
+        # __class__), então o __eq__ do dataclass precisa ser sobrescrito aqui
+        subclasse = _SUBCLASSES[classe] = type(classe.__name__, (classe, _AtribuicaoRastreada), {
+            '__slots__': (), '_modelo': classe, '__module__': classe.__module__,
+            '__qualname__': classe.__qualname__, '__doc__': classe.__doc__,
+            '__eq__': _AtribuicaoRastreada.__eq__, '__hash__': None,
+        })
+    return subclasse
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from typing import Optional
 from decimal import Decimal
+from .rastreavel import Rastreavel
 
 @dataclass
-class Servico:
+class Servico(Rastreavel):
     """Modelo para representar um serviço oferecido pela barbearia"""
     id: Optional[int] = None
     nome: str = ""
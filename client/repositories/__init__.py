@@ -3,6 +3,6 @@ Repositories - Camada de acesso a dados via API
 """
 
 from .api_client import ApiClient, get_api_client
+from .colecao import ColecaoIndexada
 
-__all__ = ['ApiClient', 'get_api_client']
-
+__all__ = ['ApiClient', 'get_api_client', 'ColecaoIndexada']
@@ -3,661 +3,1509 @@ Cliente API REST
 Gerencia comunicação com o servidor Flask via HTTP
 """
 
+import json
+import queue
 import threading
 import requests
-from typing import List, Optional, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Callable, Set, Tuple
 from datetime import datetime, date
 from decimal import Decimal
-from ..models import Cliente, Funcionario, Servico, Agendamento
+from ..models import Cliente, Funcionario, Servico, Agendamento, Rastreavel, decodificar, decodificar_colunas
+from .conexao import (Disjuntor, ServidorIndisponivel, criar_sessao,
+                      TIMEOUT_PADRAO, TENTATIVAS_PADRAO, TAMANHO_POOL)
+from .cache_local import CacheLocal, caminho_padrao
+from .changeset import ChangeSet
+from .colecao import ColecaoIndexada
+from .outbox import Outbox, Pendencia, CHAVES_ESTRANGEIRAS, caminho_padrao as caminho_padrao_outbox
 
 # URL base do servidor
 SERVER_URL = "http://localhost:5000"
 
+# Formato de resposta transmitido linha a linha pelo servidor
+MIME_NDJSON = "application/x-ndjson"
+
+# Parâmetro que pede as listagens no formato colunar (nomes dos campos uma
+# única vez, datas e valores como inteiros)
+FORMATO_COLUNAS = {'format': 'columns'}
+
+# Coleções atualizadas pelos eventos do servidor: nome -> (atributo de cache, modelo)
+COLECOES = {
+    'clientes': ('_clientes', Cliente),
+    'funcionarios': ('_funcionarios', Funcionario),
+    'servicos': ('_servicos', Servico),
+    'agendamentos': ('_agendamentos', Agendamento),
+}
+
+# Nome de um registro de cada coleção nas respostas do servidor
+REGISTROS = {
+    'clientes': 'cliente',
+    'funcionarios': 'funcionario',
+    'servicos': 'servico',
+    'agendamentos': 'agendamento',
+}
+
+# Status de agendamento que não ocupam a agenda do barbeiro (mesmos do servidor)
+STATUS_LIVRES = ('cancelado', 'concluido')
+
+# Cabeçalho com o ID da pendência: o servidor não repete uma gravação já feita
+CABECALHO_IDEMPOTENCIA = "Idempotency-Key"
+
+# Espera (s) entre os reenvios da fila de gravações com o servidor fora do
+# ar: começa em REENVIO_ESPERA_INICIAL e dobra até REENVIO_ESPERA_MAXIMA
+REENVIO_ESPERA_INICIAL = 1.0
+REENVIO_ESPERA_MAXIMA = 30.0
+
+# Respostas 5xx seguidas a uma pendência antes de ela ser descartada
+REENVIO_MAX_ERROS = 5
+
+# Threads do executor que faz as requisições (cargas, gravações, exportações)
+TRABALHADORES = 6
+
+# Intervalo (ms) com que a thread da interface entrega os callbacks prontos
+INTERVALO_CALLBACKS = 20
+
+# Tempo máximo (s) sem receber nada do feed de eventos antes de reconectar
+# (o servidor envia keep-alive a cada 15 s)
+EVENTOS_TIMEOUT = 40
+
 class ApiClient:
     """Cliente API que se comunica com servidor Flask via HTTP"""
     
-    def __init__(self, server_url: str = SERVER_URL):
+    def __init__(self, server_url: str = SERVER_URL, timeout=TIMEOUT_PADRAO,
+                 tentativas: int = TENTATIVAS_PADRAO, tamanho_pool: int = TAMANHO_POOL,
+                 cache_local: Optional[CacheLocal] = None, outbox: Optional[Outbox] = None):
         """
         Inicializa o gerenciador de dados
         
         Args:
             server_url: URL do servidor Flask (padrão: http://localhost:5000)
+            timeout: Timeout padrão das requisições em segundos, número ou
+                tupla (conexão, leitura)
+            tentativas: Novas tentativas para falhas de conexão (e, nos GETs,
+                respostas 502/503/504)
+            tamanho_pool: Conexões HTTP mantidas abertas com o servidor
+            cache_local: Arquivo onde as coleções são guardadas entre
+                execuções (None mantém o cache apenas na memória)
+            outbox: Fila onde as gravações aguardam o envio ao servidor
+                (None usa uma fila apenas na memória)
         """
         self.server_url = server_url
+        self.timeout = timeout
+        
+        # Sessão HTTP compartilhada (keep-alive) e disjuntor que acompanha
+        # se o servidor está respondendo
+        self._sessao = criar_sessao(tentativas, tamanho_pool)
+        self._disjuntor = Disjuntor()
+        
+        # Executor limitado que faz as requisições; cada chamada retorna um Future
+        self._executor = ThreadPoolExecutor(max_workers=TRABALHADORES, thread_name_prefix="api")
+        
+        # Um lock por coleção: cargas de coleções diferentes rodam em paralelo
+        self._locks = {chave: threading.Lock() for chave in COLECOES}
+        
+        # Requisições em andamento por chave (cargas iguais compartilham o Future)
+        self._em_andamento: dict = {}
+        self._lock_em_andamento = threading.Lock()
+        
+        # Callbacks aguardando a thread da interface (ver vincular_interface)
+        self._callbacks: Optional[queue.Queue] = None
+        
+        # Cache de dados (listas com busca por ID e por nome, entregues às telas)
+        self._clientes: Optional[ColecaoIndexada] = None
+        self._funcionarios: Optional[ColecaoIndexada] = None
+        self._servicos: Optional[ColecaoIndexada] = None
+        self._agendamentos: Optional[ColecaoIndexada] = None
+        
+        # Última versão recebida do servidor para cada coleção (sincronização incremental)
+        self._versoes: dict = {}
+        
+        # ETag da última resposta de cada coleção (e do dashboard); enviado em
+        # If-None-Match para o servidor responder 304 quando nada mudou
+        self._etags: dict = {}
+        self._dashboard: Optional[dict] = None
+        
+        # Feed de alterações do servidor (/api/events)
+        self._ouvintes: List[Callable] = []
+        self._thread_eventos: Optional[threading.Thread] = None
+        self._parar_eventos = threading.Event()
+        self.eventos_conectados = False
+        # Versões do servidor informadas pelo feed (None antes da primeira conexão)
+        self._versoes_servidor: Optional[dict] = None
+        
+        # Cópia das coleções em disco: carregada agora e revalidada com o
+        # servidor no primeiro uso de cada coleção
+        self._cache_local = cache_local
+        self._nao_validadas: set = set()
+        # Registros a regravar no disco por coleção (None = a coleção inteira);
+        # chamadas seguidas de _persistir são reunidas em uma única gravação
+        self._a_persistir: Dict[str, Optional[set]] = {}
+        self._lock_persistir = threading.Lock()
+        self._lock_gravacao_local = threading.Lock()
+        if cache_local is not None:
+            self._restaurar_cache_local()
+        
+        # Gravações aplicadas no cache e ainda não confirmadas pelo servidor,
+        # reenviadas em ordem pela thread da fila
+        self._outbox = outbox if outbox is not None else Outbox()
+        # Protege a aplicação das pendências no cache (gravações, sincronização)
+        self._lock_pendencias = threading.RLock()
+        # Futures das gravações por registro (coleção, ID): (Future, on_conflict)
+        self._aguardando: Dict[tuple, list] = {}
+        # Objetos criados aqui, por (coleção, ID local), para receber o ID do servidor
+        self._criados: Dict[tuple, object] = {}
+        self._acordar_outbox = threading.Event()
+        self._parar_outbox = threading.Event()
+        self._thread_outbox = threading.Thread(target=self._reenviar_pendencias, name="api-outbox", daemon=True)
+        self._thread_outbox.start()
+    
+    def _restaurar_cache_local(self):
+        """Preenche os caches com as coleções guardadas na última execução"""
+        for chave, (versao, etag, dados) in self._cache_local.carregar().items():
+            try:
+                if chave in COLECOES:
+                    cache_attr, _ = COLECOES[chave]
+                    setattr(self, cache_attr, ColecaoIndexada(item.rastrear() for item in decodificar(chave, dados)))
+                    self._versoes[chave] = versao
+                    self._nao_validadas.add(chave)
+                elif chave == 'dashboard':
+                    self._dashboard = dados
+                else:
+                    continue
+                if etag:
+                    self._etags[chave] = etag
+            except Exception as e:
+                print(f"Erro ao restaurar {chave} do cache local: {e}")
+    
+    def _persistir(self, chave: str, ids: Optional[Iterable[int]] = None):
+        """
+        Grava no cache local os registros alterados (no executor, fora do lock da coleção)
+        
+        Args:
+            chave: Nome da coleção
+            ids: Registros alterados, incluídos ou removidos (None regrava a coleção inteira)
+        """
+        if self._cache_local is None:
+            return
+        with self._lock_persistir:
+            agendada = chave in self._a_persistir
+            anteriores = self._a_persistir.get(chave, set())
+            if ids is None or anteriores is None:
+                self._a_persistir[chave] = None
+            else:
+                self._a_persistir[chave] = anteriores | set(ids)
+        if not agendada:
+            self._executor.submit(self._gravar_cache_local, chave)
+    
+    def _gravar_cache_local(self, chave: str):
+        """Grava os registros pendentes de _persistir (uma gravação por vez, na ordem)"""
+        with self._lock_gravacao_local:
+            with self._lock_persistir:
+                ids = self._a_persistir.pop(chave, set())
+            cache_attr, _ = COLECOES[chave]
+            with self._locks[chave]:
+                cache = getattr(self, cache_attr)
+                if cache is None:
+                    return
+                versao, etag = self._versoes.get(chave, 0), self._etags.get(chave)
+                if ids is None:
+                    registros = list(cache)
+                else:
+                    registros = [item for item in map(cache.por_id, ids) if item is not None]
+                    removidos = ids - {item.id for item in registros}
+            if ids is None:
+                self._cache_local.salvar_colecao(chave, versao, etag, [item.to_dict() for item in registros])
+            else:
+                self._cache_local.atualizar_colecao(chave, versao, etag,
+                                                    [item.to_dict() for item in registros], removidos)
+    
+    @property
+    def modo_offline(self) -> bool:
+        """Servidor fora do ar: as telas mostram o cache local e as gravações aguardam na outbox"""
+        return not self._disjuntor.disponivel
+    
+    @property
+    def possui_dados_locais(self) -> bool:
+        """Indica se há alguma coleção em cache (da memória ou do disco)"""
+        return any(getattr(self, cache_attr) is not None for cache_attr, _ in COLECOES.values())
+    
+    def vincular_interface(self, widget):
+        """
+        Passa a entregar os callbacks na thread da interface (Tkinter)
+        
+        Os resultados prontos são colocados em uma fila que o laço do Tk
+        esvazia a cada INTERVALO_CALLBACKS ms. Sem interface vinculada (ex:
+        scripts) os callbacks são chamados na thread do executor.
+        
+        Args:
+            widget: Janela raiz (ou qualquer widget) da aplicação
+        """
+        self._callbacks = queue.Queue()
+        
+        def _entregar_pendentes():
+            while True:
+                try:
+                    funcao, args = self._callbacks.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    funcao(*args)
+                except Exception as e:
+                    print(f"Erro no callback: {e}")
+                    import traceback
+                    traceback.print_exc()
+            try:
+                widget.after(INTERVALO_CALLBACKS, _entregar_pendentes)
+            except Exception:
+                self._callbacks = None  # interface encerrada
+        
+        _entregar_pendentes()
+    
+    def _entregar(self, callback: Optional[Callable], *args):
+        """Chama o callback na thread da interface (ou na atual, sem interface vinculada)"""
+        if callback is None:
+            return
+        fila = self._callbacks
+        if fila is not None:
+            fila.put((callback, args))
+        else:
+            callback(*args)
+    
+    def _ao_concluir(self, futuro: Future, callback: Optional[Callable]):
+        """Entrega o resultado do Future ao callback quando ele terminar"""
+        if callback is None:
+            return
+        
+        def _concluir(f: Future):
+            if f.cancelled() or f.exception() is not None:
+                print(f"Erro na requisição: {f.exception() if not f.cancelled() else 'cancelada'}")
+                return
+            self._entregar(callback, f.result())
+        
+        futuro.add_done_callback(_concluir)
+    
+    def _enviar(self, funcao: Callable, callback: Optional[Callable] = None) -> Future:
+        """Executa a função no executor e entrega o resultado ao callback"""
+        futuro = self._executor.submit(funcao)
+        self._ao_concluir(futuro, callback)
+        return futuro
+    
+    def _unico(self, chave, funcao: Callable, callback: Optional[Callable] = None) -> Future:
+        """
+        Executa a função no executor, a menos que uma chamada igual esteja em andamento
+        
+        Chamadas com a mesma chave enquanto a primeira não terminou recebem o
+        mesmo Future (uma única requisição) e todos os callbacks recebem o
+        resultado.
+        """
+        with self._lock_em_andamento:
+            futuro = self._em_andamento.get(chave)
+            novo = futuro is None
+            if novo:
+                futuro = self._executor.submit(funcao)
+                self._em_andamento[chave] = futuro
+        if novo:
+            def _encerrar(f: Future):
+                with self._lock_em_andamento:
+                    if self._em_andamento.get(chave) is f:
+                        del self._em_andamento[chave]
+            futuro.add_done_callback(_encerrar)
+        self._ao_concluir(futuro, callback)
+        return futuro
+    
+    def _concluido(self, resultado, callback: Optional[Callable] = None) -> Future:
+        """Future já resolvido (dados em cache); o callback é chamado imediatamente"""
+        futuro: Future = Future()
+        futuro.set_result(resultado)
+        if callback:
+            callback(resultado)
+        return futuro
+    
+    @property
+    def servidor_disponivel(self) -> bool:
+        """Indica se o servidor respondeu à última requisição (sem acessar a rede)"""
+        return self._disjuntor.disponivel
+    
+    def _requisitar(self, metodo: str, caminho: str, timeout=None, **kwargs) -> requests.Response:
+        """
+        Faz uma requisição pela sessão compartilhada, passando pelo disjuntor
+        
+        Qualquer resposta HTTP conta como servidor no ar; falhas de conexão e
+        timeouts contam como falha. Com o disjuntor aberto a requisição nem é
+        tentada.
         
-        # Lock para operações thread-safe
-        self.lock = threading.Lock()
+        Args:
+            metodo: Método HTTP ('GET', 'POST', 'PATCH', 'DELETE')
+            caminho: Caminho da rota (ex: /api/clientes)
+            timeout: Timeout desta chamada (padrão: self.timeout)
+            **kwargs: Demais argumentos de requests (params, json, headers, stream)
         
-        # Cache de dados
-        self._clientes: Optional[List[Cliente]] = None
-        self._funcionarios: Optional[List[Funcionario]] = None
-        self._servicos: Optional[List[Servico]] = None
-        self._agendamentos: Optional[List[Agendamento]] = None
+        Raises:
+            ServidorIndisponivel: Se o servidor não está respondendo
+            requests.Timeout: Se o servidor aceitou a conexão mas não respondeu a tempo
+        """
+        if not self._disjuntor.permitir():
+            raise ServidorIndisponivel("Servidor não está rodando")
+        try:
+            response = self._sessao.request(metodo, f"{self.server_url}{caminho}",
+                                            timeout=timeout or self.timeout, **kwargs)
+        except requests.ConnectionError as e:
+            self._disjuntor.registrar_falha()
+            raise ServidorIndisponivel("Servidor não está rodando") from e
+        except requests.Timeout:
+            self._disjuntor.registrar_falha()
+            raise
+        self._disjuntor.registrar_sucesso()
+        return response
     
-    def _check_server(self) -> bool:
-        """Verifica se o servidor está rodando"""
+    def verificar_servidor(self) -> bool:
+        """
+        Consulta /api/health e retorna se o servidor está rodando (chamada síncrona)
+        
+        Usada nas verificações pedidas pelo usuário (login, abertura da
+        janela): ignora a espera do disjuntor e atualiza seu estado.
+        """
         try:
-            response = requests.get(f"{self.server_url}/api/health", timeout=2)
-            return response.status_code == 200
-        except:
+            response = self._sessao.get(f"{self.server_url}/api/health", timeout=2)
+        except requests.RequestException:
+            self._disjuntor.registrar_falha()
             return False
+        self._disjuntor.registrar_sucesso()
+        return response.status_code == 200
     
-    def load_clientes(self, callback: Optional[Callable] = None) -> List[Cliente]:
+    def _stream_ndjson(self, caminho: str, params: Optional[dict] = None, etag_chave: Optional[str] = None):
         """
-        Carrega clientes do servidor em thread separada
+        Faz um GET pedindo NDJSON e gera cada objeto conforme as linhas chegam
+        
+        A resposta não é carregada inteira na memória: cada linha é
+        decodificada e entregue assim que é recebida.
         
         Args:
-            callback: Função chamada após carregar (recebe lista de clientes)
+            caminho: Caminho da rota (ex: /api/clientes)
+            params: Parâmetros da query string
+            etag_chave: Com uma chave, envia o ETag guardado em If-None-Match
+                e guarda o novo ETag quando a resposta é lida até o fim. Se o
+                servidor responder 304 (nada mudou) nenhum objeto é gerado.
+        
+        Raises:
+            requests.HTTPError: Se o servidor responder com erro
+            ServidorIndisponivel: Se o servidor não está respondendo
+        """
+        headers = {'Accept': MIME_NDJSON}
+        if etag_chave and self._etags.get(etag_chave):
+            headers['If-None-Match'] = self._etags[etag_chave]
+        
+        with self._requisitar('GET', caminho, params=params, headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            for linha in response.iter_lines():
+                if linha:
+                    yield json.loads(linha)
+            if etag_chave and response.headers.get('ETag'):
+                self._etags[etag_chave] = response.headers['ETag']
+    
+    def _sincronizar(self, chave: str, cache_attr: str, model_cls) -> Optional[list]:
+        """
+        Sincroniza o cache de uma coleção com o servidor (chamar com self._locks[chave] adquirido)
+        
+        Na primeira carga busca todos os registros (since=0); nas seguintes busca
+        apenas o que mudou desde a última versão conhecida e aplica no cache
+        existente, substituindo/adicionando por ID e removendo os excluídos.
+        Os registros chegam no formato colunar e são decodificados direto
+        nos modelos.
+        Se nada mudou o servidor responde 304 ao ETag e o cache é mantido.
+        Registros com gravações ainda na fila (outbox) mantêm a versão local.
+        
+        Args:
+            chave: Nome da coleção na API (ex: 'clientes')
+            cache_attr: Atributo de cache (ex: '_clientes')
+            model_cls: Classe do modelo com from_dict
         
         Returns:
-            Lista de clientes (pode estar vazia se não houver dados)
+            Lista em cache atualizada, ou None se a requisição falhar
         """
-        def _load():
-            try:
-                with self.lock:
-                    if self._clientes is not None:
-                        if callback:
-                            callback(self._clientes)
-                        return self._clientes
-                    
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        # NÃO seta cache como lista vazia - mantém None para tentar novamente
-                        if callback:
-                            callback([])
-                        return []
-                    
-                    response = requests.get(f"{self.server_url}/api/clientes", timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        self._clientes = [Cliente.from_dict(item) for item in data]
-                        if callback:
-                            callback(self._clientes)
-                        return self._clientes
-                    else:
-                        # Erro na requisição - não seta cache para permitir nova tentativa
-                        if callback:
-                            callback([])
-                        return []
-            except Exception as e:
-                print(f"Erro ao carregar clientes: {e}")
-                import traceback
-                traceback.print_exc()
-                # NÃO seta cache como lista vazia - mantém None para tentar novamente quando servidor voltar
-                if callback:
-                    callback([])
-                return []
+        cache = getattr(self, cache_attr)
+        since = self._versoes.get(chave, 0) if cache is not None else 0
         
-        # Se já está em cache, retorna imediatamente
-        if self._clientes is not None:
-            if callback:
-                callback(self._clientes)
-            return self._clientes
+        try:
+            # Sem cache o ETag antigo não vale: um 304 significa "o cache está em dia"
+            if cache is None:
+                self._etags.pop(chave, None)
+            linhas = self._stream_ndjson(f"/api/{chave}", {'since': since, **FORMATO_COLUNAS}, etag_chave=chave)
+            # Primeira linha: versão atual, IDs excluídos e colunas; demais: registros
+            cabecalho = next(linhas, None)
+            if cabecalho is None:
+                self._nao_validadas.discard(chave)
+                return cache
+            recebidos = ColecaoIndexada(
+                item.rastrear() for item in decodificar_colunas(chave, cabecalho['colunas'], linhas)
+            )
+        except requests.HTTPError:
+            return None
         
-        # Caso contrário, carrega em thread
-        thread = threading.Thread(target=_load, daemon=True)
-        thread.start()
-        return []
+        with self._lock_pendencias:
+            pendentes = self._outbox.registros_pendentes(chave)
+            locais = {item.id: item for item in cache or [] if item.id in pendentes}
+            if cache is None or since == 0:
+                cache = recebidos
+            else:
+                posicoes = {item.id: i for i, item in enumerate(cache)}
+                for item in recebidos:
+                    if item.id in posicoes:
+                        cache[posicoes[item.id]] = item
+                    else:
+                        posicoes[item.id] = len(cache)
+                        cache.append(item)
+                excluidos = set(cabecalho.get('excluidos', []))
+                if excluidos:
+                    cache[:] = [item for item in cache if item.id not in excluidos]
+            if pendentes:
+                cache[:] = self._sobrepor_pendencias(chave, model_cls, cache, locais)
+            setattr(self, cache_attr, cache)
+        self._versoes[chave] = cabecalho.get('versao', 0)
+        self._nao_validadas.discard(chave)
+        if since == 0:
+            self._persistir(chave)
+        else:
+            self._persistir(chave, {item.id for item in recebidos} | excluidos | set(pendentes))
+        return cache
     
-    def save_clientes(self, clientes: List[Cliente], callback: Optional[Callable] = None):
+    def _sobrepor_pendencias(self, chave: str, model_cls, cache: list, locais: dict) -> list:
         """
-        Salva clientes no servidor em thread separada
+        Reaplica sobre a lista vinda do servidor as gravações ainda na fila
         
         Args:
-            clientes: Lista de clientes para salvar
-            callback: Função chamada após salvar (recebe True se sucesso, False se erro)
+            chave: Nome da coleção
+            model_cls: Classe do modelo com from_dict
+            cache: Lista com os registros do servidor
+            locais: Objetos do cache anterior com gravação pendente, por ID
+        
+        Returns:
+            Nova lista com os registros locais no lugar dos do servidor
         """
-        def _save():
-            try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    data = [cliente.to_dict() for cliente in clientes]
-                    response = requests.post(
-                        f"{self.server_url}/api/clientes",
-                        json={'clientes': data},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            self._clientes = clientes
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
-            except Exception as e:
-                print(f"Erro ao salvar clientes: {e}")
-                import traceback
-                traceback.print_exc()
-                if callback:
-                    callback(False)
+        registros = list(cache)
+        posicoes = {item.id: i for i, item in enumerate(registros)}
+        for pendencia in self._outbox.pendentes(chave):
+            registro_id = pendencia.registro_id
+            posicao = posicoes.get(registro_id)
+            if pendencia.metodo == 'DELETE':
+                if posicao is not None:
+                    registros[posicao] = None
+                continue
+            if registro_id in locais:
+                item = locais[registro_id]
+            elif pendencia.metodo == 'POST':
+                item = model_cls.from_dict({**pendencia.dados, 'id': registro_id}).rastrear()
+            elif posicao is not None and registros[posicao] is not None:
+                item = model_cls.from_dict({**registros[posicao].to_dict(), **pendencia.dados}).rastrear()
+            else:
+                continue
+            if posicao is not None:
+                registros[posicao] = item
+            else:
+                posicoes[registro_id] = len(registros)
+                registros.append(item)
+        return [item for item in registros if item is not None]
+    
+    def adicionar_ouvinte(self, callback: Callable):
+        """
+        Registra uma função chamada quando outro terminal (ou este) altera dados
         
-        thread = threading.Thread(target=_save, daemon=True)
-        thread.start()
+        A função recebe o nome da coleção alterada ('clientes', 'funcionarios',
+        'servicos' ou 'agendamentos') e é chamada na thread de eventos, depois
+        que o cache já foi atualizado; views devem usar root.after para
+        atualizar a interface.
+        """
+        if callback not in self._ouvintes:
+            self._ouvintes.append(callback)
     
-    def load_funcionarios(self, callback: Optional[Callable] = None) -> List[Funcionario]:
-        """Carrega funcionários do servidor em thread separada"""
-        def _load():
+    def remover_ouvinte(self, callback: Callable):
+        """Remove uma função registrada com adicionar_ouvinte"""
+        if callback in self._ouvintes:
+            self._ouvintes.remove(callback)
+    
+    def iniciar_eventos(self):
+        """Inicia (uma única vez) a thread que escuta o feed de alterações do servidor"""
+        if self._thread_eventos is not None and self._thread_eventos.is_alive():
+            return
+        self._parar_eventos.clear()
+        self._thread_eventos = threading.Thread(target=self._escutar_eventos, daemon=True)
+        self._thread_eventos.start()
+    
+    def parar_eventos(self):
+        """Pede o encerramento da thread de eventos (usada ao sair da aplicação)"""
+        self._parar_eventos.set()
+    
+    def encerrar(self):
+        """
+        Encerra o feed de eventos, o reenvio de gravações e o executor,
+        descartando as requisições na fila (ao sair). As gravações pendentes
+        continuam no arquivo da outbox e são enviadas na próxima execução.
+        """
+        self.parar_eventos()
+        self._parar_outbox.set()
+        self._acordar_outbox.set()
+        self._callbacks = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _escutar_eventos(self):
+        """Mantém a conexão com /api/events, reconectando com espera crescente"""
+        espera = 1
+        while not self._parar_eventos.is_set():
             try:
-                with self.lock:
-                    if self._funcionarios is not None:
-                        if callback:
-                            callback(self._funcionarios)
-                        return self._funcionarios
-                    
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        # NÃO seta cache como lista vazia - mantém None para tentar novamente
-                        if callback:
-                            callback([])
-                        return []
-                    
-                    response = requests.get(f"{self.server_url}/api/funcionarios", timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        self._funcionarios = [Funcionario.from_dict(item) for item in data]
-                        if callback:
-                            callback(self._funcionarios)
-                        return self._funcionarios
-                    else:
-                        # Erro na requisição - não seta cache para permitir nova tentativa
-                        if callback:
-                            callback([])
-                        return []
+                with self._requisitar('GET', "/api/events", stream=True,
+                                      headers={'Accept': 'text/event-stream'},
+                                      timeout=(5, EVENTOS_TIMEOUT)) as response:
+                    response.raise_for_status()
+                    espera = 1
+                    for tipo, dados in self._ler_sse(response):
+                        if self._parar_eventos.is_set():
+                            return
+                        if tipo == 'conectado':
+                            self.eventos_conectados = True
+                            self._ao_conectar_eventos(json.loads(dados).get('versoes', {}))
+                        elif tipo == 'alteracao':
+                            self._aplicar_alteracao(json.loads(dados))
             except Exception as e:
-                print(f"Erro ao carregar funcionários: {e}")
-                import traceback
-                traceback.print_exc()
-                # NÃO seta cache como lista vazia - mantém None para tentar novamente quando servidor voltar
-                if callback:
-                    callback([])
-                return []
-        
-        if self._funcionarios is not None:
-            if callback:
-                callback(self._funcionarios)
-            return self._funcionarios
-        
-        thread = threading.Thread(target=_load, daemon=True)
-        thread.start()
-        return []
-    
-    def save_funcionarios(self, funcionarios: List[Funcionario], callback: Optional[Callable] = None):
-        """Salva funcionários no servidor em thread separada"""
-        def _save():
+                if self.eventos_conectados:
+                    print(f"Conexão com o feed de eventos perdida: {e}")
+            finally:
+                self.eventos_conectados = False
+            self._parar_eventos.wait(espera)
+            espera = min(espera * 2, 30)
+    
+    @staticmethod
+    def _ler_sse(response):
+        """Gera (evento, dados) de um stream text/event-stream"""
+        tipo, dados = 'message', []
+        for linha in response.iter_lines(decode_unicode=True):
+            if not linha:
+                if dados:
+                    yield tipo, '\n'.join(dados)
+                tipo, dados = 'message', []
+            elif linha.startswith(':'):
+                continue  # comentário (keep-alive)
+            else:
+                campo, _, valor = linha.partition(':')
+                valor = valor[1:] if valor.startswith(' ') else valor
+                if campo == 'event':
+                    tipo = valor
+                elif campo == 'data':
+                    dados.append(valor)
+    
+    def _ao_conectar_eventos(self, versoes: dict):
+        """Confere as coleções que mudaram enquanto o feed estava desconectado"""
+        if self._versoes_servidor is None:
+            # Primeira conexão: apenas conferir os caches já carregados
+            entidades = [e for e, (cache_attr, _) in COLECOES.items() if getattr(self, cache_attr) is not None]
+        else:
+            entidades = [e for e in COLECOES if versoes.get(e) != self._versoes_servidor.get(e)]
+        self._versoes_servidor = dict(versoes)
+        # Servidor de volta: enviar as gravações feitas enquanto estava fora
+        self._acordar_outbox.set()
+        self._sincronizar_colecoes(entidades)
+    
+    def _aplicar_alteracao(self, evento: dict):
+        """Atualiza o cache da coleção alterada e avisa os ouvintes"""
+        entidade = evento.get('entidade')
+        if entidade not in COLECOES:
+            return
+        if self._versoes_servidor is not None:
+            self._versoes_servidor[entidade] = evento.get('versao', 0)
+        with self._locks[entidade]:
+            # Evento de uma versão que o cache já possui (ex: escrita deste terminal)
+            atualizado = self._versoes.get(entidade, 0) >= evento.get('versao', 0)
+        if not atualizado:
+            self._sincronizar_colecoes([entidade])
+        else:
+            self._notificar_ouvintes(entidade)
+    
+    def _sincronizar_colecoes(self, entidades: List[str]):
+        """Busca as alterações das coleções em cache e avisa os ouvintes das que mudaram"""
+        for entidade in entidades:
+            cache_attr, model_cls = COLECOES[entidade]
+            with self._locks[entidade]:
+                if getattr(self, cache_attr) is None:
+                    alterada = True  # sem cache: só avisar, a view carrega quando precisar
+                else:
+                    versao_anterior = self._versoes.get(entidade)
+                    if self._sincronizar(entidade, cache_attr, model_cls) is None:
+                        continue
+                    alterada = self._versoes.get(entidade) != versao_anterior
+            if alterada:
+                self._notificar_ouvintes(entidade)
+    
+    def _notificar_ouvintes(self, entidade: str):
+        for callback in list(self._ouvintes):
             try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    data = [funcionario.to_dict() for funcionario in funcionarios]
-                    response = requests.post(
-                        f"{self.server_url}/api/funcionarios",
-                        json={'funcionarios': data},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            self._funcionarios = funcionarios
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
+                callback(entidade)
             except Exception as e:
-                print(f"Erro ao salvar funcionários: {e}")
+                print(f"Erro ao notificar alteração de {entidade}: {e}")
                 import traceback
                 traceback.print_exc()
-                if callback:
-                    callback(False)
+    
+    def _carregar_colecao(self, chave: str, descricao: str, callback: Optional[Callable],
+                          force_reload: bool) -> Future:
+        """
+        Carrega (ou sincroniza) o cache de uma coleção no executor
         
-        thread = threading.Thread(target=_save, daemon=True)
-        thread.start()
+        Cargas iguais feitas ao mesmo tempo compartilham a mesma requisição.
+        O resultado é a lista em cache, ou [] se o servidor não responder (o
+        cache continua None para tentar novamente). Uma coleção restaurada
+        do cache local é entregue na hora e revalidada em segundo plano; se
+        mudou, os ouvintes são avisados.
+        
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            descricao: Nome usado nas mensagens de erro (ex: 'funcionários')
+            callback: Função chamada na thread da interface com a lista
+            force_reload: Busca as alterações no servidor mesmo com cache
+        """
+        cache_attr, model_cls = COLECOES[chave]
+        cache = getattr(self, cache_attr)
+        if cache is not None and not force_reload:
+            if chave in self._nao_validadas:
+                self._revalidar(chave, descricao)
+            return self._concluido(cache, callback)
+        
+        return self._unico(('load', chave), self._tarefa_carga(chave, descricao), callback)
     
-    def load_servicos(self, callback: Optional[Callable] = None) -> List[Servico]:
-        """Carrega serviços do servidor em thread separada"""
+    def _tarefa_carga(self, chave: str, descricao: str) -> Callable:
+        """Função executada no executor para sincronizar uma coleção"""
+        cache_attr, model_cls = COLECOES[chave]
+        
         def _load():
             try:
-                with self.lock:
-                    if self._servicos is not None:
-                        if callback:
-                            callback(self._servicos)
-                        return self._servicos
-                    
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        # NÃO seta cache como lista vazia - mantém None para tentar novamente
-                        if callback:
-                            callback([])
-                        return []
-                    
-                    response = requests.get(f"{self.server_url}/api/servicos", timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        self._servicos = [Servico.from_dict(item) for item in data]
-                        if callback:
-                            callback(self._servicos)
-                        return self._servicos
-                    else:
-                        # Erro na requisição - não seta cache para permitir nova tentativa
-                        if callback:
-                            callback([])
-                        return []
+                with self._locks[chave]:
+                    resultado = self._sincronizar(chave, cache_attr, model_cls)
+                # Erro na requisição - não seta cache para permitir nova tentativa
+                return resultado if resultado is not None else ColecaoIndexada()
+            except requests.ConnectionError:
+                print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
+                # Mostrar a cópia local, se houver; sem ela
+                # NÃO seta cache como lista vazia - mantém None para tentar novamente
+                return getattr(self, cache_attr) or ColecaoIndexada()
             except Exception as e:
-                print(f"Erro ao carregar serviços: {e}")
+                print(f"Erro ao carregar {descricao}: {e}")
                 import traceback
                 traceback.print_exc()
-                # NÃO seta cache como lista vazia - mantém None para tentar novamente quando servidor voltar
-                if callback:
-                    callback([])
-                return []
-        
-        if self._servicos is not None:
-            if callback:
-                callback(self._servicos)
-            return self._servicos
-        
-        thread = threading.Thread(target=_load, daemon=True)
-        thread.start()
-        return []
-    
-    def save_servicos(self, servicos: List[Servico], callback: Optional[Callable] = None):
-        """Salva serviços no servidor em thread separada"""
-        def _save():
+                return ColecaoIndexada()
+        
+        return _load
+    
+    def _revalidar(self, chave: str, descricao: str):
+        """Sincroniza em segundo plano uma coleção vinda do cache local e avisa se mudou"""
+        versao_anterior = self._versoes.get(chave)
+        
+        def _verificar(f: Future):
+            if not f.cancelled() and f.exception() is None and self._versoes.get(chave) != versao_anterior:
+                self._notificar_ouvintes(chave)
+        
+        self._unico(('load', chave), self._tarefa_carga(chave, descricao)).add_done_callback(_verificar)
+    
+    @property
+    def total_pendencias(self) -> int:
+        """Gravações feitas neste terminal que aguardam confirmação do servidor"""
+        return len(self._outbox)
+    
+    def ids_pendentes(self, chave: str) -> Set[int]:
+        """
+        IDs dos registros de uma coleção com gravação ainda não confirmada
+        
+        Usado pelas telas para marcar os registros que ainda não chegaram ao
+        servidor.
+        """
+        return set(self._outbox.registros_pendentes(chave))
+    
+    def _enfileirar(self, pendencia: Pendencia, on_conflict: Optional[Callable] = None) -> Future:
+        """
+        Põe uma gravação na outbox e acorda a thread de reenvio (chamar com
+        self._lock_pendencias adquirido, depois de aplicar a gravação no cache)
+        
+        Returns:
+            Future resolvido com True quando o servidor confirmar as gravações
+            do registro, ou False se ele recusar
+        """
+        futuro: Future = Future()
+        registro = (pendencia.colecao, pendencia.registro_id)
+        self._aguardando.setdefault(registro, []).append((futuro, on_conflict))
+        if self._outbox.adicionar(pendencia) is None:
+            # Exclusão de um registro criado aqui e ainda não enviado: nada a enviar
+            self._criados.pop(registro, None)
+            for aguardando, _ in self._aguardando.pop(registro, []):
+                aguardando.set_result(True)
+        self._acordar_outbox.set()
+        return futuro
+    
+    def coletar_alteracoes(self, chave: str, registros: Optional[list] = None) -> ChangeSet:
+        """
+        Reúne os registros novos e alterados de uma coleção
+        
+        Os registros vindos do servidor têm rastreamento de alterações ligado,
+        então apenas os modificados (e só os campos modificados) entram no
+        conjunto.
+        
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            registros: Registros a examinar (padrão: o cache da coleção)
+        """
+        if registros is None:
+            cache_attr, _ = COLECOES[chave]
+            registros = list(getattr(self, cache_attr) or [])
+        return ChangeSet(chave, registros)
+    
+    def salvar_alteracoes(self, alteracoes: ChangeSet, callback: Optional[Callable] = None) -> Future:
+        """
+        Envia pela outbox os registros de um ChangeSet (POST dos novos, PATCH dos alterados)
+        
+        Args:
+            alteracoes: Conjunto montado com coletar_alteracoes
+            callback: Função chamada com True assim que as gravações são aceitas localmente
+        
+        Returns:
+            Future com True quando o servidor confirmar todas, False se recusar alguma
+        """
+        chave = alteracoes.colecao
+        futuros = [self._gravar_registro(chave, 'POST', registro, None) for registro in alteracoes.novos]
+        futuros += [self._gravar_registro(chave, 'PATCH', registro, campos or None)
+                    for registro, campos in alteracoes.alterados]
+        self._entregar(callback, True)
+        return self._reunir(futuros)
+    
+    @staticmethod
+    def _reunir(futuros: List[Future]) -> Future:
+        """Future resolvido com True quando todos terminarem com True (False se algum falhar)"""
+        resultado: Future = Future()
+        restantes = [len(futuros)]
+        lock = threading.Lock()
+        
+        def _concluir(_):
+            with lock:
+                restantes[0] -= 1
+                if restantes[0]:
+                    return
+            resultado.set_result(all(f.result() for f in futuros))
+        
+        if not futuros:
+            resultado.set_result(True)
+        for futuro in futuros:
+            futuro.add_done_callback(_concluir)
+        return resultado
+    
+    def _salvar_colecao(self, chave: str, registros: list, callback: Optional[Callable]) -> Future:
+        """
+        Salva uma lista de registros enviando só o que mudou
+        
+        Registros novos são criados e os alterados recebem um PATCH com os
+        campos modificados; registros sem alteração não geram requisição.
+        Registros ausentes da lista não são removidos.
+        
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            registros: Lista de registros
+            callback: Função chamada com True assim que as gravações são aceitas localmente
+        
+        Returns:
+            Future com True quando o servidor confirmar, False se recusar
+        """
+        return self.salvar_alteracoes(self.coletar_alteracoes(chave, registros), callback)
+    
+    def _excluir_registro(self, chave: str, registro_id: int, callback: Optional[Callable]) -> Future:
+        """
+        Remove um registro do cache e envia a exclusão ao servidor pela outbox
+        
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            registro_id: ID do registro
+            callback: Função chamada com True assim que o registro sai do cache
+        
+        Returns:
+            Future com True quando o servidor confirmar, False se recusar
+        """
+        cache_attr, _ = COLECOES[chave]
+        with self._lock_pendencias:
+            cache = getattr(self, cache_attr)
+            if cache is not None:
+                cache[:] = [item for item in cache if item.id != registro_id]
+            futuro = self._enfileirar(Pendencia(chave, 'DELETE', registro_id))
+        self._persistir(chave, [registro_id])
+        self._entregar(callback, True)
+        return futuro
+    
+    def _gravar_registro(self, chave: str, metodo: str, registro, campos: Optional[List[str]],
+                         callback: Optional[Callable] = None,
+                         on_conflict: Optional[Callable] = None) -> Future:
+        """
+        Grava um único registro (POST para criar, PATCH para atualizar) pela outbox
+        
+        O cache é atualizado e o callback recebe True na hora, mesmo com o
+        servidor fora do ar; o envio é feito em segundo plano pela thread da
+        outbox. Um registro novo recebe um ID local (negativo), trocado pelo
+        ID do servidor quando a criação é confirmada.
+        
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            metodo: 'POST' ou 'PATCH'
+            registro: Objeto do modelo a enviar
+            campos: Campos a enviar (None envia os alterados, se o registro
+                tiver rastreamento ligado, ou todos)
+            callback: Função chamada com True quando a gravação é aceita localmente
+            on_conflict: Função chamada se o servidor recusar a gravação por
+                conflito de horário (HTTP 409); recebe a lista 'conflitos' da resposta
+        
+        Returns:
+            Future com True quando o servidor confirmar, False se recusar
+        """
+        cache_attr, _ = COLECOES[chave]
+        if campos is None and metodo == 'PATCH' and registro.rastreado:
+            # Apenas os campos alterados desde o último envio
+            campos = sorted(registro.alterados)
+            if not campos:
+                return self._concluido(True, callback)
+        payload = registro.to_dict()
+        payload.pop('id', None)
+        if campos is not None:
+            payload = {campo: valor for campo, valor in payload.items() if campo in campos}
+        
+        with self._lock_pendencias:
+            if metodo == 'POST':
+                registro.id = self._outbox.novo_id_local()
+                self._criados[(chave, registro.id)] = registro
+            cache = getattr(self, cache_attr)
+            if cache is not None and not any(item is registro for item in cache):
+                for i, item in enumerate(cache):
+                    if item.id == registro.id:
+                        cache[i] = registro
+                        break
+                else:
+                    cache.append(registro)
+            elif cache is not None:
+                # Registro já na lista: o ID (novo) ou o nome podem ter mudado
+                cache.reindexar()
+            futuro = self._enfileirar(Pendencia(chave, metodo, registro.id, payload, campos), on_conflict)
+            if registro.rastreado:
+                registro.limpar_alteracoes(campos)
+            elif isinstance(registro, Rastreavel):
+                registro.rastrear()
+        self._persistir(chave, [registro.id])
+        self._entregar(callback, True)
+        return futuro
+    
+    def _reenviar_pendencias(self):
+        """Thread da outbox: envia as pendências em ordem, esperando o servidor voltar quando ele cai"""
+        espera = REENVIO_ESPERA_INICIAL
+        erros, ultima = 0, None
+        while not self._parar_outbox.is_set():
+            self._acordar_outbox.clear()
+            pendencia = self._outbox.primeira()
+            if pendencia is None:
+                self._acordar_outbox.wait()
+                continue
+            if pendencia is not ultima:
+                erros, ultima = 0, pendencia
+            if self._disjuntor.aberto:
+                # Servidor fora do ar: a pendência ainda pode ser combinada com novas edições
+                self._acordar_outbox.wait(espera)
+                espera = min(espera * 2, REENVIO_ESPERA_MAXIMA)
+                continue
             try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    data = [servico.to_dict() for servico in servicos]
-                    response = requests.post(
-                        f"{self.server_url}/api/servicos",
-                        json={'servicos': data},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            self._servicos = servicos
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
+                if self._enviar_pendencia(pendencia, descartar_se_falhar=erros + 1 >= REENVIO_MAX_ERROS):
+                    espera = REENVIO_ESPERA_INICIAL
+                    continue
+                erros += 1
+            except (requests.ConnectionError, requests.Timeout):
+                pass  # servidor fora do ar: tentar de novo mais tarde
             except Exception as e:
-                print(f"Erro ao salvar serviços: {e}")
+                print(f"Erro ao enviar gravação pendente: {e}")
                 import traceback
                 traceback.print_exc()
-                if callback:
-                    callback(False)
+                erros += 1
+                if erros >= REENVIO_MAX_ERROS:
+                    self._recusar(pendencia, None)
+                    continue
+            self._acordar_outbox.wait(espera)
+            espera = min(espera * 2, REENVIO_ESPERA_MAXIMA)
+    
+    def _enviar_pendencia(self, pendencia: Pendencia, descartar_se_falhar: bool = False) -> bool:
+        """
+        Envia uma pendência com sua Idempotency-Key e aplica a resposta
+        
+        Args:
+            pendencia: Primeira pendência da fila
+            descartar_se_falhar: Recusa a pendência se o servidor responder 5xx
+        
+        Returns:
+            True se o servidor confirmou ou recusou a gravação (ela sai da fila),
+            False se respondeu com erro interno (5xx) e ela deve ser reenviada
+        
+        Raises:
+            requests.ConnectionError: Se o servidor não está respondendo
+        """
+        colecao, metodo = pendencia.colecao, pendencia.metodo
+        caminho = f"/api/{colecao}" if metodo == 'POST' else f"/api/{colecao}/{pendencia.registro_id}"
+        dados = pendencia.dados if metodo != 'DELETE' else None
         
-        thread = threading.Thread(target=_save, daemon=True)
-        thread.start()
+        # Depois do primeiro envio a pendência não é mais combinada com outras
+        self._outbox.registrar_tentativa(pendencia)
+        response = self._requisitar(metodo, caminho, json=dados,
+                                    headers={CABECALHO_IDEMPOTENCIA: pendencia.id})
+        if response.status_code >= 500 and not descartar_se_falhar:
+            return False
+        if response.status_code < 300 or (metodo == 'DELETE' and response.status_code == 404):
+            self._confirmar(pendencia, response)
+        else:
+            self._recusar(pendencia, response)
+        return True
     
-    def delete_cliente(self, cliente_id: int, callback: Optional[Callable] = None):
-        """Remove um cliente do banco de dados"""
-        def _delete():
+    def _confirmar(self, pendencia: Pendencia, response: requests.Response):
+        """Retira da fila uma pendência aceita pelo servidor e aplica o ID atribuído"""
+        colecao = pendencia.colecao
+        registro_id = pendencia.registro_id
+        alteradas = {colecao: {registro_id}}
+        with self._lock_pendencias:
+            self._outbox.concluir(pendencia)
+            if pendencia.metodo == 'POST':
+                novo_id = response.json()[REGISTROS[colecao]]['id']
+                alteradas[colecao].add(novo_id)
+                alteradas.update(self._substituir_id_local(colecao, registro_id, novo_id))
+                registro_id = novo_id
+            aguardando = []
+            if registro_id not in self._outbox.registros_pendentes(colecao):
+                aguardando = self._aguardando.pop((colecao, registro_id), [])
+        
+        for futuro, _ in aguardando:
+            futuro.set_result(True)
+        for chave, ids in alteradas.items():
+            self._persistir(chave, ids)
+            self._notificar_ouvintes(chave)
+    
+    def _recusar(self, pendencia: Pendencia, response: Optional[requests.Response]):
+        """
+        Retira da fila uma pendência recusada pelo servidor e volta a coleção
+        ao estado do servidor
+        """
+        colecao = pendencia.colecao
+        conflitos, erro = [], "erro ao enviar"
+        if response is not None:
             try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando!")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    response = requests.delete(
-                        f"{self.server_url}/api/clientes/{cliente_id}",
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            # Limpar cache para forçar recarregamento
-                            self._clientes = None
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
-            except Exception as e:
-                print(f"Erro ao deletar cliente: {e}")
-                import traceback
-                traceback.print_exc()
-                if callback:
-                    callback(False)
+                corpo = response.json()
+            except ValueError:
+                corpo = {}
+            if response.status_code == 409:
+                conflitos = corpo.get('conflitos', [])
+            erro = corpo.get('error') or f"HTTP {response.status_code}"
+        print(f"Gravação de {REGISTROS[colecao]} recusada pelo servidor: {erro}")
+        
+        with self._lock_pendencias:
+            self._outbox.concluir(pendencia)
+            if pendencia.registro_id < 0:
+                # Criação recusada: as alterações seguintes do registro não têm destino
+                self._outbox.descartar(colecao, pendencia.registro_id)
+                self._criados.pop((colecao, pendencia.registro_id), None)
+            aguardando = self._aguardando.pop((colecao, pendencia.registro_id), [])
+            self._versoes[colecao] = 0
+            self._etags.pop(colecao, None)
+        
+        for futuro, on_conflict in aguardando:
+            if conflitos and on_conflict:
+                self._entregar(on_conflict, conflitos)
+            futuro.set_result(False)
+        self._sincronizar_apos_envio(colecao)
+    
+    def _sincronizar_apos_envio(self, colecao: str):
+        """Recarrega uma coleção do servidor depois de uma gravação recusada"""
+        try:
+            self._sincronizar_colecoes([colecao])
+        except requests.RequestException as e:
+            print(f"Erro ao recarregar {colecao}: {e}")
+    
+    def _substituir_id_local(self, colecao: str, id_local: int, novo_id: int) -> Dict[str, set]:
+        """
+        Troca o ID local de um registro criado aqui pelo ID do servidor no
+        cache, nas pendências e nas referências dos agendamentos (chamar com
+        self._lock_pendencias adquirido)
+        
+        Returns:
+            Outras coleções cujo cache foi alterado, com os IDs dos registros alterados
+        """
+        cache_attr, _ = COLECOES[colecao]
+        cache = getattr(self, cache_attr)
+        # Procurado antes de trocar o ID do objeto criado, que pode ser o mesmo
+        local = cache.por_id(id_local) if cache is not None else None
+        criado = self._criados.pop((colecao, id_local), None)
+        if criado is not None:
+            criado.id = novo_id
+        if local is not None:
+            local.id = novo_id
+            # O feed de eventos pode já ter trazido a cópia do servidor
+            cache[:] = [item for item in cache if item.id != novo_id or item is local]
+        self._outbox.substituir_id(colecao, id_local, novo_id)
+        if (colecao, id_local) in self._aguardando:
+            self._aguardando[(colecao, novo_id)] = self._aguardando.pop((colecao, id_local))
+        
+        campo = CHAVES_ESTRANGEIRAS.get(colecao)
+        alteradas = {}
+        for agendamento in (self._agendamentos or []) if campo else []:
+            if getattr(agendamento, campo) == id_local:
+                setattr(agendamento, campo, novo_id)
+                alteradas.setdefault('agendamentos', set()).add(agendamento.id)
+        return alteradas
+    
+    def load_clientes(self, callback: Optional[Callable] = None, force_reload: bool = False) -> Future:
+        """
+        Carrega clientes do servidor no executor
+        
+        Args:
+            callback: Função chamada após carregar (recebe lista de clientes)
+            force_reload: Busca as alterações no servidor mesmo com cache
         
-        thread = threading.Thread(target=_delete, daemon=True)
-        thread.start()
+        Returns:
+            Future com a lista de clientes (vazia se o servidor não responder)
+        """
+        return self._carregar_colecao('clientes', 'clientes', callback, force_reload)
+    
+    def save_clientes(self, clientes: List[Cliente], callback: Optional[Callable] = None) -> Future:
+        """
+        Salva a lista de clientes (envio em segundo plano pela outbox)
+        
+        Args:
+            clientes: Lista de clientes para salvar
+            callback: Função chamada com True assim que a lista é aceita localmente
+        
+        Returns:
+            Future com True quando o servidor confirmar, False se recusar
+        """
+        return self._salvar_colecao('clientes', clientes, callback)
+    
+    def load_funcionarios(self, callback: Optional[Callable] = None, force_reload: bool = False) -> Future:
+        """Carrega funcionários do servidor no executor"""
+        return self._carregar_colecao('funcionarios', 'funcionários', callback, force_reload)
+    
+    def save_funcionarios(self, funcionarios: List[Funcionario], callback: Optional[Callable] = None) -> Future:
+        """Salva a lista de funcionários (envio em segundo plano pela outbox)"""
+        return self._salvar_colecao('funcionarios', funcionarios, callback)
+    
+    def load_servicos(self, callback: Optional[Callable] = None, force_reload: bool = False) -> Future:
+        """Carrega serviços do servidor no executor"""
+        return self._carregar_colecao('servicos', 'serviços', callback, force_reload)
+    
+    def save_servicos(self, servicos: List[Servico], callback: Optional[Callable] = None) -> Future:
+        """Salva a lista de serviços (envio em segundo plano pela outbox)"""
+        return self._salvar_colecao('servicos', servicos, callback)
+    
+    def create_cliente(self, cliente: Cliente, callback: Optional[Callable] = None) -> Future:
+        """Cria um cliente; o ID local é trocado pelo do servidor quando a criação é confirmada"""
+        return self._gravar_registro('clientes', 'POST', cliente, None, callback)
+    
+    def update_cliente(self, cliente: Cliente, campos: Optional[List[str]] = None, callback: Optional[Callable] = None) -> Future:
+        """Atualiza um cliente enviando apenas os campos informados (se None, os alterados)"""
+        return self._gravar_registro('clientes', 'PATCH', cliente, campos, callback)
+    
+    def create_funcionario(self, funcionario: Funcionario, callback: Optional[Callable] = None) -> Future:
+        """Cria um funcionário; o ID local é trocado pelo do servidor quando a criação é confirmada"""
+        return self._gravar_registro('funcionarios', 'POST', funcionario, None, callback)
+    
+    def update_funcionario(self, funcionario: Funcionario, campos: Optional[List[str]] = None, callback: Optional[Callable] = None) -> Future:
+        """Atualiza um funcionário enviando apenas os campos informados (se None, os alterados)"""
+        return self._gravar_registro('funcionarios', 'PATCH', funcionario, campos, callback)
+    
+    def create_servico(self, servico: Servico, callback: Optional[Callable] = None) -> Future:
+        """Cria um serviço; o ID local é trocado pelo do servidor quando a criação é confirmada"""
+        return self._gravar_registro('servicos', 'POST', servico, None, callback)
+    
+    def update_servico(self, servico: Servico, campos: Optional[List[str]] = None, callback: Optional[Callable] = None) -> Future:
+        """Atualiza um serviço enviando apenas os campos informados (se None, os alterados)"""
+        return self._gravar_registro('servicos', 'PATCH', servico, campos, callback)
     
-    def delete_funcionario(self, funcionario_id: int, callback: Optional[Callable] = None):
+    def create_agendamento(self, agendamento: Agendamento, callback: Optional[Callable] = None,
+                           on_conflict: Optional[Callable] = None) -> Future:
+        """
+        Cria um agendamento; o ID local é trocado pelo do servidor quando a criação é confirmada
+        
+        Se o servidor recusar o horário por conflito com outro agendamento do
+        barbeiro, o agendamento sai do cache e on_conflict (quando informado)
+        recebe a lista de conflitos.
+        """
+        return self._gravar_registro('agendamentos', 'POST', agendamento, None, callback, on_conflict)
+    
+    def update_agendamento(self, agendamento: Agendamento, campos: Optional[List[str]] = None,
+                           callback: Optional[Callable] = None, on_conflict: Optional[Callable] = None) -> Future:
+        """Atualiza um agendamento enviando apenas os campos informados (se None, os alterados)"""
+        return self._gravar_registro('agendamentos', 'PATCH', agendamento, campos, callback, on_conflict)
+    
+    def delete_cliente(self, cliente_id: int, callback: Optional[Callable] = None) -> Future:
+        """Remove um cliente do banco de dados"""
+        return self._excluir_registro('clientes', cliente_id, callback)
+    
+    def delete_funcionario(self, funcionario_id: int, callback: Optional[Callable] = None) -> Future:
         """Remove um funcionário do banco de dados"""
-        def _delete():
+        return self._excluir_registro('funcionarios', funcionario_id, callback)
+    
+    def delete_servico(self, servico_id: int, callback: Optional[Callable] = None) -> Future:
+        """Remove um serviço do banco de dados"""
+        return self._excluir_registro('servicos', servico_id, callback)
+    
+    def delete_agendamento(self, agendamento_id: int, callback: Optional[Callable] = None) -> Future:
+        """Remove um agendamento do banco de dados"""
+        return self._excluir_registro('agendamentos', agendamento_id, callback)
+    
+    def load_agendamentos(self, callback: Optional[Callable] = None, force_reload: bool = False,
+                          filtros: Optional[dict] = None) -> Future:
+        """
+        Carrega agendamentos do servidor no executor
+        
+        Args:
+            callback: Função chamada após carregar (recebe lista de agendamentos)
+            force_reload: Busca as alterações no servidor mesmo com cache
+            filtros: Filtros aplicados pelo servidor (data_inicio, data_fim,
+                funcionario_id, cliente_id, status). Quando informados, o
+                resultado não é armazenado no cache.
+        """
+        if filtros:
+            params = self._parametros_filtros(filtros)
+            return self._unico(('agendamentos', tuple(sorted(params.items()))),
+                               lambda: self._load_agendamentos_filtrados(params), callback)
+        # Com force_reload o cache é mantido e apenas as alterações são buscadas
+        return self._carregar_colecao('agendamentos', 'agendamentos', callback, force_reload)
+    
+    @staticmethod
+    def _parametros_filtros(filtros: dict) -> dict:
+        """Converte os filtros de agendamentos (datas, listas) em parâmetros da query string"""
+        params = {}
+        for chave, valor in filtros.items():
+            if valor is None or valor == '':
+                continue
+            if isinstance(valor, (datetime, date)):
+                valor = valor.strftime('%Y-%m-%d')
+            elif isinstance(valor, (list, tuple, set)):
+                valor = ','.join(valor)
+            params[chave] = valor
+        return params
+    
+    @staticmethod
+    def _atende_filtros(agendamento: Agendamento, params: dict) -> bool:
+        """Aplica no cliente os filtros do servidor (cópia local e agendamentos ainda não enviados)"""
+        data = agendamento.data_agendamento.date() if agendamento.data_agendamento else None
+        if params.get('data_inicio') and (data is None or data < date.fromisoformat(params['data_inicio'])):
+            return False
+        if params.get('data_fim') and (data is None or data > date.fromisoformat(params['data_fim'])):
+            return False
+        if params.get('funcionario_id') and agendamento.funcionario_id != int(params['funcionario_id']):
+            return False
+        if params.get('cliente_id') and agendamento.cliente_id != int(params['cliente_id']):
+            return False
+        if params.get('status') and agendamento.status not in str(params['status']).split(','):
+            return False
+        return True
+    
+    def _load_agendamentos_filtrados(self, params: dict) -> ColecaoIndexada:
+        """
+        Busca agendamentos filtrados no servidor, recebidos em streaming (NDJSON
+        no formato colunar)
+        
+        Os agendamentos com gravação ainda na fila aparecem com a versão local;
+        sem servidor os filtros são aplicados à cópia em cache.
+        """
+        try:
+            linhas = self._stream_ndjson("/api/agendamentos", {**params, **FORMATO_COLUNAS})
+            cabecalho = next(linhas, None)
+            if cabecalho is None:
+                return ColecaoIndexada()
+            recebidos = [item.rastrear() for item in decodificar_colunas('agendamentos', cabecalho['colunas'], linhas)]
+            with self._lock_pendencias:
+                pendentes = self._outbox.registros_pendentes('agendamentos')
+                if pendentes:
+                    locais = {item.id: item for item in self._agendamentos or [] if item.id in pendentes}
+                    recebidos = self._sobrepor_pendencias('agendamentos', Agendamento, recebidos, locais)
+            return ColecaoIndexada(item for item in recebidos if self._atende_filtros(item, params))
+        except requests.HTTPError:
+            return ColecaoIndexada()
+        except requests.ConnectionError:
+            print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
+            return ColecaoIndexada(item for item in self._agendamentos or [] if self._atende_filtros(item, params))
+        except Exception as e:
+            print(f"Erro ao carregar agendamentos filtrados: {e}")
+            import traceback
+            traceback.print_exc()
+            return ColecaoIndexada()
+    
+    def load_snapshot(self, filtros: Optional[dict] = None, callback: Optional[Callable] = None) -> Future:
+        """
+        Carrega as quatro coleções em uma única requisição (GET /api/snapshot)
+        
+        Os dados vêm da mesma transação do servidor, junto com a versão de
+        cada coleção, e preenchem todos os caches de uma vez. Com filtros de
+        agendamentos o resultado filtrado é entregue ao callback mas não
+        substitui o cache de agendamentos.
+        
+        Args:
+            filtros: Filtros de agendamentos (data_inicio, data_fim,
+                funcionario_id, cliente_id, status)
+            callback: Função chamada com {'clientes': [...], 'funcionarios': [...],
+                'servicos': [...], 'agendamentos': [...]} ou None se houver erro
+        """
+        params = self._parametros_filtros(filtros or {})
+        
+        def _load():
             try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando!")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    response = requests.delete(
-                        f"{self.server_url}/api/funcionarios/{funcionario_id}",
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            # Limpar cache para forçar recarregamento
-                            self._funcionarios = None
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
+                response = self._requisitar('GET', "/api/snapshot", params=params)
+                if response.status_code != 200:
+                    return None
+                
+                data = response.json()
+                versoes = data.get('versoes', {})
+                resultado = {
+                    chave: ColecaoIndexada(item.rastrear() for item in decodificar(chave, data.get(chave, [])))
+                    for chave in COLECOES
+                }
+                for chave, (cache_attr, model_cls) in COLECOES.items():
+                    if chave == 'agendamentos' and data.get('filtrado'):
+                        continue
+                    with self._locks[chave], self._lock_pendencias:
+                        pendentes = self._outbox.registros_pendentes(chave)
+                        if pendentes:
+                            # Gravações ainda não enviadas continuam valendo sobre os dados do servidor
+                            locais = {item.id: item for item in getattr(self, cache_attr) or []
+                                      if item.id in pendentes}
+                            resultado[chave] = ColecaoIndexada(
+                                self._sobrepor_pendencias(chave, model_cls, resultado[chave], locais)
+                            )
+                        setattr(self, cache_attr, resultado[chave])
+                        self._versoes[chave] = versoes.get(chave, 0)
+                        # O ETag guardado se refere ao cache anterior
+                        self._etags.pop(chave, None)
+                        self._nao_validadas.discard(chave)
+                    self._persistir(chave)
+                return resultado
+            except requests.ConnectionError:
+                print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
+                return None
             except Exception as e:
-                print(f"Erro ao deletar funcionário: {e}")
+                print(f"Erro ao carregar dados: {e}")
                 import traceback
                 traceback.print_exc()
-                if callback:
-                    callback(False)
+                return None
         
-        thread = threading.Thread(target=_delete, daemon=True)
-        thread.start()
+        return self._unico(('snapshot', tuple(sorted(params.items()))), _load, callback)
     
-    def delete_servico(self, servico_id: int, callback: Optional[Callable] = None):
-        """Remove um serviço do banco de dados"""
-        def _delete():
+    def save_agendamentos(self, agendamentos: List[Agendamento], callback: Optional[Callable] = None) -> Future:
+        """Salva a lista de agendamentos (envio em segundo plano pela outbox)"""
+        return self._salvar_colecao('agendamentos', agendamentos, callback)
+    
+    def load_disponibilidade(self, funcionario_id: int, data: date, servico_id: Optional[int] = None,
+                             callback: Optional[Callable] = None) -> Future:
+        """
+        Carrega do servidor os horários livres de um funcionário em um dia
+        
+        Args:
+            funcionario_id: ID do funcionário
+            data: Dia consultado
+            servico_id: Serviço desejado (define a duração; padrão 30 minutos)
+            callback: Função chamada com a resposta (dict com 'horarios' e
+                'ocupados', datas já convertidas para datetime) ou None se houver erro
+        """
+        params = {'data': data.strftime('%Y-%m-%d')}
+        if servico_id is not None:
+            params['servico_id'] = servico_id
+        
+        def _load():
             try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando!")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    response = requests.delete(
-                        f"{self.server_url}/api/servicos/{servico_id}",
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            # Limpar cache para forçar recarregamento
-                            self._servicos = None
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
+                response = self._requisitar(
+                    'GET', f"/api/funcionarios/{funcionario_id}/disponibilidade",
+                    params=params
+                )
+                if response.status_code != 200:
+                    return None
+                
+                disponibilidade = response.json()
+                disponibilidade['ocupados'] = [
+                    (datetime.fromisoformat(item['inicio']), datetime.fromisoformat(item['fim']))
+                    for item in disponibilidade['ocupados']
+                ]
+                return disponibilidade
+            except requests.ConnectionError:
+                print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
+                return None
             except Exception as e:
-                print(f"Erro ao deletar serviço: {e}")
+                print(f"Erro ao carregar disponibilidade: {e}")
                 import traceback
                 traceback.print_exc()
-                if callback:
-                    callback(False)
+                return None
+        
+        return self._unico(('disponibilidade', funcionario_id, tuple(sorted(params.items()))), _load, callback)
+    
+    def ocupados_em_cache(self, funcionario_id: int, data: date) -> List[Tuple[datetime, datetime]]:
+        """
+        Intervalos ocupados do funcionário no dia segundo os agendamentos em cache
+        
+        Usado sem servidor, quando a disponibilidade não pode ser carregada:
+        a cópia local pode estar desatualizada, e um conflito que ela não
+        mostra é recusado pelo servidor (409) quando a gravação sair da fila.
+        
+        Args:
+            funcionario_id: ID do funcionário
+            data: Dia consultado
         
-        thread = threading.Thread(target=_delete, daemon=True)
-        thread.start()
+        Returns:
+            Lista de (início, fim) ordenada pelo início (vazia sem cache)
+        """
+        return sorted(
+            (agendamento.horario_inicio, agendamento.horario_fim)
+            for agendamento in self._agendamentos or []
+            if agendamento.funcionario_id == funcionario_id
+            and agendamento.data_agendamento and agendamento.data_agendamento.date() == data
+            and agendamento.status not in STATUS_LIVRES
+            and agendamento.horario_inicio and agendamento.horario_fim
+        )
+    
+    def _buscar_relatorio(self, data_inicial, data_final) -> Optional[dict]:
+        """Busca no servidor o relatório agregado do período (None em caso de erro)"""
+        response = self._requisitar(
+            'GET', "/api/relatorios",
+            params={
+                'inicio': data_inicial.strftime('%Y-%m-%d'),
+                'fim': data_final.strftime('%Y-%m-%d')
+            }
+        )
+        if response.status_code != 200:
+            return None
+        return response.json()
     
-    def load_agendamentos(self, callback: Optional[Callable] = None, force_reload: bool = False) -> List[Agendamento]:
-        """Carrega agendamentos do servidor em thread separada"""
+    def load_relatorio(self, data_inicial: date, data_final: date, callback: Optional[Callable] = None) -> Future:
+        """
+        Carrega do servidor o relatório dos agendamentos concluídos no período
+        
+        Args:
+            data_inicial: Data inicial do período (inclusiva)
+            data_final: Data final do período (inclusiva)
+            callback: Função chamada com o relatório (dict) ou None se houver erro
+        """
         def _load():
             try:
-                with self.lock:
-                    if self._agendamentos is not None and not force_reload:
-                        if callback:
-                            callback(self._agendamentos)
-                        return self._agendamentos
-                    
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        # NÃO seta cache como lista vazia - mantém None para tentar novamente
-                        if callback:
-                            callback([])
-                        return []
-                    
-                    response = requests.get(f"{self.server_url}/api/agendamentos", timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        self._agendamentos = [Agendamento.from_dict(item) for item in data]
-                        if callback:
-                            callback(self._agendamentos)
-                        return self._agendamentos
-                    else:
-                        # Erro na requisição - não seta cache para permitir nova tentativa
-                        if callback:
-                            callback([])
-                        return []
+                return self._buscar_relatorio(data_inicial, data_final)
+            except requests.ConnectionError:
+                print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
+                return None
             except Exception as e:
-                print(f"Erro ao carregar agendamentos: {e}")
+                print(f"Erro ao carregar relatório: {e}")
                 import traceback
                 traceback.print_exc()
-                # NÃO seta cache como lista vazia - mantém None para tentar novamente quando servidor voltar
-                if callback:
-                    callback([])
-                return []
+                return None
         
-        # Se force_reload, limpa o cache antes de recarregar
-        if force_reload:
-            self._agendamentos = None
+        chave = ('relatorio', data_inicial.strftime('%Y-%m-%d'), data_final.strftime('%Y-%m-%d'))
+        return self._unico(chave, _load, callback)
+    
+    def load_dashboard(self, callback: Optional[Callable] = None) -> Future:
+        """
+        Carrega do servidor o resumo do dashboard (uma única requisição)
         
-        if self._agendamentos is None:
-            thread = threading.Thread(target=_load, daemon=True)
-            thread.start()
-            return []
+        O último resumo é guardado com seu ETag; se nada mudou o servidor
+        responde 304 sem recalcular e o resumo guardado é reutilizado.
         
-        if callback:
-            callback(self._agendamentos)
-        return self._agendamentos
-    
-    def save_agendamentos(self, agendamentos: List[Agendamento], callback: Optional[Callable] = None):
-        """Salva agendamentos no servidor em thread separada"""
-        def _save():
+        Args:
+            callback: Função chamada com o resumo (dict com clientes_ativos,
+                funcionarios_ativos, agendamentos_hoje e receita_mensal) ou None se houver erro
+        """
+        def _load():
             try:
-                with self.lock:
-                    if not self._check_server():
-                        print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
-                        if callback:
-                            callback(False)
-                        return
-                    
-                    data = [agendamento.to_dict() for agendamento in agendamentos]
-                    response = requests.post(
-                        f"{self.server_url}/api/agendamentos",
-                        json={'agendamentos': data},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get('success'):
-                            self._agendamentos = agendamentos
-                            if callback:
-                                callback(True)
-                        else:
-                            if callback:
-                                callback(False)
-                    else:
-                        if callback:
-                            callback(False)
+                headers = {}
+                if self._dashboard is not None and self._etags.get('dashboard'):
+                    headers['If-None-Match'] = self._etags['dashboard']
+                response = self._requisitar(
+                    'GET', "/api/dashboard",
+                    params={'data': date.today().strftime('%Y-%m-%d')},
+                    headers=headers
+                )
+                if response.status_code == 304:
+                    # Nada mudou desde a última consulta
+                    return self._dashboard
+                if response.status_code == 200:
+                    self._dashboard = response.json()
+                    self._etags['dashboard'] = response.headers.get('ETag')
+                    if self._cache_local is not None:
+                        self._cache_local.salvar('dashboard', 0, self._etags['dashboard'], self._dashboard)
+                    return self._dashboard
+                return None
+            except requests.ConnectionError:
+                print("ERRO: Servidor não está rodando! Execute 'python server.py' primeiro.")
+                # Último resumo conhecido (do cache local), se houver
+                return self._dashboard
             except Exception as e:
-                print(f"Erro ao salvar agendamentos: {e}")
+                print(f"Erro ao carregar dashboard: {e}")
                 import traceback
                 traceback.print_exc()
-                if callback:
-                    callback(False)
+                return None
         
-        thread = threading.Thread(target=_save, daemon=True)
-        thread.start()
+        return self._unico(('dashboard',), _load, callback)
     
-    def export_relatorio_txt(self, 
-                            clientes: List[Cliente],
-                            funcionarios: List[Funcionario],
-                            servicos: List[Servico],
-                            agendamentos: List[Agendamento],
+    def export_relatorio_txt(self,
                             data_inicial: datetime,
                             data_final: datetime,
                             output_file: str,
-                            callback: Optional[Callable] = None):
+                            callback: Optional[Callable] = None) -> Future:
         """
-        Exporta relatório em formato TXT em thread separada
+        Exporta relatório em formato TXT no executor
+        
+        Os totais são calculados pelo servidor (GET /api/relatorios).
         
         Args:
-            clientes: Lista de clientes
-            funcionarios: Lista de funcionários
-            servicos: Lista de serviços
-            agendamentos: Lista de agendamentos
             data_inicial: Data inicial do período
             data_final: Data final do período
             output_file: Caminho do arquivo de saída
-            callback: Função chamada após exportar (recebe True se sucesso, False se erro)
+            callback: Função chamada após exportar (recebe True e o caminho do
+                arquivo se sucesso, False e a mensagem se erro)
         """
         def _export():
             try:
-                with self.lock:
-                    # Filtrar agendamentos do período (apenas concluídos para relatórios)
-                    agendamentos_periodo = []
-                    data_inicial_date = data_inicial.date() if isinstance(data_inicial, datetime) else data_inicial
-                    data_final_date = data_final.date() if isinstance(data_final, datetime) else data_final
+                relatorio = self._buscar_relatorio(data_inicial, data_final)
+                if relatorio is None:
+                    raise RuntimeError("Não foi possível obter o relatório do servidor")
+                
+                # Gerar relatório
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write("=" * 80 + "\n")
+                    f.write("RELATÓRIO DE VENDAS - BARBEARIA\n")
+                    f.write("=" * 80 + "\n\n")
+                    f.write(f"Período: {data_inicial.strftime('%d/%m/%Y')} a {data_final.strftime('%d/%m/%Y')}\n")
+                    f.write(f"Data de geração: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n")
+                    
+                    f.write("-" * 80 + "\n")
+                    f.write("ESTATÍSTICAS GERAIS\n")
+                    f.write("-" * 80 + "\n")
+                    f.write(f"Total de Clientes Ativos: {relatorio['clientes_ativos']}\n")
+                    f.write(f"Total de Funcionários Ativos: {relatorio['funcionarios_ativos']}\n")
+                    f.write(f"Total de Agendamentos: {relatorio['total_agendamentos']}\n")
+                    f.write(f"Receita Total: R$ {relatorio['receita_total']:.2f}\n\n")
                     
-                    for a in agendamentos:
-                        # Verificar status
-                        if a.status != 'concluido':
-                            continue
-                        
-                        # Verificar se tem data_agendamento
-                        if not a.data_agendamento:
-                            continue
-                        
-                        # Normalizar data_agendamento para date
-                        try:
-                            if isinstance(a.data_agendamento, datetime):
-                                data_agendamento_date = a.data_agendamento.date()
-                            elif isinstance(a.data_agendamento, date):
-                                data_agendamento_date = a.data_agendamento
-                            else:
-                                continue
-                            
-                            # Verificar se está no período (garantir que ambos são date)
-                            if isinstance(data_agendamento_date, date) and isinstance(data_inicial_date, date) and isinstance(data_final_date, date):
-                                if data_inicial_date <= data_agendamento_date <= data_final_date:
-                                    agendamentos_periodo.append(a)
-                        except (AttributeError, TypeError, ValueError):
-                            # Se houver erro na conversão, pular este agendamento
-                            continue
+                    # Relatório de serviços
+                    f.write("-" * 80 + "\n")
+                    f.write("SERVIÇOS MAIS POPULARES\n")
+                    f.write("-" * 80 + "\n")
+                    for item in relatorio['servicos']:
+                        f.write(f"{item['nome']:<40} | Qtd: {item['quantidade']:>3} | Receita: R$ {item['receita']:>10.2f}\n")
                     
-                    # Calcular estatísticas
-                    receita_total = sum(float(a.valor_total) for a in agendamentos_periodo)
-                    clientes_ativos = len([c for c in clientes if c.ativo])
-                    funcionarios_ativos = len([f for f in funcionarios if f.ativo])
+                    f.write("\n")
                     
-                    # Gerar relatório
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write("=" * 80 + "\n")
-                        f.write("RELATÓRIO DE VENDAS - BARBEARIA\n")
-                        f.write("=" * 80 + "\n\n")
-                        f.write(f"Período: {data_inicial.strftime('%d/%m/%Y')} a {data_final.strftime('%d/%m/%Y')}\n")
-                        f.write(f"Data de geração: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n")
-                        
-                        f.write("-" * 80 + "\n")
-                        f.write("ESTATÍSTICAS GERAIS\n")
-                        f.write("-" * 80 + "\n")
-                        f.write(f"Total de Clientes Ativos: {clientes_ativos}\n")
-                        f.write(f"Total de Funcionários Ativos: {funcionarios_ativos}\n")
-                        f.write(f"Total de Agendamentos: {len(agendamentos_periodo)}\n")
-                        f.write(f"Receita Total: R$ {receita_total:.2f}\n\n")
-                        
-                        # Relatório de serviços
-                        from collections import defaultdict
-                        servico_count = defaultdict(int)
-                        servico_receita = defaultdict(float)
-                        
-                        for agendamento in agendamentos_periodo:
-                            servico = next((s for s in servicos if s.id == agendamento.servico_id), None)
-                            if servico:
-                                servico_count[servico.nome] += 1
-                                servico_receita[servico.nome] += float(agendamento.valor_total)
-                        
-                        f.write("-" * 80 + "\n")
-                        f.write("SERVIÇOS MAIS POPULARES\n")
-                        f.write("-" * 80 + "\n")
-                        sorted_servicos = sorted(servico_count.items(), key=lambda x: x[1], reverse=True)
-                        for servico_nome, quantidade in sorted_servicos:
-                            receita = servico_receita[servico_nome]
-                            f.write(f"{servico_nome:<40} | Qtd: {quantidade:>3} | Receita: R$ {receita:>10.2f}\n")
-                        
-                        f.write("\n")
-                        
-                        # Relatório de funcionários
-                        funcionario_count = defaultdict(int)
-                        funcionario_receita = defaultdict(float)
-                        
-                        for agendamento in agendamentos_periodo:
-                            funcionario = next((f for f in funcionarios if f.id == agendamento.funcionario_id), None)
-                            if funcionario:
-                                funcionario_count[funcionario.nome] += 1
-                                funcionario_receita[funcionario.nome] += float(agendamento.valor_total)
-                        
-                        f.write("-" * 80 + "\n")
-                        f.write("PERFORMANCE DOS FUNCIONÁRIOS\n")
-                        f.write("-" * 80 + "\n")
-                        sorted_funcionarios = sorted(funcionario_count.items(), key=lambda x: x[1], reverse=True)
-                        for funcionario_nome, quantidade in sorted_funcionarios:
-                            receita = funcionario_receita[funcionario_nome]
-                            f.write(f"{funcionario_nome:<40} | Agendamentos: {quantidade:>3} | Receita: R$ {receita:>10.2f}\n")
-                        
-                        f.write("\n" + "=" * 80 + "\n")
-                        f.write("FIM DO RELATÓRIO\n")
-                        f.write("=" * 80 + "\n")
+                    # Relatório de funcionários
+                    f.write("-" * 80 + "\n")
+                    f.write("PERFORMANCE DOS FUNCIONÁRIOS\n")
+                    f.write("-" * 80 + "\n")
+                    for item in relatorio['funcionarios']:
+                        f.write(f"{item['nome']:<40} | Agendamentos: {item['quantidade']:>3} | Receita: R$ {item['receita']:>10.2f}\n")
                     
-                    if callback:
-                        callback(True, output_file)
+                    f.write("\n" + "=" * 80 + "\n")
+                    f.write("FIM DO RELATÓRIO\n")
+                    f.write("=" * 80 + "\n")
+                
+                return True, output_file
             except Exception as e:
                 print(f"Erro ao exportar relatório: {e}")
                 import traceback
                 traceback.print_exc()
-                if callback:
-                    callback(False, str(e))
+                return False, str(e)
         
-        thread = threading.Thread(target=_export, daemon=True)
-        thread.start()
+        return self._enviar(_export, (lambda resultado: callback(*resultado)) if callback else None)
 
 
 # Instância global do cliente API
@@ -667,5 +1515,15 @@ def get_api_client() -> ApiClient:
     """Retorna a instância global do cliente API"""
     global _api_client
     if _api_client is None:
-        _api_client = ApiClient()
+        try:
+            cache_local = CacheLocal(caminho_padrao(), SERVER_URL)
+        except Exception as e:
+            print(f"Cache local indisponível: {e}")
+            cache_local = None
+        try:
+            outbox = Outbox(caminho_padrao_outbox())
+        except Exception as e:
+            print(f"Fila de gravações em disco indisponível: {e}")
+            outbox = None
+        _api_client = ApiClient(cache_local=cache_local, outbox=outbox)
     return _api_client
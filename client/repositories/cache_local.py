@@ -0,0 +1,226 @@
+"""
+Cache local persistente do cliente
+
+Guarda em um arquivo SQLite, na pasta de dados do usuário, a última cópia
+de cada coleção recebida do servidor junto com sua versão e ETag. Ao abrir
+a aplicação as telas usam essa cópia imediatamente e o ApiClient a
+revalida em segundo plano (sincronização incremental a partir da versão
+salva). Com o servidor fora do ar os dados salvos continuam disponíveis
+para consulta.
+
+Cada registro das coleções é uma linha da tabela registros, então uma
+gravação ou sincronização regrava apenas os registros alterados, não a
+coleção inteira.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Variável de ambiente que define outro caminho para o arquivo de cache
+VARIAVEL_CAMINHO = "BARBEARIA_CACHE"
+
+# Valor de colecoes.dados das coleções guardadas registro a registro (tabela registros)
+_POR_REGISTRO = 'null'
+
+
+def pasta_dados_usuario() -> str:
+    """Pasta de dados da aplicação conforme o sistema operacional"""
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'Barbearia')
+
+
+def caminho_padrao() -> str:
+    """Caminho do arquivo de cache (BARBEARIA_CACHE ou pasta de dados do usuário)"""
+    return os.environ.get(VARIAVEL_CAMINHO) or os.path.join(pasta_dados_usuario(), 'cache.db')
+
+
+class CacheLocal:
+    """
+    Armazena as coleções do cliente em um arquivo SQLite
+
+    Cada entrada é identificada pelo servidor e pelo nome da coleção, para
+    que servidores diferentes não misturem dados. As coleções guardam um
+    dicionário da API (to_dict do modelo) em JSON por registro, na ordem em
+    que foram gravados; outras entradas (ex: dashboard) guardam o JSON
+    inteiro em colecoes.
+
+    Args:
+        caminho: Arquivo SQLite (criado se não existir)
+        servidor: URL do servidor cujos dados são guardados
+    """
+
+    def __init__(self, caminho: str, servidor: str):
+        self.caminho = caminho
+        self.servidor = servidor
+        self._lock = threading.Lock()
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS colecoes ("
+                " servidor TEXT NOT NULL,"
+                " chave TEXT NOT NULL,"
+                " versao INTEGER NOT NULL DEFAULT 0,"
+                " etag TEXT,"
+                " dados TEXT NOT NULL,"
+                " atualizado_em TEXT NOT NULL,"
+                " PRIMARY KEY (servidor, chave))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS registros ("
+                " servidor TEXT NOT NULL,"
+                " chave TEXT NOT NULL,"
+                " id INTEGER NOT NULL,"
+                " dados TEXT NOT NULL,"
+                " PRIMARY KEY (servidor, chave, id))"
+            )
+            self._migrar_listas(conn)
+
+    @staticmethod
+    def _migrar_listas(conn):
+        """Separa em registros as coleções gravadas como uma lista única (arquivos antigos)"""
+        antigas = conn.execute(
+            "SELECT servidor, chave, dados FROM colecoes WHERE dados LIKE '[%'"
+        ).fetchall()
+        for servidor, chave, dados in antigas:
+            registros = json.loads(dados)
+            conn.executemany(
+                "INSERT OR REPLACE INTO registros (servidor, chave, id, dados) VALUES (?, ?, ?, ?)",
+                [(servidor, chave, registro['id'], _json(registro)) for registro in registros]
+            )
+            conn.execute(
+                "UPDATE colecoes SET dados = ? WHERE servidor = ? AND chave = ?",
+                (_POR_REGISTRO, servidor, chave)
+            )
+
+    @contextmanager
+    def _conectar(self):
+        """Conexão com commit ao final do bloco (rollback em caso de erro)"""
+        conn = sqlite3.connect(self.caminho, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def carregar(self) -> Dict[str, Tuple[int, Optional[str], object]]:
+        """
+        Lê todas as coleções guardadas para o servidor
+
+        Returns:
+            Dicionário chave -> (versão, ETag, dados); vazio se o arquivo
+            estiver ilegível
+        """
+        try:
+            with self._lock, self._conectar() as conn:
+                linhas = conn.execute(
+                    "SELECT chave, versao, etag, dados FROM colecoes WHERE servidor = ?",
+                    (self.servidor,)
+                ).fetchall()
+                registros = conn.execute(
+                    "SELECT chave, dados FROM registros WHERE servidor = ? ORDER BY rowid",
+                    (self.servidor,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao ler o cache local: {e}")
+            return {}
+        por_chave: Dict[str, List] = {}
+        for chave, dados in registros:
+            por_chave.setdefault(chave, []).append(json.loads(dados))
+        return {
+            chave: (versao, etag, por_chave.get(chave, []) if dados == _POR_REGISTRO else json.loads(dados))
+            for chave, versao, etag, dados in linhas
+        }
+
+    def salvar(self, chave: str, versao: int, etag: Optional[str], dados):
+        """
+        Grava (substitui) uma entrada guardada inteira (ex: dashboard)
+
+        Args:
+            chave: Nome da entrada (ex: 'dashboard')
+            versao: Versão do servidor correspondente aos dados
+            etag: ETag da última resposta (ou None)
+            dados: Valor serializável em JSON
+        """
+        try:
+            with self._lock, self._conectar() as conn:
+                self._gravar_entrada(conn, chave, versao, etag, _json(dados))
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar o cache local: {e}")
+
+    def salvar_colecao(self, chave: str, versao: int, etag: Optional[str], registros: Iterable[dict]):
+        """
+        Grava (substitui) todos os registros de uma coleção
+
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            versao: Versão do servidor correspondente aos dados
+            etag: ETag da última resposta (ou None)
+            registros: Dicionários da API (to_dict), na ordem da coleção
+        """
+        linhas = [(self.servidor, chave, registro['id'], _json(registro)) for registro in registros]
+        try:
+            with self._lock, self._conectar() as conn:
+                conn.execute("DELETE FROM registros WHERE servidor = ? AND chave = ?", (self.servidor, chave))
+                conn.executemany("INSERT INTO registros (servidor, chave, id, dados) VALUES (?, ?, ?, ?)", linhas)
+                self._gravar_entrada(conn, chave, versao, etag, _POR_REGISTRO)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar o cache local: {e}")
+
+    def atualizar_colecao(self, chave: str, versao: int, etag: Optional[str],
+                          gravados: Iterable[dict], removidos: Iterable[int] = ()):
+        """
+        Grava só os registros alterados de uma coleção (e sua versão/ETag)
+
+        Args:
+            chave: Nome da coleção (ex: 'clientes')
+            versao: Versão do servidor correspondente aos dados
+            etag: ETag da última resposta (ou None)
+            gravados: Dicionários da API (to_dict) dos registros novos ou alterados
+            removidos: IDs dos registros que saíram da coleção
+        """
+        linhas = [(self.servidor, chave, registro['id'], _json(registro)) for registro in gravados]
+        try:
+            with self._lock, self._conectar() as conn:
+                conn.executemany(
+                    "DELETE FROM registros WHERE servidor = ? AND chave = ? AND id = ?",
+                    [(self.servidor, chave, registro_id) for registro_id in removidos]
+                )
+                # ON CONFLICT mantém o rowid, então o registro não muda de posição
+                conn.executemany(
+                    "INSERT INTO registros (servidor, chave, id, dados) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (servidor, chave, id) DO UPDATE SET dados = excluded.dados",
+                    linhas
+                )
+                self._gravar_entrada(conn, chave, versao, etag, _POR_REGISTRO)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar o cache local: {e}")
+
+    def _gravar_entrada(self, conn, chave: str, versao: int, etag: Optional[str], dados: str):
+        conn.execute(
+            "INSERT OR REPLACE INTO colecoes (servidor, chave, versao, etag, dados, atualizado_em)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (self.servidor, chave, versao, etag, dados, datetime.now().isoformat())
+        )
+
+    def limpar(self):
+        """Remove todas as coleções guardadas para o servidor"""
+        with self._lock, self._conectar() as conn:
+            conn.execute("DELETE FROM colecoes WHERE servidor = ?", (self.servidor,))
+            conn.execute("DELETE FROM registros WHERE servidor = ?", (self.servidor,))
+
+
+def _json(valor) -> str:
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,51 @@
+"""
+Conjunto de alterações de uma coleção
+
+O ChangeSet separa, em uma lista de registros, o que precisa ir para o
+servidor: registros novos (sem ID), enviados inteiros, e registros com
+rastreamento ligado que foram modificados, enviados apenas com os campos
+alterados. Registros rastreados sem alteração ficam de fora.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+from ..models import Rastreavel
+
+
+class ChangeSet:
+    """
+    Registros novos e alterados de uma coleção
+
+    Args:
+        colecao: Nome da coleção (ex: 'clientes')
+        registros: Registros a examinar (opcional; ver adicionar)
+    """
+
+    def __init__(self, colecao: str, registros: Optional[Iterable] = None):
+        self.colecao = colecao
+        self.novos: List = []
+        # (registro, campos alterados); campos None envia o registro inteiro
+        self.alterados: List[Tuple[object, Optional[List[str]]]] = []
+        for registro in registros or []:
+            self.adicionar(registro)
+
+    def adicionar(self, registro):
+        """
+        Inclui o registro se ele precisar ser enviado
+
+        Registros sem ID são novos; registros sem rastreamento não têm como
+        informar o que mudou e são enviados com todos os campos.
+        """
+        if registro.id is None:
+            self.novos.append(registro)
+        elif not isinstance(registro, Rastreavel) or not registro.rastreado:
+            self.alterados.append((registro, None))
+        elif registro.modificado:
+            self.alterados.append((registro, sorted(registro.alterados)))
+
+    @property
+    def vazio(self) -> bool:
+        """Indica se não há nada a enviar"""
+        return not self.novos and not self.alterados
+
+    def __len__(self) -> int:
+        return len(self.novos) + len(self.alterados)
@@ -0,0 +1,100 @@
+"""
+Coleções indexadas dos caches do cliente
+
+As telas cruzam cada agendamento com o cliente, o funcionário e o serviço
+correspondentes; procurar cada um percorrendo a lista deixa a montagem da
+tela proporcional a (linhas x tamanho do cadastro). ColecaoIndexada é uma
+lista comum (as telas continuam iterando e filtrando normalmente) que
+também responde por_id() e por_nome() em O(1).
+
+Os índices são montados na primeira busca depois de uma alteração da
+lista, então várias alterações seguidas (ex: sincronização) custam uma
+única reconstrução. Mudanças feitas nos próprios objetos (ID local trocado
+pelo do servidor, serviço renomeado) não passam pela lista: quem as faz
+chama reindexar().
+"""
+
+from typing import Dict, Iterable, Optional
+
+
+class ColecaoIndexada(list):
+    """
+    Lista de modelos com busca por ID e por nome
+
+    Args:
+        itens: Registros iniciais
+    """
+
+    def __init__(self, itens: Iterable = ()):
+        super().__init__(itens)
+        # Incrementada a cada alteração; os índices guardam a geração em que
+        # foram montados e são refeitos quando ela fica para trás
+        self._geracao = 0
+        self._indices = None
+
+    def reindexar(self):
+        """Descarta os índices (chamar depois de alterar o ID ou o nome de um registro da lista)"""
+        self._geracao += 1
+
+    def _montar(self):
+        geracao = self._geracao
+        indices = self._indices
+        if indices is not None and indices[0] == geracao:
+            return indices
+        por_id: Dict = {}
+        por_nome: Dict = {}
+        ativos_por_nome: Dict = {}
+        for item in list(self):
+            por_id.setdefault(item.id, item)
+            nome = getattr(item, 'nome', None)
+            if nome is not None:
+                # Com nomes repetidos vale o primeiro, como em uma busca linear
+                por_nome.setdefault(nome, item)
+                if getattr(item, 'ativo', True):
+                    ativos_por_nome.setdefault(nome, item)
+        # Uma alteração feita durante a montagem muda a geração e força nova montagem
+        indices = self._indices = (geracao, por_id, por_nome, ativos_por_nome)
+        return indices
+
+    def por_id(self, registro_id, padrao=None):
+        """
+        Registro com o ID informado
+
+        Args:
+            registro_id: ID procurado
+            padrao: Valor retornado se não houver registro com esse ID
+
+        Returns:
+            O registro, ou padrao
+        """
+        return self._montar()[1].get(registro_id, padrao)
+
+    def por_nome(self, nome: str, apenas_ativos: bool = False) -> Optional[object]:
+        """
+        Primeiro registro da lista com o nome informado
+
+        Args:
+            nome: Nome procurado (igualdade exata)
+            apenas_ativos: Ignora registros inativos
+
+        Returns:
+            O registro, ou None
+        """
+        return self._montar()[3 if apenas_ativos else 2].get(nome)
+
+
+def _invalidando(metodo):
+    """Versão do método de list que descarta os índices depois de alterar a lista"""
+    def alterar(self, *args, **kwargs):
+        resultado = metodo(self, *args, **kwargs)
+        self._geracao += 1
+        return resultado
+    alterar.__name__ = metodo.__name__
+    alterar.__doc__ = metodo.__doc__
+    return alterar
+
+
+for _nome in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(ColecaoIndexada, _nome, _invalidando(getattr(list, _nome)))
+del _nome
@@ -0,0 +1,142 @@
+"""
+Conexão HTTP com o servidor
+
+Todas as requisições do cliente passam por uma única requests.Session, que
+mantém as conexões abertas (keep-alive) em um pool e repete as tentativas
+que falharem antes de chegar ao servidor. O disjuntor (circuit breaker)
+acompanha o resultado dessas requisições reais: depois de falhas seguidas
+ele "abre" e as chamadas seguintes falham na hora, sem rede, até que o
+tempo de espera acabe e uma requisição de teste seja liberada. A espera
+dobra a cada nova falha, até ESPERA_MAXIMA.
+"""
+
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Timeout padrão (s) das requisições: (conexão, leitura)
+TIMEOUT_PADRAO = (3, 10)
+
+# Novas tentativas para falhas de conexão e respostas 502/503/504
+TENTATIVAS_PADRAO = 2
+
+# Conexões mantidas abertas com o servidor
+TAMANHO_POOL = 10
+
+# Falhas seguidas que abrem o disjuntor
+LIMITE_FALHAS = 2
+
+# Espera (s) antes de testar o servidor de novo: começa em ESPERA_INICIAL e
+# dobra a cada falha do teste
+ESPERA_INICIAL = 1.0
+ESPERA_MAXIMA = 30.0
+
+
+class ServidorIndisponivel(requests.ConnectionError):
+    """O disjuntor está aberto: o servidor falhou há pouco e não foi contatado"""
+
+
+class Disjuntor:
+    """
+    Disjuntor que registra se o servidor está respondendo
+
+    Estados: 'fechado' (requisições liberadas), 'aberto' (requisições
+    recusadas até reabrir_em) e 'semi_aberto' (uma requisição de teste em
+    andamento; o resultado dela fecha ou reabre o disjuntor).
+
+    Args:
+        limite_falhas: Falhas seguidas que abrem o disjuntor
+        espera_inicial: Primeira espera (s) com o disjuntor aberto
+        espera_maxima: Maior espera (s) entre testes
+    """
+
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    SEMI_ABERTO = 'semi_aberto'
+
+    def __init__(self, limite_falhas: int = LIMITE_FALHAS, espera_inicial: float = ESPERA_INICIAL,
+                 espera_maxima: float = ESPERA_MAXIMA):
+        self.limite_falhas = limite_falhas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self._lock = threading.Lock()
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._espera = espera_inicial
+        self._reabrir_em = 0.0
+        self._ultima_respondeu = True
+
+    @property
+    def disponivel(self) -> bool:
+        """Indica se o servidor respondeu à última tentativa"""
+        return self._ultima_respondeu
+
+    @property
+    def aberto(self) -> bool:
+        """Indica se as requisições estão sendo recusadas agora (sem alterar o estado)"""
+        return self.estado != self.FECHADO and time.monotonic() < self._reabrir_em
+    
+    def permitir(self) -> bool:
+        """Indica se uma requisição pode ser feita agora"""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            agora = time.monotonic()
+            if agora < self._reabrir_em:
+                return False
+            # Espera encerrada: liberar uma requisição de teste. Se ela não
+            # terminar (e nada for registrado) outra é liberada após nova espera
+            self.estado = self.SEMI_ABERTO
+            self._reabrir_em = agora + self._espera
+            return True
+
+    def registrar_sucesso(self):
+        """O servidor respondeu (com qualquer status HTTP)"""
+        with self._lock:
+            self._ultima_respondeu = True
+            self.estado = self.FECHADO
+            self._falhas = 0
+            self._espera = self.espera_inicial
+
+    def registrar_falha(self):
+        """A requisição não chegou ao servidor ou ficou sem resposta"""
+        with self._lock:
+            self._ultima_respondeu = False
+            self._falhas += 1
+            if self.estado == self.SEMI_ABERTO:
+                # O teste falhou: esperar mais antes do próximo
+                self._espera = min(self._espera * 2, self.espera_maxima)
+            elif self.estado == self.ABERTO or self._falhas < self.limite_falhas:
+                return
+            self.estado = self.ABERTO
+            self._reabrir_em = time.monotonic() + self._espera
+
+
+def criar_sessao(tentativas: int = TENTATIVAS_PADRAO, tamanho_pool: int = TAMANHO_POOL) -> requests.Session:
+    """
+    Cria a sessão HTTP compartilhada pelo cliente
+
+    Falhas de conexão (antes do envio) são repetidas em qualquer método;
+    falhas de leitura e respostas 502/503/504 só nos métodos idempotentes
+    (GET, PUT, DELETE...), nunca em POST/PATCH.
+
+    Args:
+        tentativas: Novas tentativas por requisição (0 desativa)
+        tamanho_pool: Conexões mantidas abertas com o servidor
+    """
+    retry = Retry(
+        total=tentativas,
+        connect=tentativas,
+        read=tentativas,
+        status=tentativas,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho_pool, max_retries=retry)
+    sessao = requests.Session()
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
@@ -0,0 +1,288 @@
+"""
+Fila de saída (outbox) das gravações do cliente
+
+Cada criação, alteração ou exclusão feita nas telas é aplicada na hora ao
+cache e registrada aqui como uma pendência; o ApiClient as envia ao
+servidor em segundo plano, na ordem em que foram feitas, mesmo que o
+servidor esteja fora do ar no momento (são reenviadas quando ele voltar).
+
+A fila é gravada em um diário (uma linha JSON acrescentada por mudança,
+com fsync), então sobrevive ao fechamento da aplicação; o diário é
+compactado ao abrir e sempre que a fila esvazia.
+Cada pendência tem um ID único enviado como Idempotency-Key: se a
+resposta de um envio se perder, o reenvio não duplica o registro.
+
+Edições repetidas do mesmo registro que ainda não foram enviadas são
+combinadas em uma única pendência.
+"""
+
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from .cache_local import pasta_dados_usuario
+
+# Variável de ambiente que define outro caminho para o arquivo da fila
+VARIAVEL_CAMINHO = "BARBEARIA_OUTBOX"
+
+# Linhas acrescentadas ao diário antes de reescrevê-lo compactado
+COMPACTAR_APOS = 1000
+
+# Campo dos agendamentos que referencia cada coleção (para trocar IDs locais)
+CHAVES_ESTRANGEIRAS = {
+    'clientes': 'cliente_id',
+    'funcionarios': 'funcionario_id',
+    'servicos': 'servico_id',
+}
+
+
+def caminho_padrao() -> str:
+    """Caminho do arquivo da fila (BARBEARIA_OUTBOX ou pasta de dados do usuário)"""
+    return os.environ.get(VARIAVEL_CAMINHO) or os.path.join(pasta_dados_usuario(), 'outbox.json')
+
+
+@dataclass
+class Pendencia:
+    """
+    Gravação aguardando envio ao servidor
+
+    metodo 'POST' cria um registro (registro_id é o ID local, negativo, até
+    o servidor atribuir o definitivo); 'PATCH' e 'DELETE' alteram/removem o
+    registro registro_id.
+    """
+    colecao: str
+    metodo: str
+    registro_id: int
+    dados: dict = field(default_factory=dict)
+    campos: Optional[List[str]] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    tentativas: int = 0
+    criado_em: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Pendencia':
+        return cls(**data)
+
+
+class Outbox:
+    """
+    Fila persistente de pendências
+
+    O arquivo é um diário (uma linha JSON por mudança, só acrescentada): a
+    primeira linha é o estado completo da fila e as seguintes, as operações
+    feitas depois dele. Cada gravação custa uma linha, e não a fila inteira.
+    O diário é compactado (reescrito como uma única linha de estado) ao
+    abrir, quando a fila esvazia e a cada COMPACTAR_APOS operações.
+
+    Args:
+        caminho: Arquivo da fila (None mantém a fila apenas na memória)
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._pendencias: List[Pendencia] = []
+        self._ultimo_id_local = 0
+        self._operacoes = 0  # linhas acrescentadas desde a última compactação
+        if caminho:
+            pasta = os.path.dirname(caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            self._ler()
+            self._compactar()
+
+    def _ler(self):
+        if not os.path.exists(self.caminho):
+            return
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                linhas = f.read().splitlines()
+        except OSError as e:
+            print(f"Erro ao ler a fila de gravações pendentes: {e}")
+            return
+        for numero, linha in enumerate(linhas):
+            if not linha.strip():
+                continue
+            try:
+                self._aplicar(json.loads(linha))
+            except (ValueError, TypeError, KeyError) as e:
+                # A última linha pode estar incompleta (aplicação fechada durante a gravação)
+                if numero < len(linhas) - 1:
+                    print(f"Erro ao ler a fila de gravações pendentes (linha {numero + 1}): {e}")
+
+    def _aplicar(self, operacao: dict):
+        """Refaz na memória uma linha do diário"""
+        tipo = operacao.get('op')
+        if tipo is None:
+            # Estado completo (também o formato do arquivo nas versões anteriores)
+            self._pendencias = [Pendencia.from_dict(item) for item in operacao.get('pendencias', [])]
+            self._ultimo_id_local = operacao.get('ultimo_id_local', 0)
+        elif tipo == 'adicionar':
+            pendencia = Pendencia.from_dict(operacao['pendencia'])
+            self._pendencias.append(pendencia)
+            # Os IDs locais não são registrados um a um: basta não reutilizar os da fila
+            self._ultimo_id_local = min(self._ultimo_id_local, pendencia.registro_id)
+        elif tipo == 'atualizar':
+            pendencia = Pendencia.from_dict(operacao['pendencia'])
+            self._pendencias = [pendencia if p.id == pendencia.id else p for p in self._pendencias]
+        elif tipo == 'remover':
+            ids = set(operacao['ids'])
+            self._pendencias = [p for p in self._pendencias if p.id not in ids]
+        elif tipo == 'tentativa':
+            for pendencia in self._pendencias:
+                if pendencia.id == operacao['id']:
+                    pendencia.tentativas += 1
+        elif tipo == 'substituir_id':
+            self._substituir_id(operacao['colecao'], operacao['id_local'], operacao['id_definitivo'])
+        else:
+            raise ValueError(f"operação desconhecida: {tipo}")
+
+    def _registrar(self, *operacoes: dict):
+        """Acrescenta operações ao diário (chamar com o lock adquirido)"""
+        if not self.caminho:
+            return
+        if not self._pendencias or self._operacoes + len(operacoes) > COMPACTAR_APOS:
+            self._compactar()
+            return
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            for operacao in operacoes:
+                f.write(json.dumps(operacao, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._operacoes += len(operacoes)
+
+    def _compactar(self):
+        """Reescreve o diário como uma única linha com o estado atual (chamar com o lock adquirido)"""
+        if not self.caminho:
+            return
+        temporario = self.caminho + '.tmp'
+        data = {
+            'ultimo_id_local': self._ultimo_id_local,
+            'pendencias': [p.to_dict() for p in self._pendencias],
+        }
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+        self._operacoes = 0
+
+    def novo_id_local(self) -> int:
+        """
+        ID negativo para um registro criado antes de o servidor atribuir o definitivo
+
+        Não grava no diário: o ID chega ao arquivo com a pendência de criação.
+        """
+        with self._lock:
+            self._ultimo_id_local -= 1
+            return self._ultimo_id_local
+
+    def adicionar(self, nova: Pendencia) -> Optional[Pendencia]:
+        """
+        Registra uma gravação, combinando-a com a pendência anterior do mesmo
+        registro quando esta ainda não foi enviada
+
+        - PATCH após POST/PATCH: os campos são mesclados na pendência existente
+        - DELETE após POST: as duas se anulam (o servidor nunca viu o registro)
+        - DELETE após PATCH: a alteração é descartada e a exclusão registrada
+
+        Returns:
+            A pendência que será enviada (nova ou combinada), ou None se a
+            gravação anulou uma criação ainda não enviada
+        """
+        with self._lock:
+            anterior = self._ultima_do_registro(nova.colecao, nova.registro_id)
+            resultado = nova
+            operacoes = [{'op': 'adicionar', 'pendencia': nova.to_dict()}]
+            if anterior is not None and anterior.tentativas == 0:
+                if nova.metodo == 'PATCH' and anterior.metodo in ('POST', 'PATCH'):
+                    anterior.dados.update(nova.dados)
+                    if anterior.metodo == 'PATCH':
+                        if anterior.campos is None or nova.campos is None:
+                            anterior.campos = None
+                        else:
+                            anterior.campos = sorted(set(anterior.campos) | set(nova.campos))
+                    resultado = anterior
+                    operacoes = [{'op': 'atualizar', 'pendencia': anterior.to_dict()}]
+                elif nova.metodo == 'DELETE' and anterior.metodo == 'POST':
+                    self._pendencias.remove(anterior)
+                    resultado = None
+                    operacoes = [{'op': 'remover', 'ids': [anterior.id]}]
+                elif nova.metodo == 'DELETE' and anterior.metodo == 'PATCH':
+                    self._pendencias.remove(anterior)
+                    self._pendencias.append(nova)
+                    operacoes.insert(0, {'op': 'remover', 'ids': [anterior.id]})
+                else:
+                    self._pendencias.append(nova)
+            else:
+                self._pendencias.append(nova)
+            self._registrar(*operacoes)
+            return resultado
+
+    def _ultima_do_registro(self, colecao: str, registro_id: int) -> Optional[Pendencia]:
+        for pendencia in reversed(self._pendencias):
+            if pendencia.colecao == colecao and pendencia.registro_id == registro_id:
+                return pendencia
+        return None
+
+    def primeira(self) -> Optional[Pendencia]:
+        """Próxima pendência a enviar (a mais antiga)"""
+        with self._lock:
+            return self._pendencias[0] if self._pendencias else None
+
+    def registrar_tentativa(self, pendencia: Pendencia):
+        """Marca a pendência como enviada ao menos uma vez (não é mais combinada)"""
+        with self._lock:
+            pendencia.tentativas += 1
+            self._registrar({'op': 'tentativa', 'id': pendencia.id})
+
+    def concluir(self, pendencia: Pendencia):
+        """Remove da fila uma pendência confirmada (ou recusada) pelo servidor"""
+        with self._lock:
+            if pendencia in self._pendencias:
+                self._pendencias.remove(pendencia)
+                self._registrar({'op': 'remover', 'ids': [pendencia.id]})
+
+    def descartar(self, colecao: str, registro_id: int):
+        """Remove todas as pendências de um registro (ex: criação recusada pelo servidor)"""
+        with self._lock:
+            ids = [p.id for p in self._pendencias if p.colecao == colecao and p.registro_id == registro_id]
+            if ids:
+                self._pendencias = [p for p in self._pendencias if p.id not in ids]
+                self._registrar({'op': 'remover', 'ids': ids})
+
+    def substituir_id(self, colecao: str, id_local: int, id_definitivo: int):
+        """Troca o ID local pelo atribuído pelo servidor nas pendências seguintes"""
+        with self._lock:
+            self._substituir_id(colecao, id_local, id_definitivo)
+            self._registrar({'op': 'substituir_id', 'colecao': colecao,
+                             'id_local': id_local, 'id_definitivo': id_definitivo})
+
+    def _substituir_id(self, colecao: str, id_local: int, id_definitivo: int):
+        chave_estrangeira = CHAVES_ESTRANGEIRAS.get(colecao)
+        for pendencia in self._pendencias:
+            if pendencia.colecao == colecao and pendencia.registro_id == id_local:
+                pendencia.registro_id = id_definitivo
+            if (chave_estrangeira and pendencia.colecao == 'agendamentos'
+                    and pendencia.dados.get(chave_estrangeira) == id_local):
+                pendencia.dados[chave_estrangeira] = id_definitivo
+
+    def pendentes(self, colecao: Optional[str] = None) -> List[Pendencia]:
+        """Cópia da fila (de uma coleção ou de todas)"""
+        with self._lock:
+            return [p for p in self._pendencias if colecao is None or p.colecao == colecao]
+
+    def registros_pendentes(self, colecao: str) -> Dict[int, str]:
+        """IDs da coleção com gravação pendente -> método da última pendência"""
+        with self._lock:
+            return {p.registro_id: p.metodo for p in self._pendencias if p.colecao == colecao}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pendencias)
@@ -1,10 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import List, Optional, Tuple, Callable
-from ..models import Agendamento, Cliente, Funcionario, Servico
-from datetime import datetime, timedelta, date
+from ..models import Agendamento
+from datetime import datetime, timedelta
 from decimal import Decimal
-from ..repositories import get_api_client
+from ..repositories import get_api_client, ColecaoIndexada
 from ..utils import bind_date_mask, bind_time_mask, DateMask, TimeMask
 from .loading_widget import LoadingWidget
 
@@ -13,10 +13,11 @@ class AgendamentosWidget:
     
     def __init__(self, parent, dashboard_callback=None):
         self.parent = parent
-        self.agendamentos: List[Agendamento] = []
-        self.clientes: List[Cliente] = []
-        self.funcionarios: List[Funcionario] = []
-        self.servicos: List[Servico] = []
+        self.agendamentos_filtrados: ColecaoIndexada = ColecaoIndexada()  # Resultado dos filtros aplicados no servidor
+        # Cadastros com busca por ID (e serviço por nome) para montar a lista
+        self.clientes: ColecaoIndexada = ColecaoIndexada()
+        self.funcionarios: ColecaoIndexada = ColecaoIndexada()
+        self.servicos: ColecaoIndexada = ColecaoIndexada()
         self.api_client = get_api_client()
         self.dashboard_callback = dashboard_callback  # Callback para notificar dashboard
         self.loading_widget = None
@@ -183,9 +184,8 @@ class AgendamentosWidget:
         needs_loading = (
             (self.api_client._clientes is None or
              self.api_client._funcionarios is None or
-             self.api_client._servicos is None or
-             self.api_client._agendamentos is None) and
-            len(self.agendamentos) == 0
+             self.api_client._servicos is None) and
+            len(self.agendamentos_filtrados) == 0
         )
         
         if needs_loading and self.loading_widget is None and hasattr(self, 'treeview_container'):
@@ -198,6 +198,12 @@ class AgendamentosWidget:
         # NÃO limpar listas - manter dados antigos visíveis até novos chegarem
         # Isso evita que a interface fique "nugada" durante carregamento
         
+        if needs_loading:
+            # Primeira abertura: clientes, funcionários, serviços e a lista
+            # filtrada chegam juntos em uma única requisição
+            self.load_snapshot()
+            return
+        
         def on_clientes_loaded(clientes):
             if clientes is not None:  # Atualizar apenas se houver dados válidos
                 self.clientes = clientes
@@ -213,11 +219,6 @@ class AgendamentosWidget:
                 self.servicos = servicos
                 root.after(0, check_all_loaded)
         
-        def on_agendamentos_loaded(agendamentos):
-            if agendamentos is not None:  # Atualizar apenas se houver dados válidos
-                self.agendamentos = agendamentos
-                root.after(0, check_all_loaded)
-        
         loaded_count = [0]
         def check_all_loaded():
             # Verificar se o widget ainda existe antes de atualizar
@@ -228,7 +229,7 @@ class AgendamentosWidget:
                 return
             
             loaded_count[0] += 1
-            if loaded_count[0] == 4:
+            if loaded_count[0] == 3:
                 # Esconder loading e mostrar treeview quando todos os dados carregarem
                 if self.loading_widget:
                     def hide_and_show():
@@ -255,14 +256,66 @@ class AgendamentosWidget:
                     pass
         
         # Carregar dados do banco de dados (sem force_reload para usar cache quando disponível)
-        # Isso torna o carregamento muito mais rápido se os dados já estiverem em cache
+        # Isso torna o carregamento muito mais rápido se os dados já estiverem em cache.
+        # Os agendamentos da lista vêm filtrados do servidor (refresh_agendamentos_list)
+        # e os diálogos consultam a disponibilidade diretamente no servidor.
         self.api_client.load_clientes(on_clientes_loaded)
         self.api_client.load_funcionarios(on_funcionarios_loaded)
         self.api_client.load_servicos(on_servicos_loaded)
-        self.api_client.load_agendamentos(on_agendamentos_loaded, force_reload=False)
+    
+    def load_snapshot(self):
+        """Carrega todos os dados da tela com GET /api/snapshot (filtros atuais)"""
+        root = self.parent.winfo_toplevel()
+        
+        def on_snapshot_loaded(dados):
+            def update_gui():
+                try:
+                    if not hasattr(self, 'main_frame') or not self.main_frame.winfo_exists():
+                        return
+                except:
+                    return
+                
+                if self.loading_widget:
+                    self.loading_widget.hide()
+                    self.loading_widget = None
+                    self.agendamentos_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+                if dados is None:
+                    return  # Erro: manter dados atuais
+                self.clientes = dados['clientes']
+                self.funcionarios = dados['funcionarios']
+                self.servicos = dados['servicos']
+                self.agendamentos_filtrados = dados['agendamentos']
+                self.render_agendamentos_list()
+            root.after(0, update_gui)
+        
+        self.api_client.load_snapshot(self.get_filtros(), on_snapshot_loaded)
+    
+    def on_dados_alterados(self, entidade: str):
+        """Atualiza a lista quando os dados são alterados em qualquer terminal"""
+        if entidade == 'agendamentos':
+            self.refresh_agendamentos_list()
+        else:
+            # Nomes de clientes, funcionários ou serviços exibidos na lista
+            self.load_data_from_files()
     
     def refresh_agendamentos_list(self):
-        """Atualiza a lista de agendamentos"""
+        """Atualiza a lista de agendamentos buscando no servidor os que atendem aos filtros"""
+        # Verificar se o widget ainda existe
+        try:
+            if not hasattr(self, 'agendamentos_tree') or not self.agendamentos_tree.winfo_exists():
+                return
+        except:
+            return
+        
+        root = self.parent.winfo_toplevel()
+        def on_filtered_loaded(agendamentos):
+            self.agendamentos_filtrados = agendamentos
+            root.after(0, self.render_agendamentos_list)
+        
+        self.get_filtered_agendamentos(on_filtered_loaded)
+    
+    def render_agendamentos_list(self):
+        """Preenche a lista com os agendamentos filtrados"""
         # Verificar se o widget ainda existe
         try:
             if not hasattr(self, 'agendamentos_tree') or not self.agendamentos_tree.winfo_exists():
@@ -277,14 +330,13 @@ class AgendamentosWidget:
         except:
             return
         
-        # Aplicar filtros
-        filtered_agendamentos = self.get_filtered_agendamentos()
-        
+        # Agendamentos com alteração ainda não enviada ao servidor
+        pendentes = self.api_client.ids_pendentes('agendamentos')
         # Adicionar agendamentos
-        for agendamento in filtered_agendamentos:
-            cliente = next((c for c in self.clientes if c.id == agendamento.cliente_id), None)
-            funcionario = next((f for f in self.funcionarios if f.id == agendamento.funcionario_id), None)
-            servico = next((s for s in self.servicos if s.id == agendamento.servico_id), None)
+        for agendamento in self.agendamentos_filtrados:
+            cliente = self.clientes.por_id(agendamento.cliente_id)
+            funcionario = self.funcionarios.por_id(agendamento.funcionario_id)
+            servico = self.servicos.por_id(agendamento.servico_id)
             
             if cliente and funcionario and servico:
                 data_str = agendamento.data_agendamento.strftime("%d/%m/%Y") if agendamento.data_agendamento else ""
@@ -292,6 +344,9 @@ class AgendamentosWidget:
                 status_str = agendamento.status.replace('_', ' ').title()
                 valor_str = f"R$ {agendamento.valor_total:.2f}"
                 
+                if agendamento.id in pendentes:
+                    data_str = f"⏳ {data_str}"
+                
                 item = self.agendamentos_tree.insert('', 'end', values=(
                     data_str,
                     hora_str,
@@ -302,35 +357,15 @@ class AgendamentosWidget:
                     valor_str
                 ), tags=(agendamento.id,))
     
-    def get_filtered_agendamentos(self):
-        """Retorna agendamentos filtrados"""
-        filtered = self.agendamentos.copy()
+    def get_filtros(self) -> dict:
+        """Monta os filtros da tela no formato aceito pelo servidor"""
+        filtros = {}
         
         # Filtro por data
         try:
             data_filtro = datetime.strptime(self.data_var.get(), "%d/%m/%Y").date()
-            filtered_agendamentos = []
-            for a in filtered:
-                if not a.data_agendamento:
-                    continue
-                
-                # Normalizar data_agendamento para date
-                try:
-                    if isinstance(a.data_agendamento, datetime):
-                        data_agendamento_date = a.data_agendamento.date()
-                    elif isinstance(a.data_agendamento, date):
-                        data_agendamento_date = a.data_agendamento
-                    else:
-                        continue
-                    
-                    # Comparar apenas se ambos forem date
-                    if isinstance(data_agendamento_date, date) and isinstance(data_filtro, date):
-                        if data_agendamento_date == data_filtro:
-                            filtered_agendamentos.append(a)
-                except (AttributeError, TypeError, ValueError):
-                    continue
-            
-            filtered = filtered_agendamentos
+            filtros['data_inicio'] = data_filtro
+            filtros['data_fim'] = data_filtro
         except ValueError:
             pass  # Se data inválida, não filtrar por data
         
@@ -345,9 +380,17 @@ class AgendamentosWidget:
                 'Cancelado': 'cancelado'
             }
             if status_filtro in status_map:
-                filtered = [a for a in filtered if a.status == status_map[status_filtro]]
+                filtros['status'] = status_map[status_filtro]
         
-        return filtered
+        return filtros
+    
+    def get_filtered_agendamentos(self, callback: Callable[[List[Agendamento]], None]):
+        """Busca no servidor os agendamentos que atendem aos filtros (resultado entregue no callback)"""
+        filtros = self.get_filtros()
+        if filtros:
+            self.api_client.load_agendamentos(callback, filtros=filtros)
+        else:
+            self.api_client.load_agendamentos(callback)
     
     def apply_filters(self):
         """Aplica os filtros"""
@@ -367,15 +410,15 @@ class AgendamentosWidget:
             agendamento_id = item['tags'][0] if item['tags'] else None
             
             if agendamento_id:
-                agendamento = next((a for a in self.agendamentos if a.id == agendamento_id), None)
+                agendamento = self.agendamentos_filtrados.por_id(agendamento_id)
                 if agendamento:
                     self.show_agendamento_details(agendamento)
     
     def show_agendamento_details(self, agendamento: Agendamento):
         """Mostra detalhes do agendamento"""
-        cliente = next((c for c in self.clientes if c.id == agendamento.cliente_id), None)
-        funcionario = next((f for f in self.funcionarios if f.id == agendamento.funcionario_id), None)
-        servico = next((s for s in self.servicos if s.id == agendamento.servico_id), None)
+        cliente = self.clientes.por_id(agendamento.cliente_id)
+        funcionario = self.funcionarios.por_id(agendamento.funcionario_id)
+        servico = self.servicos.por_id(agendamento.servico_id)
         
         if cliente and funcionario and servico:
             details = f"""
@@ -400,22 +443,12 @@ Observações: {agendamento.observacoes or 'Nenhuma'}
             self.clientes,
             self.funcionarios,
             self.servicos,
-            self.agendamentos,
             self.on_agendamento_created
         )
     
     def on_agendamento_created(self, agendamento: Agendamento):
         """Callback quando um novo agendamento é criado"""
-        # Adicionar novo agendamento à lista
-        if not self.agendamentos:
-            agendamento.id = 1
-        else:
-            max_id = max((a.id for a in self.agendamentos if a.id), default=0)
-            agendamento.id = max_id + 1
-        
-        self.agendamentos.append(agendamento)
-        
-        # Salvar agendamentos
+        # Salvar apenas o novo agendamento (ID será atribuído pelo servidor)
         root = self.parent.winfo_toplevel()
         def on_save_complete(success):
             if success:
@@ -429,7 +462,27 @@ Observações: {agendamento.observacoes or 'Nenhuma'}
             else:
                 root.after(0, lambda: messagebox.showerror("Erro", "Erro ao salvar agendamento."))
         
-        self.api_client.save_agendamentos(self.agendamentos, on_save_complete)
+        self.api_client.create_agendamento(agendamento, on_save_complete, self._on_conflito_horario)
+    
+    def _on_conflito_horario(self, conflitos: list):
+        """Informa que o servidor recusou o agendamento por conflito de horário"""
+        horarios = []
+        for conflito in conflitos:
+            existente = conflito.get('conflita_com', {})
+            try:
+                inicio = datetime.fromisoformat(existente['horario_inicio'])
+                fim = datetime.fromisoformat(existente['horario_fim'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            horarios.append(f"{inicio.strftime('%d/%m/%Y %H:%M')} às {fim.strftime('%H:%M')}")
+        
+        mensagem = "O barbeiro já possui agendamento nesse horário"
+        if horarios:
+            mensagem += ":\n" + "\n".join(horarios)
+        mensagem += "\n\nO agendamento não foi salvo. Escolha outro horário."
+        
+        root = self.parent.winfo_toplevel()
+        root.after(0, lambda: messagebox.showerror("Conflito de horário", mensagem))
     
     def edit_agendamento(self):
         """Edita um agendamento selecionado"""
@@ -445,7 +498,7 @@ Observações: {agendamento.observacoes or 'Nenhuma'}
             messagebox.showerror("Erro", "Não foi possível identificar o agendamento.")
             return
         
-        agendamento = next((a for a in self.agendamentos if a.id == agendamento_id), None)
+        agendamento = self.agendamentos_filtrados.por_id(agendamento_id)
         if not agendamento:
             messagebox.showerror("Erro", "Agendamento não encontrado.")
             return
@@ -456,19 +509,12 @@ Observações: {agendamento.observacoes or 'Nenhuma'}
             self.clientes,
             self.funcionarios,
             self.servicos,
-            self.agendamentos,
             self.on_agendamento_updated
         )
     
     def on_agendamento_updated(self, agendamento_atualizado: Agendamento):
         """Callback quando um agendamento é atualizado"""
-        # Encontrar e atualizar o agendamento na lista
-        for i, agendamento in enumerate(self.agendamentos):
-            if agendamento.id == agendamento_atualizado.id:
-                self.agendamentos[i] = agendamento_atualizado
-                break
-        
-        # Salvar agendamentos
+        # Salvar apenas os campos editáveis do agendamento
         root = self.parent.winfo_toplevel()
         def on_save_complete(success):
             if success:
@@ -482,22 +528,28 @@ Observações: {agendamento.observacoes or 'Nenhuma'}
             else:
                 root.after(0, lambda: messagebox.showerror("Erro", "Erro ao salvar agendamento."))
         
-        self.api_client.save_agendamentos(self.agendamentos, on_save_complete)
+        self.api_client.update_agendamento(agendamento_atualizado, ['status', 'observacoes'], on_save_complete,
+                                           self._on_conflito_horario)
 
 
 class NovoAgendamentoDialog:
     """Diálogo para criar novo agendamento com validações"""
     
-    def __init__(self, parent, clientes: List[Cliente], funcionarios: List[Funcionario], 
-                 servicos: List[Servico], agendamentos: List[Agendamento], 
+    def __init__(self, parent, clientes: ColecaoIndexada, funcionarios: ColecaoIndexada, 
+                 servicos: ColecaoIndexada, 
                  callback: Optional[Callable[[Agendamento], None]] = None):
         self.parent = parent
         self.clientes = clientes
         self.funcionarios = funcionarios
         self.servicos = servicos
-        self.agendamentos = agendamentos
         self.callback = callback
         self.result = None
+        self.api_client = get_api_client()
+        
+        # Agenda do barbeiro carregada do servidor e a consulta
+        # (funcionario_id, data, servico_id) a que ela corresponde
+        self.disponibilidade: Optional[dict] = None
+        self.consulta_disponibilidade: Optional[tuple] = None
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Novo Agendamento")
@@ -610,7 +662,7 @@ class NovoAgendamentoDialog:
         if servico_selecionado:
             # Extrair nome do serviço
             servico_nome = servico_selecionado.split(" - ")[0]
-            servico = next((s for s in self.servicos if s.nome == servico_nome and s.ativo), None)
+            servico = self.servicos.por_nome(servico_nome, apenas_ativos=True)
             if servico:
                 self.duracao_label.config(text=f"{servico.duracao_minutos} minutos")
                 self.valor_label.config(text=f"R$ {servico.preco:.2f}")
@@ -627,6 +679,8 @@ class NovoAgendamentoDialog:
     def update_horarios_disponiveis(self):
         """Atualiza a lista de horários disponíveis para o funcionário selecionado"""
         self.horarios_listbox.delete(0, tk.END)
+        self.consulta_disponibilidade = None
+        self.disponibilidade = None
         
         funcionario_selecionado = self.funcionario_var.get()
         if not funcionario_selecionado:
@@ -645,74 +699,41 @@ class NovoAgendamentoDialog:
         except ValueError:
             return
         
-        # Obter agendamentos existentes do funcionário na data
-        agendamentos_funcionario = []
-        for a in self.agendamentos:
-            if a.funcionario_id != funcionario_id:
-                continue
-            if a.status in ['cancelado', 'concluido']:
-                continue
-            
-            # Normalizar data_agendamento para date
-            if not a.data_agendamento:
-                continue
-            
-            try:
-                if isinstance(a.data_agendamento, datetime):
-                    data_agendamento_date = a.data_agendamento.date()
-                elif isinstance(a.data_agendamento, date):
-                    data_agendamento_date = a.data_agendamento
-                else:
-                    continue
-                
-                # Comparar apenas se ambos forem date
-                if isinstance(data_agendamento_date, date) and isinstance(data_agendamento, date):
-                    if data_agendamento_date == data_agendamento:
-                        agendamentos_funcionario.append(a)
-            except (AttributeError, TypeError, ValueError):
-                continue
-        
-        # Obter serviço selecionado para calcular duração
+        # Obter serviço selecionado para calcular duração (padrão do servidor: 30 min)
+        servico_id = None
         servico_selecionado = self.servico_var.get()
-        duracao_minutos = 30  # padrão
         if servico_selecionado:
+            servico_nome = servico_selecionado.split(" - ")[0]
+            servico = self.servicos.por_nome(servico_nome, apenas_ativos=True)
+            if servico:
+                servico_id = servico.id
+        
+        consulta = (funcionario_id, data_agendamento, servico_id)
+        self.consulta_disponibilidade = consulta
+        
+        def on_disponibilidade_loaded(disponibilidade):
             try:
-                servico_nome = servico_selecionado.split(" - ")[0]
-                servico = next((s for s in self.servicos if s.nome == servico_nome and s.ativo), None)
-                if servico:
-                    duracao_minutos = servico.duracao_minutos
-            except:
-                pass
-        
-        # Horário de funcionamento (8h às 18h)
-        hora_inicio = 8
-        hora_fim = 18
-        
-        # Gerar horários disponíveis
-        horarios_disponiveis = []
-        for hora in range(hora_inicio, hora_fim):
-            for minuto in [0, 30]:
-                horario = datetime.combine(data_agendamento, datetime.min.time().replace(hour=hora, minute=minuto))
-                horario_fim_sugerido = horario + timedelta(minutes=duracao_minutos)
-                
-                # Verificar se o horário de término está dentro do horário de funcionamento
-                if horario_fim_sugerido.hour > hora_fim or (horario_fim_sugerido.hour == hora_fim and horario_fim_sugerido.minute > 0):
-                    continue
-                
-                # Verificar se há conflito
-                conflito = False
-                for agendamento in agendamentos_funcionario:
-                    if agendamento.horario_inicio and agendamento.horario_fim:
-                        # Verificar sobreposição
-                        if (horario < agendamento.horario_fim and horario_fim_sugerido > agendamento.horario_inicio):
-                            conflito = True
-                            break
-                
-                if not conflito:
-                    horarios_disponiveis.append(horario.strftime("%H:%M"))
+                self.dialog.after(0, lambda: self.show_horarios_disponiveis(consulta, disponibilidade))
+            except (tk.TclError, RuntimeError):
+                pass  # Diálogo já foi fechado
         
-        # Adicionar à lista
-        for horario in horarios_disponiveis:
+        # Horários livres calculados pelo servidor a partir da agenda do barbeiro no dia
+        self.api_client.load_disponibilidade(funcionario_id, data_agendamento, servico_id, on_disponibilidade_loaded)
+    
+    def show_horarios_disponiveis(self, consulta: tuple, disponibilidade: Optional[dict]):
+        """Exibe os horários livres recebidos do servidor"""
+        # Ignorar respostas de uma seleção anterior de barbeiro/data/serviço
+        if consulta != self.consulta_disponibilidade or disponibilidade is None:
+            return
+        try:
+            if not self.horarios_listbox.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        
+        self.disponibilidade = disponibilidade
+        self.horarios_listbox.delete(0, tk.END)
+        for horario in disponibilidade['horarios']:
             self.horarios_listbox.insert(tk.END, horario)
     
     def validate(self) -> Tuple[bool, str]:
@@ -727,8 +748,8 @@ class NovoAgendamentoDialog:
         except (IndexError, ValueError):
             return False, "Cliente inválido."
         
-        cliente = next((c for c in self.clientes if c.id == cliente_id and c.ativo), None)
-        if not cliente:
+        cliente = self.clientes.por_id(cliente_id)
+        if not cliente or not cliente.ativo:
             return False, "Cliente não encontrado ou inativo."
         
         # Validar funcionário
@@ -741,8 +762,8 @@ class NovoAgendamentoDialog:
         except (IndexError, ValueError):
             return False, "Barbeiro inválido."
         
-        funcionario = next((f for f in self.funcionarios if f.id == funcionario_id and f.ativo), None)
-        if not funcionario:
+        funcionario = self.funcionarios.por_id(funcionario_id)
+        if not funcionario or not funcionario.ativo:
             return False, "Barbeiro não encontrado ou inativo."
         
         # Validar serviço
@@ -751,7 +772,7 @@ class NovoAgendamentoDialog:
             return False, "Selecione um serviço."
         
         servico_nome = servico_selecionado.split(" - ")[0]
-        servico = next((s for s in self.servicos if s.nome == servico_nome and s.ativo), None)
+        servico = self.servicos.por_nome(servico_nome, apenas_ativos=True)
         if not servico:
             return False, "Serviço não encontrado ou inativo."
         
@@ -797,38 +818,21 @@ class NovoAgendamentoDialog:
         if horario_inicio.hour < 8 or horario_fim.hour > 18 or (horario_fim.hour == 18 and horario_fim.minute > 0):
             return False, "Horário fora do horário de funcionamento (8h às 18h)."
         
-        # Validar conflito de horário
-        agendamentos_funcionario = []
-        for a in self.agendamentos:
-            if a.funcionario_id != funcionario_id:
-                continue
-            if a.status in ['cancelado', 'concluido']:
-                continue
-            
-            # Normalizar data_agendamento para date
-            if not a.data_agendamento:
-                continue
-            
-            try:
-                if isinstance(a.data_agendamento, datetime):
-                    data_agendamento_date = a.data_agendamento.date()
-                elif isinstance(a.data_agendamento, date):
-                    data_agendamento_date = a.data_agendamento
-                else:
-                    continue
-                
-                # Comparar apenas se ambos forem date
-                if isinstance(data_agendamento_date, date) and isinstance(data_agendamento, date):
-                    if data_agendamento_date == data_agendamento:
-                        agendamentos_funcionario.append(a)
-            except (AttributeError, TypeError, ValueError):
-                continue
+        # Validar conflito de horário com a agenda do barbeiro carregada do servidor.
+        # Sem servidor a agenda não carrega: vale a cópia em cache, e o servidor
+        # recusa (409) um conflito que ela não mostre quando a gravação for enviada
+        if (self.disponibilidade is not None and
+                self.consulta_disponibilidade == (funcionario_id, data_agendamento, servico.id)):
+            ocupados = self.disponibilidade['ocupados']
+        elif self.api_client.modo_offline:
+            ocupados = self.api_client.ocupados_em_cache(funcionario_id, data_agendamento)
+        else:
+            return False, "Aguarde o carregamento dos horários disponíveis do barbeiro."
         
-        for agendamento in agendamentos_funcionario:
-            if agendamento.horario_inicio and agendamento.horario_fim:
-                # Verificar sobreposição
-                if (horario_inicio < agendamento.horario_fim and horario_fim > agendamento.horario_inicio):
-                    return False, f"Conflito de horário. Barbeiro já tem agendamento das {agendamento.horario_inicio.strftime('%H:%M')} às {agendamento.horario_fim.strftime('%H:%M')}."
+        for inicio, fim in ocupados:
+            # Verificar sobreposição
+            if horario_inicio < fim and horario_fim > inicio:
+                return False, f"Conflito de horário. Barbeiro já tem agendamento das {inicio.strftime('%H:%M')} às {fim.strftime('%H:%M')}."
         
         return True, ""
     
@@ -843,7 +847,7 @@ class NovoAgendamentoDialog:
         cliente_id = int(self.cliente_var.get().split("ID: ")[1].rstrip(")"))
         funcionario_id = int(self.funcionario_var.get().split("ID: ")[1].rstrip(")"))
         servico_nome = self.servico_var.get().split(" - ")[0]
-        servico = next((s for s in self.servicos if s.nome == servico_nome), None)
+        servico = self.servicos.por_nome(servico_nome)
         
         data_str = self.data_var.get()
         data_agendamento_date = datetime.strptime(data_str, "%d/%m/%Y").date()
@@ -888,16 +892,14 @@ class NovoAgendamentoDialog:
 class EditarAgendamentoDialog:
     """Diálogo para editar agendamento existente"""
     
-    def __init__(self, parent, agendamento: Agendamento, clientes: List[Cliente], 
-                 funcionarios: List[Funcionario], servicos: List[Servico], 
-                 agendamentos: List[Agendamento], 
+    def __init__(self, parent, agendamento: Agendamento, clientes: ColecaoIndexada, 
+                 funcionarios: ColecaoIndexada, servicos: ColecaoIndexada, 
                  callback: Optional[Callable[[Agendamento], None]] = None):
         self.parent = parent
         self.agendamento_original = agendamento
         self.clientes = clientes
         self.funcionarios = funcionarios
         self.servicos = servicos
-        self.agendamentos = agendamentos
         self.callback = callback
         
         self.dialog = tk.Toplevel(parent)
@@ -926,19 +928,19 @@ class EditarAgendamentoDialog:
         
         # Cliente (somente leitura)
         ttk.Label(main_frame, text="Cliente:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        cliente = next((c for c in self.clientes if c.id == self.agendamento_original.cliente_id), None)
+        cliente = self.clientes.por_id(self.agendamento_original.cliente_id)
         cliente_nome = cliente.nome if cliente else "Não encontrado"
         ttk.Label(main_frame, text=cliente_nome, font=('Arial', 10)).grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
         # Funcionário (somente leitura)
         ttk.Label(main_frame, text="Barbeiro:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        funcionario = next((f for f in self.funcionarios if f.id == self.agendamento_original.funcionario_id), None)
+        funcionario = self.funcionarios.por_id(self.agendamento_original.funcionario_id)
         funcionario_nome = funcionario.nome if funcionario else "Não encontrado"
         ttk.Label(main_frame, text=funcionario_nome, font=('Arial', 10)).grid(row=1, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
         # Serviço (somente leitura)
         ttk.Label(main_frame, text="Serviço:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        servico = next((s for s in self.servicos if s.id == self.agendamento_original.servico_id), None)
+        servico = self.servicos.por_id(self.agendamento_original.servico_id)
         servico_nome = servico.nome if servico else "Não encontrado"
         ttk.Label(main_frame, text=servico_nome, font=('Arial', 10)).grid(row=2, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         
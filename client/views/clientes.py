@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Optional
+from typing import Optional
 from ..models import Cliente
-from ..repositories import get_api_client
+from ..repositories import get_api_client, ColecaoIndexada
 from ..utils import bind_phone_mask, bind_email_validator, PhoneMask, EmailValidator
 from .loading_widget import LoadingWidget
 
@@ -11,7 +11,7 @@ class ClientesWidget:
     
     def __init__(self, parent, dashboard_callback=None):
         self.parent = parent
-        self.clientes: List[Cliente] = []
+        self.clientes: ColecaoIndexada = ColecaoIndexada()
         self.current_cliente: Optional[Cliente] = None
         self.api_client = get_api_client()
         self.dashboard_callback = dashboard_callback  # Callback para notificar dashboard
@@ -63,6 +63,11 @@ class ClientesWidget:
         # Carrega dados em thread (se já houver cache, será retornado imediatamente)
         self.api_client.load_clientes(on_data_loaded)
     
+    def on_dados_alterados(self, entidade: str):
+        """Recarrega a lista quando clientes são alterados em qualquer terminal"""
+        if entidade == 'clientes':
+            self.load_data_from_file()
+    
     def create_widget(self):
         """Cria o widget de clientes"""
         # Frame principal do widget
@@ -298,6 +303,8 @@ class ClientesWidget:
                 pass
         
         # Adicionar clientes (todos, ativos e inativos)
+        # Registros com alteração ainda não enviada ao servidor
+        pendentes = self.api_client.ids_pendentes('clientes')
         for cliente in self.clientes:
             # Filtrar por busca se houver termo
             if search_term and search_term not in cliente.nome.lower():
@@ -323,7 +330,7 @@ class ClientesWidget:
                 tags = (cliente.id, 'inativo',)
             
             self.clientes_tree.insert('', 'end', values=(
-                cliente.nome,
+                f"⏳ {cliente.nome}" if cliente.id in pendentes else cliente.nome,
                 telefone_formatado,
                 cliente.email,
                 data_cadastro,
@@ -344,7 +351,7 @@ class ClientesWidget:
             cliente_id = item['tags'][0] if item['tags'] else None
             
             if cliente_id:
-                cliente = next((c for c in self.clientes if c.id == cliente_id), None)
+                cliente = self.clientes.por_id(cliente_id)
                 if cliente:
                     self.load_cliente_to_form(cliente)
     
@@ -397,7 +404,7 @@ class ClientesWidget:
         cliente_id = item['tags'][0] if item['tags'] else None
         
         if cliente_id:
-            cliente = next((c for c in self.clientes if c.id == cliente_id), None)
+            cliente = self.clientes.por_id(cliente_id)
             if cliente:
                 self.load_cliente_to_form(cliente)
     
@@ -412,14 +419,14 @@ class ClientesWidget:
         cliente_id = item['tags'][0] if item['tags'] else None
         
         if cliente_id:
-            cliente = next((c for c in self.clientes if c.id == cliente_id), None)
+            cliente = self.clientes.por_id(cliente_id)
             if cliente:
                 if messagebox.askyesno("Confirmar", f"Deseja realmente EXCLUIR permanentemente o cliente {cliente.nome}?\n\nEsta ação não pode ser desfeita!"):
                     root = self.parent.winfo_toplevel()
                     def on_delete_complete(success):
                         if success:
                             # Remover da lista local
-                            self.clientes = [c for c in self.clientes if c.id != cliente_id]
+                            self.clientes = ColecaoIndexada(c for c in self.clientes if c.id != cliente_id)
                             root.after(0, self.refresh_clientes_list)
                             root.after(0, self.clear_form)
                             root.after(0, lambda: messagebox.showinfo("Sucesso", "Cliente excluído permanentemente do banco de dados!"))
@@ -470,6 +477,7 @@ class ClientesWidget:
             return
         
         # Criar ou atualizar cliente
+        cliente_salvo = self.current_cliente
         if self.current_cliente:
             # Atualizar cliente existente
             self.current_cliente.nome = nome
@@ -480,10 +488,9 @@ class ClientesWidget:
             self.current_cliente.ativo = self.ativo_var.get()
             messagebox.showinfo("Sucesso", "Cliente atualizado com sucesso!")
         else:
-            # Criar novo cliente
-            novo_id = max([c.id for c in self.clientes], default=0) + 1
+            # Criar novo cliente (ID será atribuído pelo servidor)
             novo_cliente = Cliente(
-                id=novo_id,
+                id=None,
                 nome=nome,
                 telefone=PhoneMask.get_numbers(telefone),
                 email=email,
@@ -493,14 +500,22 @@ class ClientesWidget:
             self.clientes.append(novo_cliente)
             messagebox.showinfo("Sucesso", "Cliente cadastrado com sucesso!")
         
-        # Salvar no banco de dados usando thread
+        # Salvar no banco de dados usando thread (apenas o registro alterado)
         root = self.parent.winfo_toplevel()
         def on_save_complete(success):
-            if success and self.dashboard_callback:
-                # Agendar notificação do dashboard na thread principal
-                root.after(0, self.dashboard_callback)
+            if success:
+                # Atualizar lista com o ID atribuído pelo servidor
+                root.after(0, self.refresh_clientes_list)
+                if self.dashboard_callback:
+                    # Agendar notificação do dashboard na thread principal
+                    root.after(0, self.dashboard_callback)
+            else:
+                root.after(0, lambda: messagebox.showerror("Erro", "Erro ao salvar cliente. Tente novamente."))
         
-        self.api_client.save_clientes(self.clientes, on_save_complete)
+        if cliente_salvo:
+            self.api_client.update_cliente(cliente_salvo, callback=on_save_complete)
+        else:
+            self.api_client.create_cliente(novo_cliente, on_save_complete)
         self.refresh_clientes_list()
         self.clear_form()
     
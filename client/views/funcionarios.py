@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
 from ..models import Funcionario
-from ..repositories import get_api_client
+from ..repositories import get_api_client, ColecaoIndexada
 from ..utils import bind_phone_mask, bind_email_validator, bind_money_mask, PhoneMask, EmailValidator, MoneyMask
 from .loading_widget import LoadingWidget
 
@@ -12,7 +12,7 @@ class FuncionariosWidget:
     
     def __init__(self, parent, dashboard_callback=None):
         self.parent = parent
-        self.funcionarios: List[Funcionario] = []
+        self.funcionarios: ColecaoIndexada = ColecaoIndexada()
         self.current_funcionario: Optional[Funcionario] = None
         self.api_client = get_api_client()
         self.dashboard_callback = dashboard_callback  # Callback para notificar dashboard
@@ -64,6 +64,11 @@ class FuncionariosWidget:
         # Carrega dados em thread (se já houver cache, será retornado imediatamente)
         self.api_client.load_funcionarios(on_data_loaded)
     
+    def on_dados_alterados(self, entidade: str):
+        """Recarrega a lista quando funcionários são alterados em qualquer terminal"""
+        if entidade == 'funcionarios':
+            self.load_data_from_file()
+    
     def create_widget(self):
         """Cria o widget de funcionários"""
         # Frame principal do widget
@@ -306,6 +311,8 @@ class FuncionariosWidget:
                 pass
         
         # Adicionar funcionários
+        # Registros com alteração ainda não enviada ao servidor
+        pendentes = self.api_client.ids_pendentes('funcionarios')
         for funcionario in self.funcionarios:
             # Filtrar por busca se houver termo
             if search_term and search_term not in funcionario.nome.lower():
@@ -333,7 +340,7 @@ class FuncionariosWidget:
                 tags = (funcionario.id, 'inativo',)
             
             self.funcionarios_tree.insert('', 'end', values=(
-                funcionario.nome,
+                f"⏳ {funcionario.nome}" if funcionario.id in pendentes else funcionario.nome,
                 funcionario.cargo,
                 telefone_formatado,
                 salario_formatado,
@@ -354,7 +361,7 @@ class FuncionariosWidget:
             funcionario_id = item['tags'][0] if item['tags'] else None
             
             if funcionario_id:
-                funcionario = next((f for f in self.funcionarios if f.id == funcionario_id), None)
+                funcionario = self.funcionarios.por_id(funcionario_id)
                 if funcionario:
                     self.load_funcionario_to_form(funcionario)
     
@@ -410,7 +417,7 @@ class FuncionariosWidget:
         funcionario_id = item['tags'][0] if item['tags'] else None
         
         if funcionario_id:
-            funcionario = next((f for f in self.funcionarios if f.id == funcionario_id), None)
+            funcionario = self.funcionarios.por_id(funcionario_id)
             if funcionario:
                 self.load_funcionario_to_form(funcionario)
     
@@ -425,14 +432,14 @@ class FuncionariosWidget:
         funcionario_id = item['tags'][0] if item['tags'] else None
         
         if funcionario_id:
-            funcionario = next((f for f in self.funcionarios if f.id == funcionario_id), None)
+            funcionario = self.funcionarios.por_id(funcionario_id)
             if funcionario:
                 if messagebox.askyesno("Confirmar", f"Deseja realmente EXCLUIR permanentemente o funcionário {funcionario.nome}?\n\nEsta ação não pode ser desfeita!"):
                     root = self.parent.winfo_toplevel()
                     def on_delete_complete(success):
                         if success:
                             # Remover da lista local
-                            self.funcionarios = [f for f in self.funcionarios if f.id != funcionario_id]
+                            self.funcionarios = ColecaoIndexada(f for f in self.funcionarios if f.id != funcionario_id)
                             root.after(0, self.refresh_funcionarios_list)
                             root.after(0, self.clear_form)
                             root.after(0, lambda: messagebox.showinfo("Sucesso", "Funcionário excluído permanentemente do banco de dados!"))
@@ -516,6 +523,7 @@ class FuncionariosWidget:
             return
         
         # Criar ou atualizar funcionário
+        funcionario_salvo = self.current_funcionario
         if self.current_funcionario:
             # Atualizar funcionário existente
             self.current_funcionario.nome = nome
@@ -527,10 +535,9 @@ class FuncionariosWidget:
             self.current_funcionario.ativo = self.ativo_var.get()
             messagebox.showinfo("Sucesso", "Funcionário atualizado com sucesso!")
         else:
-            # Criar novo funcionário
-            novo_id = max([f.id for f in self.funcionarios], default=0) + 1
+            # Criar novo funcionário (ID será atribuído pelo servidor)
             novo_funcionario = Funcionario(
-                id=novo_id,
+                id=None,
                 nome=nome,
                 cargo=cargo,
                 telefone=PhoneMask.get_numbers(telefone),
@@ -541,14 +548,22 @@ class FuncionariosWidget:
             self.funcionarios.append(novo_funcionario)
             messagebox.showinfo("Sucesso", "Funcionário cadastrado com sucesso!")
         
-        # Salvar no banco de dados usando thread
+        # Salvar no banco de dados usando thread (apenas o registro alterado)
         root = self.parent.winfo_toplevel()
         def on_save_complete(success):
-            if success and self.dashboard_callback:
-                # Agendar notificação do dashboard na thread principal
-                root.after(0, self.dashboard_callback)
+            if success:
+                # Atualizar lista com o ID atribuído pelo servidor
+                root.after(0, self.refresh_funcionarios_list)
+                if self.dashboard_callback:
+                    # Agendar notificação do dashboard na thread principal
+                    root.after(0, self.dashboard_callback)
+            else:
+                root.after(0, lambda: messagebox.showerror("Erro", "Erro ao salvar funcionário. Tente novamente."))
         
-        self.api_client.save_funcionarios(self.funcionarios, on_save_complete)
+        if funcionario_salvo:
+            self.api_client.update_funcionario(funcionario_salvo, callback=on_save_complete)
+        else:
+            self.api_client.create_funcionario(novo_funcionario, on_save_complete)
         self.refresh_funcionarios_list()
         self.clear_form()
     
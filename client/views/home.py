@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime, date
+from datetime import datetime
 from .clientes import ClientesWidget
 from .servicos import ServicosWidget
 from .funcionarios import FuncionariosWidget
@@ -8,7 +8,6 @@ from .agendamentos import AgendamentosWidget
 from .relatorios import RelatoriosWidget
 from ..utils import StyleManager
 from ..repositories import get_api_client
-from ..models import Cliente, Funcionario, Agendamento
 
 class HomeWindow:
     """Janela principal (dashboard) da aplicação administrativa"""
@@ -42,7 +41,10 @@ class HomeWindow:
         self.create_window()
         # Carregar dados do dashboard após criar a janela
         self.load_dashboard_data()
-        # Iniciar atualização periódica automática
+        # Receber do servidor as alterações feitas por qualquer terminal
+        self.api_client.adicionar_ouvinte(self.on_dados_alterados)
+        self.api_client.iniciar_eventos()
+        # Iniciar atualização periódica automática (usada só sem o feed de eventos)
         self.start_auto_refresh()
     
     def create_window(self):
@@ -109,7 +111,13 @@ class HomeWindow:
     def update_time(self):
         """Atualiza a hora em tempo real no label"""
         agora = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        self.user_info.config(text="Administrador | " + agora)
+        texto = "Administrador | " + agora
+        if self.api_client.modo_offline:
+            texto += " | Modo offline: alterações serão enviadas quando o servidor voltar"
+        pendencias = self.api_client.total_pendencias
+        if pendencias:
+            texto += f" | ⏳ {pendencias} alteraç{'ão' if pendencias == 1 else 'ões'} aguardando envio"
+        self.user_info.config(text=texto)
         self.window.after(1000, self.update_time)  # atualiza a cada 1 segundo
 
     def create_stats_cards(self, parent):
@@ -322,6 +330,8 @@ class HomeWindow:
     
     def logout(self):
         if messagebox.askyesno("Confirmar", "Deseja realmente sair do sistema?"):
+            self.api_client.remover_ouvinte(self.on_dados_alterados)
+            self.api_client.encerrar()
             self.window.destroy()
             if self.root:
                 self.root.quit()
@@ -329,13 +339,9 @@ class HomeWindow:
     
     def load_dashboard_data(self):
         """Carrega os dados do dashboard de forma assíncrona"""
-        # Verificar se o servidor está rodando
-        import requests
-        try:
-            response = requests.get("http://localhost:5000/api/health", timeout=2)
-            if response.status_code != 200:
-                raise Exception("Servidor não respondeu corretamente")
-        except Exception as e:
+        # Verificar se o servidor está rodando; com dados salvos localmente a
+        # aplicação continua em modo offline
+        if not self.api_client.verificar_servidor() and not self.api_client.possui_dados_locais:
             messagebox.showerror(
                 "Servidor não disponível",
                 "O servidor Flask não está rodando!\n\n"
@@ -350,89 +356,51 @@ class HomeWindow:
             return
         
         # Dashboard não precisa de loading - os cards já mostram "Carregando..."
-        
-        def on_clientes_loaded(clientes):
-            # Não limpar dados antigos - apenas atualizar quando novos dados chegarem
-            if clientes:  # Só atualizar se houver dados
-                self.clientes = clientes
-                # Agendar atualização da GUI na thread principal
-                if self.window and self.window.winfo_exists():
-                    self.window.after(0, self.update_clientes_count)
-        
-        def on_funcionarios_loaded(funcionarios):
-            # Não limpar dados antigos - apenas atualizar quando novos dados chegarem
-            if funcionarios:  # Só atualizar se houver dados
-                self.funcionarios = funcionarios
-                # Agendar atualização da GUI na thread principal
-                if self.window and self.window.winfo_exists():
-                    self.window.after(0, self.update_funcionarios_count)
-        
-        def on_agendamentos_loaded(agendamentos):
-            # Não limpar dados antigos - apenas atualizar quando novos dados chegarem
-            if agendamentos is not None:  # Atualizar mesmo se for lista vazia (None significa erro)
-                self.agendamentos = agendamentos
-                # Agendar atualização da GUI na thread principal
-                if self.window and self.window.winfo_exists():
-                    def update_stats():
-                        if self.window and self.window.winfo_exists():
-                            self.update_agendamentos_hoje()
-                            self.update_receita_mensal()
-                    self.window.after(0, update_stats)
-        
-        # NÃO inicializar listas vazias - manter dados antigos até novos chegarem
-        # Isso evita que o dashboard fique zerado durante carregamento
-        
-        # Carregar dados usando threads
-        self.api_client.load_clientes(on_clientes_loaded)
-        self.api_client.load_funcionarios(on_funcionarios_loaded)
-        self.api_client.load_agendamentos(on_agendamentos_loaded, force_reload=False)
+        self.refresh_dashboard()
     
     def refresh_dashboard(self):
-        """Atualiza os dados do dashboard"""
-        self.load_dashboard_data()
+        """Atualiza os cards do dashboard com o resumo calculado pelo servidor"""
+        def on_dashboard_loaded(resumo):
+            # Em caso de erro mantém os valores atuais até a próxima atualização
+            if resumo is not None and self.window and self.window.winfo_exists():
+                self.window.after(0, lambda: self.update_stats_cards(resumo))
+        
+        self.api_client.load_dashboard(on_dashboard_loaded)
     
     def refresh_dashboard_quick(self):
-        """Atualiza o dashboard rapidamente recarregando apenas os dados necessários"""
-        # Recarregar dados de forma mais rápida, forçando atualização do cache
-        def on_clientes_loaded(clientes):
-            if clientes is not None:
-                self.clientes = clientes
-                if self.window and self.window.winfo_exists():
-                    self.window.after(0, self.update_clientes_count)
-        
-        def on_funcionarios_loaded(funcionarios):
-            if funcionarios is not None:
-                self.funcionarios = funcionarios
-                if self.window and self.window.winfo_exists():
-                    self.window.after(0, self.update_funcionarios_count)
-        
-        def on_agendamentos_loaded(agendamentos):
-            if agendamentos is not None:
-                self.agendamentos = agendamentos
-                if self.window and self.window.winfo_exists():
-                    def update_stats():
-                        if self.window and self.window.winfo_exists():
-                            self.update_agendamentos_hoje()
-                            self.update_receita_mensal()
-                    self.window.after(0, update_stats)
-        
-        # Limpar cache para forçar recarregamento
-        self.api_client._clientes = None
-        self.api_client._funcionarios = None
-        self.api_client._agendamentos = None
-        
-        # Carregar dados atualizados
-        self.api_client.load_clientes(on_clientes_loaded)
-        self.api_client.load_funcionarios(on_funcionarios_loaded)
-        self.api_client.load_agendamentos(on_agendamentos_loaded, force_reload=True)
+        """Atualiza o dashboard logo após uma alteração de dados"""
+        self.refresh_dashboard()
     
     def start_auto_refresh(self):
-        """Inicia a atualização automática periódica do dashboard"""
+        """
+        Inicia a atualização automática periódica do dashboard
+        
+        Enquanto o feed de eventos do servidor estiver conectado o dashboard é
+        atualizado pelos eventos e a consulta periódica é pulada.
+        """
         if self.auto_refresh_enabled and self.window:
-            self.refresh_dashboard()
+            if not self.api_client.eventos_conectados:
+                self.refresh_dashboard()
             # Agendar próxima atualização
             self.window.after(self.auto_refresh_interval, self.start_auto_refresh)
     
+    def on_dados_alterados(self, entidade: str):
+        """Chamado pela thread de eventos quando uma coleção é alterada em qualquer terminal"""
+        try:
+            if self.window and self.window.winfo_exists():
+                self.window.after(0, lambda: self.aplicar_alteracao(entidade))
+        except (tk.TclError, RuntimeError):
+            pass  # Janela fechada
+    
+    def aplicar_alteracao(self, entidade: str):
+        """Atualiza o dashboard e a tela aberta após uma alteração (thread da interface)"""
+        self.notify_data_changed()
+        if self.current_widget is not None and hasattr(self.current_widget, 'on_dados_alterados'):
+            try:
+                self.current_widget.on_dados_alterados(entidade)
+            except tk.TclError:
+                pass  # Widget destruído
+    
     def notify_data_changed(self):
         """Método público para ser chamado quando dados são alterados"""
         # Atualizar dashboard de forma assíncrona quando dados são alterados (para não travar)
@@ -447,98 +415,24 @@ class HomeWindow:
             # Agendar novo refresh com delay menor (100ms) para resposta mais rápida
             self._refresh_id = self.window.after(100, self.refresh_dashboard_quick)
     
-    def update_clientes_count(self):
-        """Atualiza o contador de clientes"""
-        try:
-            if not self.window or not self.window.winfo_exists():
-                return
-            if 'clientes' in self.stats_labels and self.stats_labels['clientes'].winfo_exists():
-                count = len([c for c in self.clientes if c.ativo])
-                self.stats_labels['clientes'].config(text=str(count))
-        except:
-            return
-    
-    def update_funcionarios_count(self):
-        """Atualiza o contador de funcionários"""
-        try:
-            if not self.window or not self.window.winfo_exists():
-                return
-            if 'funcionarios' in self.stats_labels and self.stats_labels['funcionarios'].winfo_exists():
-                count = len([f for f in self.funcionarios if f.ativo])
-                self.stats_labels['funcionarios'].config(text=str(count))
-        except:
-            return
-    
-    def update_agendamentos_hoje(self):
-        """Atualiza o contador de agendamentos de hoje"""
-        try:
-            if not self.window or not self.window.winfo_exists():
-                return
-            if 'agendamentos_hoje' in self.stats_labels and self.stats_labels['agendamentos_hoje'].winfo_exists():
-                hoje = datetime.now().date()
-                count = 0
-                
-                for agendamento in self.agendamentos:
-                    if not agendamento.data_agendamento:
-                        continue
-                    
-                    # Normalizar data_agendamento para date
-                    try:
-                        if isinstance(agendamento.data_agendamento, datetime):
-                            data_agendamento_date = agendamento.data_agendamento.date()
-                        elif isinstance(agendamento.data_agendamento, date):
-                            data_agendamento_date = agendamento.data_agendamento
-                        else:
-                            continue
-                        
-                        # Contar apenas agendamentos de hoje (não cancelados)
-                        if data_agendamento_date == hoje and agendamento.status != 'cancelado':
-                            count += 1
-                    except (AttributeError, TypeError, ValueError):
-                        continue
-                
-                self.stats_labels['agendamentos_hoje'].config(text=str(count))
-        except:
-            return
-    
-    def update_receita_mensal(self):
-        """Atualiza a receita mensal"""
+    def update_stats_cards(self, resumo: dict):
+        """
+        Atualiza os cards de estatísticas
+        
+        Args:
+            resumo: Resposta de GET /api/dashboard
+        """
+        valores = {
+            'clientes': str(resumo['clientes_ativos']),
+            'funcionarios': str(resumo['funcionarios_ativos']),
+            'agendamentos_hoje': str(resumo['agendamentos_hoje']),
+            'receita_mensal': f"R$ {resumo['receita_mensal']:.2f}",
+        }
         try:
             if not self.window or not self.window.winfo_exists():
                 return
-            if 'receita_mensal' in self.stats_labels and self.stats_labels['receita_mensal'].winfo_exists():
-                hoje = datetime.now()
-                mes_atual = hoje.month
-                ano_atual = hoje.year
-                
-                receita_total = 0.0
-                
-                for agendamento in self.agendamentos:
-                    # Apenas agendamentos concluídos
-                    if agendamento.status != 'concluido':
-                        continue
-                    
-                    if not agendamento.data_agendamento:
-                        continue
-                    
-                    # Normalizar data_agendamento para date
-                    try:
-                        if isinstance(agendamento.data_agendamento, datetime):
-                            data_agendamento_date = agendamento.data_agendamento.date()
-                        elif isinstance(agendamento.data_agendamento, date):
-                            data_agendamento_date = agendamento.data_agendamento
-                        else:
-                            continue
-                        
-                        # Verificar se é do mês atual
-                        if (isinstance(data_agendamento_date, date) and 
-                            data_agendamento_date.month == mes_atual and 
-                            data_agendamento_date.year == ano_atual):
-                            receita_total += float(agendamento.valor_total)
-                    except (AttributeError, TypeError, ValueError):
-                        continue
-                
-                self.stats_labels['receita_mensal'].config(text=f"R$ {receita_total:.2f}")
+            for chave, texto in valores.items():
+                if chave in self.stats_labels and self.stats_labels[chave].winfo_exists():
+                    self.stats_labels[chave].config(text=texto)
         except:
             return
-    
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import messagebox
 from typing import Callable
 from ..utils import StyleManager
+from ..repositories import get_api_client
 
 
 class LoginWindow:
@@ -220,12 +221,21 @@ class LoginWindow:
 
         if username == "admin" and password == "admin123":
             # Verificar se o servidor está rodando antes de permitir login
-            import requests
-            try:
-                response = requests.get("http://localhost:5000/api/health", timeout=2)
-                if response.status_code != 200:
-                    raise Exception("Servidor não respondeu corretamente")
-            except Exception as e:
+            # (a conexão aberta aqui é reaproveitada pelas próximas requisições)
+            api_client = get_api_client()
+            servidor_ativo = api_client.verificar_servidor()
+            if not servidor_ativo and api_client.possui_dados_locais:
+                if not messagebox.askyesno(
+                    "Servidor não disponível",
+                    "O servidor Flask não está rodando!\n\n"
+                    "Deseja abrir o sistema em modo offline? Os dados salvos neste "
+                    "computador ficam disponíveis e as alterações feitas são enviadas "
+                    "quando o servidor voltar."
+                ):
+                    self.password_entry.delete(0, tk.END)
+                    self.password_entry.focus()
+                    return
+            elif not servidor_ativo:
                 messagebox.showerror(
                     "Servidor não disponível",
                     "O servidor Flask não está rodando!\n\n"
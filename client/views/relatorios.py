@@ -1,9 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from typing import List
-from ..models import Cliente, Funcionario, Servico, Agendamento
-from datetime import datetime, timedelta, date
-from collections import defaultdict
+from typing import List, Optional
+from datetime import datetime, timedelta
 from ..repositories import get_api_client
 from ..utils import bind_date_mask
 from .loading_widget import LoadingWidget
@@ -13,10 +11,9 @@ class RelatoriosWidget:
     
     def __init__(self, parent, dashboard_callback=None):
         self.parent = parent
-        self.clientes: List[Cliente] = []
-        self.funcionarios: List[Funcionario] = []
-        self.servicos: List[Servico] = []
-        self.agendamentos: List[Agendamento] = []
+        self.relatorio: Optional[dict] = None
+        # Número da última consulta enviada, para descartar respostas atrasadas
+        self._consulta_atual = 0
         self.api_client = get_api_client()
         self.dashboard_callback = dashboard_callback  # Callback opcional (não usado aqui, mas aceito para compatibilidade)
         self.loading_widget = None
@@ -240,229 +237,124 @@ class RelatoriosWidget:
             pass
     
     def update_statistics(self):
-        """Atualiza as estatísticas"""
+        """Atualiza as estatísticas buscando o relatório do período no servidor"""
+        # Verificar se widgets ainda existem antes de acessar StringVar
         try:
-            # Verificar se widgets ainda existem antes de acessar StringVar
-            try:
-                if not hasattr(self, 'main_frame') or not self.main_frame.winfo_exists():
-                    return
-                if not hasattr(self, 'data_inicial_var') or not hasattr(self, 'data_final_var'):
-                    return
-            except:
-                return
-            
-            # Obter período
-            try:
-                data_inicial = datetime.strptime(self.data_inicial_var.get(), "%d/%m/%Y").date()
-                data_final = datetime.strptime(self.data_final_var.get(), "%d/%m/%Y").date()
-            except (ValueError, AttributeError):
+            if not hasattr(self, 'main_frame') or not self.main_frame.winfo_exists():
                 return
-            
-            # Filtrar agendamentos do período (apenas concluídos para relatórios)
-            agendamentos_periodo = []
-            for a in self.agendamentos:
-                # Verificar status
-                if a.status != 'concluido':
-                    continue
-                
-                # Verificar se tem data_agendamento
-                if not a.data_agendamento:
-                    continue
-                
-                # Converter data_agendamento para date se for datetime
-                try:
-                    # Normalizar data_agendamento para date
-                    if isinstance(a.data_agendamento, datetime):
-                        data_agendamento_date = a.data_agendamento.date()
-                    elif isinstance(a.data_agendamento, date):
-                        data_agendamento_date = a.data_agendamento
-                    elif hasattr(a.data_agendamento, 'date') and callable(getattr(a.data_agendamento, 'date', None)):
-                        data_agendamento_date = a.data_agendamento.date()
-                    else:
-                        # Tipo não reconhecido, pular
-                        continue
-                    
-                    # Verificar se está no período (garantir que ambos são date)
-                    if isinstance(data_agendamento_date, date) and isinstance(data_inicial, date) and isinstance(data_final, date):
-                        if data_inicial <= data_agendamento_date <= data_final:
-                            agendamentos_periodo.append(a)
-                except (AttributeError, TypeError, ValueError) as e:
-                    # Se houver erro na conversão, pular este agendamento
-                    continue
-            
-            # Verificar se widgets ainda existem antes de atualizar
-            # Verificar se o widget principal ainda existe
-            try:
-                if not hasattr(self, 'main_frame') or not self.main_frame.winfo_exists():
-                    return
-            except:
-                return
-            
-            # Atualizar estatísticas gerais com verificação individual antes de cada operação
-            try:
-                if hasattr(self, 'clientes_total_label'):
-                    try:
-                        if self.clientes_total_label.winfo_exists():
-                            self.clientes_total_label.config(text=str(len([c for c in self.clientes if c.ativo])))
-                    except:
-                        pass
-            except:
-                pass
-            
-            try:
-                if hasattr(self, 'agendamentos_total_label'):
-                    try:
-                        if self.agendamentos_total_label.winfo_exists():
-                            self.agendamentos_total_label.config(text=str(len(agendamentos_periodo)))
-                    except:
-                        pass
-            except:
-                pass
-            
-            try:
-                if hasattr(self, 'receita_total_label'):
-                    receita_total = sum(float(a.valor_total) for a in agendamentos_periodo)
-                    try:
-                        if self.receita_total_label.winfo_exists():
-                            self.receita_total_label.config(text=f"R$ {receita_total:.2f}")
-                    except:
-                        pass
-            except:
-                pass
-            
-            try:
-                if hasattr(self, 'funcionarios_total_label'):
-                    try:
-                        if self.funcionarios_total_label.winfo_exists():
-                            self.funcionarios_total_label.config(text=str(len([f for f in self.funcionarios if f.ativo])))
-                    except:
-                        pass
-            except:
-                pass
-            
-            # Atualizar relatórios específicos apenas se o widget ainda existir
-            try:
-                if hasattr(self, 'main_frame') and self.main_frame.winfo_exists():
-                    self.update_services_report(agendamentos_periodo)
-                    self.update_employees_report(agendamentos_periodo)
-            except:
-                pass
-            
-        except ValueError as e:
-            messagebox.showerror("Erro", f"Formato de data inválido. Use DD/MM/AAAA\n{str(e)}")
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao atualizar estatísticas: {str(e)}")
-            import traceback
-            traceback.print_exc()
-    
-    def update_services_report(self, agendamentos_periodo):
-        """Atualiza relatório de serviços"""
-        # Verificar se widget ainda existe
-        try:
-            if not hasattr(self, 'services_tree') or not self.services_tree.winfo_exists():
+            if not hasattr(self, 'data_inicial_var') or not hasattr(self, 'data_final_var'):
                 return
         except:
             return
         
-        # Limpar lista
+        # Obter período
         try:
-            for item in self.services_tree.get_children():
-                self.services_tree.delete(item)
-        except:
+            data_inicial = datetime.strptime(self.data_inicial_var.get(), "%d/%m/%Y").date()
+            data_final = datetime.strptime(self.data_final_var.get(), "%d/%m/%Y").date()
+        except (ValueError, AttributeError):
             return
         
-        if not agendamentos_periodo:
-            # Se não houver agendamentos, mostrar mensagem
-            try:
-                if self.services_tree.winfo_exists():
-                    self.services_tree.insert('', 'end', values=(
-                        "Nenhum agendamento concluído no período",
-                        "0",
-                        "R$ 0,00"
-                    ))
-            except:
-                pass
-            return
+        self._consulta_atual += 1
+        consulta = self._consulta_atual
+        root = self.parent.winfo_toplevel()
         
-        # Contar serviços
-        servico_count = defaultdict(int)
-        servico_receita = defaultdict(float)
+        def on_relatorio_loaded(relatorio):
+            # Ignorar respostas de consultas anteriores (período alterado nesse meio tempo)
+            if consulta == self._consulta_atual:
+                root.after(0, lambda: self.aplicar_relatorio(relatorio))
         
-        for agendamento in agendamentos_periodo:
-            servico = next((s for s in self.servicos if s.id == agendamento.servico_id), None)
-            if servico:
-                servico_count[servico.nome] += 1
-                servico_receita[servico.nome] += float(agendamento.valor_total)
+        self.api_client.load_relatorio(data_inicial, data_final, on_relatorio_loaded)
+    
+    def aplicar_relatorio(self, relatorio: Optional[dict]):
+        """Exibe o relatório recebido do servidor"""
+        if self.loading_widget:
+            self.loading_widget.hide()
         
-        # Ordenar por quantidade
-        sorted_servicos = sorted(servico_count.items(), key=lambda x: x[1], reverse=True)
+        # Verificar se o widget principal ainda existe
+        try:
+            if not hasattr(self, 'main_frame') or not self.main_frame.winfo_exists():
+                return
+        except:
+            return
         
-        # Adicionar à lista
-        for servico_nome, quantidade in sorted_servicos:
+        if relatorio is None:
+            messagebox.showerror("Erro", "Erro ao carregar relatório do servidor")
+            return
+        self.relatorio = relatorio
+        
+        # Atualizar estatísticas gerais
+        valores = (
+            ('clientes_total_label', str(relatorio['clientes_ativos'])),
+            ('agendamentos_total_label', str(relatorio['total_agendamentos'])),
+            ('receita_total_label', f"R$ {relatorio['receita_total']:.2f}"),
+            ('funcionarios_total_label', str(relatorio['funcionarios_ativos'])),
+        )
+        for atributo, texto in valores:
             try:
-                if not self.services_tree.winfo_exists():
-                    return
-                receita = servico_receita[servico_nome]
-                self.services_tree.insert('', 'end', values=(
-                    servico_nome,
-                    quantidade,
-                    f"R$ {receita:.2f}"
-                ))
+                label = getattr(self, atributo, None)
+                if label is not None and label.winfo_exists():
+                    label.config(text=texto)
             except:
-                return
+                pass
+        
+        # Atualizar relatórios específicos
+        self.update_services_report(relatorio['servicos'])
+        self.update_employees_report(relatorio['funcionarios'])
     
-    def update_employees_report(self, agendamentos_periodo):
-        """Atualiza relatório de funcionários"""
+    def update_services_report(self, servicos: List[dict]):
+        """
+        Atualiza relatório de serviços
+        
+        Args:
+            servicos: Itens {'nome', 'quantidade', 'receita'} já ordenados pelo servidor
+        """
+        self._preencher_tree('services_tree', servicos)
+    
+    def update_employees_report(self, funcionarios: List[dict]):
+        """
+        Atualiza relatório de funcionários
+        
+        Args:
+            funcionarios: Itens {'nome', 'quantidade', 'receita'} já ordenados pelo servidor
+        """
+        self._preencher_tree('employees_tree', funcionarios)
+    
+    def _preencher_tree(self, atributo: str, itens: List[dict]):
+        """Preenche uma das listas de relatório com os itens agregados"""
         # Verificar se widget ainda existe
+        tree = getattr(self, atributo, None)
         try:
-            if not hasattr(self, 'employees_tree') or not self.employees_tree.winfo_exists():
+            if tree is None or not tree.winfo_exists():
                 return
         except:
             return
         
         # Limpar lista
         try:
-            for item in self.employees_tree.get_children():
-                self.employees_tree.delete(item)
+            for item in tree.get_children():
+                tree.delete(item)
         except:
             return
         
-        if not agendamentos_periodo:
+        if not itens:
             # Se não houver agendamentos, mostrar mensagem
             try:
-                if self.employees_tree.winfo_exists():
-                    self.employees_tree.insert('', 'end', values=(
-                        "Nenhum agendamento concluído no período",
-                        "0",
-                        "R$ 0,00"
-                    ))
+                tree.insert('', 'end', values=(
+                    "Nenhum agendamento concluído no período",
+                    "0",
+                    "R$ 0,00"
+                ))
             except:
                 pass
             return
         
-        # Contar funcionários
-        funcionario_count = defaultdict(int)
-        funcionario_receita = defaultdict(float)
-        
-        for agendamento in agendamentos_periodo:
-            funcionario = next((f for f in self.funcionarios if f.id == agendamento.funcionario_id), None)
-            if funcionario:
-                funcionario_count[funcionario.nome] += 1
-                funcionario_receita[funcionario.nome] += float(agendamento.valor_total)
-        
-        # Ordenar por quantidade
-        sorted_funcionarios = sorted(funcionario_count.items(), key=lambda x: x[1], reverse=True)
-        
         # Adicionar à lista
-        for funcionario_nome, quantidade in sorted_funcionarios:
+        for item in itens:
             try:
-                if not self.employees_tree.winfo_exists():
-                    return
-                receita = funcionario_receita[funcionario_nome]
-                self.employees_tree.insert('', 'end', values=(
-                    funcionario_nome,
-                    quantidade,
-                    f"R$ {receita:.2f}"
+                tree.insert('', 'end', values=(
+                    item['nome'],
+                    item['quantidade'],
+                    f"R$ {item['receita']:.2f}"
                 ))
             except:
                 return
@@ -494,76 +386,17 @@ class RelatoriosWidget:
             else:
                 root.after(0, lambda: messagebox.showerror("Erro", f"Erro ao exportar relatório:\n{result}"))
         
-        self.api_client.export_relatorio_txt(
-            self.clientes, self.funcionarios, self.servicos, self.agendamentos,
-            data_inicial, data_final, filename, on_export_complete
-        )
+        self.api_client.export_relatorio_txt(data_inicial, data_final, filename, on_export_complete)
+    
+    def on_dados_alterados(self, entidade: str):
+        """Recalcula o relatório quando os dados são alterados em qualquer terminal"""
+        self.update_statistics()
     
     def load_data_from_files(self):
-        """Carrega dados do banco de dados usando threads"""
-        root = self.parent.winfo_toplevel()
-        
-        # Verificar se precisa mostrar loading (se algum dado não estiver em cache E não há dados ainda)
-        needs_loading = (
-            (self.api_client._clientes is None or
-             self.api_client._funcionarios is None or
-             self.api_client._servicos is None or
-             self.api_client._agendamentos is None) and
-            (len(self.clientes) == 0 and len(self.funcionarios) == 0 and 
-             len(self.servicos) == 0 and len(self.agendamentos) == 0)
-        )
+        """Carrega o relatório inicial do servidor usando threads"""
+        # Mostrar loading na área de estatísticas até o primeiro relatório chegar
+        if self.relatorio is None and self.loading_widget is None and hasattr(self, 'main_frame'):
+            self.loading_widget = LoadingWidget(self.main_frame, "Carregando relatórios")
+            self.loading_widget.show()
         
-        # Para relatórios, mostrar loading na área de estatísticas se existir
-        if needs_loading and self.loading_widget is None:
-            # Tentar encontrar um frame de estatísticas ou usar main_frame
-            stats_frame = None
-            if hasattr(self, 'statistics_frame'):
-                stats_frame = self.statistics_frame
-            elif hasattr(self, 'main_frame'):
-                stats_frame = self.main_frame
-            if stats_frame:
-                self.loading_widget = LoadingWidget(stats_frame, "Carregando relatórios")
-                self.loading_widget.show()
-        
-        def on_clientes_loaded(clientes):
-            self.clientes = clientes
-            root.after(0, check_all_loaded)
-        
-        def on_funcionarios_loaded(funcionarios):
-            self.funcionarios = funcionarios
-            root.after(0, check_all_loaded)
-        
-        def on_servicos_loaded(servicos):
-            self.servicos = servicos
-            root.after(0, check_all_loaded)
-        
-        def on_agendamentos_loaded(agendamentos):
-            self.agendamentos = agendamentos
-            root.after(0, check_all_loaded)
-        
-        loaded_count = [0]
-        def check_all_loaded():
-            # Verificar se o widget ainda existe antes de atualizar
-            try:
-                if not hasattr(self, 'main_frame') or not self.main_frame.winfo_exists():
-                    return
-            except:
-                return
-            
-            loaded_count[0] += 1
-            if loaded_count[0] == 4:
-                # Esconder loading quando todos os dados carregarem
-                if self.loading_widget:
-                    root.after(0, self.loading_widget.hide)
-                # Verificar novamente antes de atualizar estatísticas
-                try:
-                    if hasattr(self, 'main_frame') and self.main_frame.winfo_exists():
-                        self.update_statistics()
-                except:
-                    pass
-        
-        # Força recarregamento dos dados do banco de dados
-        self.api_client.load_clientes(on_clientes_loaded)
-        self.api_client.load_funcionarios(on_funcionarios_loaded)
-        self.api_client.load_servicos(on_servicos_loaded)
-        self.api_client.load_agendamentos(on_agendamentos_loaded, force_reload=False)
\ No newline at end of file
+        self.update_statistics()
@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Optional
+from typing import Optional
 from decimal import Decimal
 from ..models import Servico
-from ..repositories import get_api_client
+from ..repositories import get_api_client, ColecaoIndexada
 from ..utils import bind_money_mask, bind_number_only, MoneyMask
 from .loading_widget import LoadingWidget
 
@@ -12,7 +12,7 @@ class ServicosWidget:
     
     def __init__(self, parent, dashboard_callback=None):
         self.parent = parent
-        self.servicos: List[Servico] = []
+        self.servicos: ColecaoIndexada = ColecaoIndexada()
         self.current_servico: Optional[Servico] = None
         self.api_client = get_api_client()
         self.dashboard_callback = dashboard_callback  # Callback para notificar dashboard
@@ -64,6 +64,11 @@ class ServicosWidget:
         # Carrega dados em thread (se já houver cache, será retornado imediatamente)
         self.api_client.load_servicos(on_data_loaded)
     
+    def on_dados_alterados(self, entidade: str):
+        """Recarrega a lista quando serviços são alterados em qualquer terminal"""
+        if entidade == 'servicos':
+            self.load_data_from_file()
+    
     def create_widget(self):
         """Cria o widget de serviços"""
         # Frame principal do widget
@@ -288,6 +293,8 @@ class ServicosWidget:
                 pass
         
         # Adicionar serviços
+        # Registros com alteração ainda não enviada ao servidor
+        pendentes = self.api_client.ids_pendentes('servicos')
         for servico in self.servicos:
             # Filtrar por busca se houver termo
             if search_term and search_term not in servico.nome.lower():
@@ -303,7 +310,7 @@ class ServicosWidget:
                 tags = (servico.id, 'inativo',)
             
             self.servicos_tree.insert('', 'end', values=(
-                servico.nome,
+                f"⏳ {servico.nome}" if servico.id in pendentes else servico.nome,
                 preco_formatado,
                 servico.duracao_minutos,
                 status
@@ -323,7 +330,7 @@ class ServicosWidget:
             servico_id = item['tags'][0] if item['tags'] else None
             
             if servico_id:
-                servico = next((s for s in self.servicos if s.id == servico_id), None)
+                servico = self.servicos.por_id(servico_id)
                 if servico:
                     self.load_servico_to_form(servico)
     
@@ -363,7 +370,7 @@ class ServicosWidget:
         servico_id = item['tags'][0] if item['tags'] else None
         
         if servico_id:
-            servico = next((s for s in self.servicos if s.id == servico_id), None)
+            servico = self.servicos.por_id(servico_id)
             if servico:
                 self.load_servico_to_form(servico)
     
@@ -378,14 +385,14 @@ class ServicosWidget:
         servico_id = item['tags'][0] if item['tags'] else None
         
         if servico_id:
-            servico = next((s for s in self.servicos if s.id == servico_id), None)
+            servico = self.servicos.por_id(servico_id)
             if servico:
                 if messagebox.askyesno("Confirmar", f"Deseja realmente EXCLUIR permanentemente o serviço {servico.nome}?\n\nEsta ação não pode ser desfeita!"):
                     root = self.parent.winfo_toplevel()
                     def on_delete_complete(success):
                         if success:
                             # Remover da lista local
-                            self.servicos = [s for s in self.servicos if s.id != servico_id]
+                            self.servicos = ColecaoIndexada(s for s in self.servicos if s.id != servico_id)
                             root.after(0, self.refresh_servicos_list)
                             root.after(0, self.clear_form)
                             root.after(0, lambda: messagebox.showinfo("Sucesso", "Serviço excluído permanentemente do banco de dados!"))
@@ -457,6 +464,7 @@ class ServicosWidget:
             return
         
         # Criar ou atualizar serviço
+        servico_salvo = self.current_servico
         if self.current_servico:
             # Atualizar serviço existente
             self.current_servico.nome = nome
@@ -466,10 +474,9 @@ class ServicosWidget:
             self.current_servico.ativo = self.ativo_var.get()
             messagebox.showinfo("Sucesso", "Serviço atualizado com sucesso!")
         else:
-            # Criar novo serviço
-            novo_id = max([s.id for s in self.servicos], default=0) + 1
+            # Criar novo serviço (ID será atribuído pelo servidor)
             novo_servico = Servico(
-                id=novo_id,
+                id=None,
                 nome=nome,
                 preco=preco,
                 duracao_minutos=duracao,
@@ -479,14 +486,22 @@ class ServicosWidget:
             self.servicos.append(novo_servico)
             messagebox.showinfo("Sucesso", "Serviço cadastrado com sucesso!")
         
-        # Salvar no banco de dados usando thread
+        # Salvar no banco de dados usando thread (apenas o registro alterado)
         root = self.parent.winfo_toplevel()
         def on_save_complete(success):
-            if success and self.dashboard_callback:
-                # Agendar notificação do dashboard na thread principal
-                root.after(0, self.dashboard_callback)
-        
-        self.api_client.save_servicos(self.servicos, on_save_complete)
+            if success:
+                # Atualizar lista com o ID atribuído pelo servidor
+                root.after(0, self.refresh_servicos_list)
+                if self.dashboard_callback:
+                    # Agendar notificação do dashboard na thread principal
+                    root.after(0, self.dashboard_callback)
+            else:
+                root.after(0, lambda: messagebox.showerror("Erro", "Erro ao salvar serviço. Tente novamente."))
+        
+        if servico_salvo:
+            self.api_client.update_servico(servico_salvo, callback=on_save_complete)
+        else:
+            self.api_client.create_servico(novo_servico, on_save_complete)
         self.refresh_servicos_list()
         self.clear_form()
     
@@ -1,18 +1,52 @@
 #!/usr/bin/env python3
 """
 Ponto de entrada do servidor Flask
+
+Uso:
+    python server.py                       # servidor de desenvolvimento
+    python server.py --producao            # vários processos/threads
+    python server.py --producao --workers 4 --threads 8 --host 0.0.0.0
 """
 
-from server import create_app
+import argparse
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Servidor Flask da Barbearia")
+    parser.add_argument("--producao", action="store_true",
+                        help="Inicia o servidor de produção (multiprocesso)")
+    parser.add_argument("--host", default=None,
+                        help="Endereço de escuta (padrão: localhost; 0.0.0.0 em produção)")
+    parser.add_argument("--port", type=int, default=5000, help="Porta (padrão: 5000)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de processos (padrão: BARBEARIA_WORKERS ou nº de CPUs, até 4)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Threads por processo (padrão: BARBEARIA_THREADS ou 8)")
+    return parser.parse_args()
+
 
 if __name__ == '__main__':
-    app = create_app()
-    
-    print("=" * 60)
-    print("Servidor Flask da Barbearia")
-    print("=" * 60)
-    print("Servidor iniciando em http://localhost:5000")
-    print("Pressione Ctrl+C para parar o servidor")
-    print("=" * 60)
-    
-    app.run(host='localhost', port=5000, debug=False)
+    args = _parse_args()
+
+    if args.producao:
+        from server.runner import executar_producao, DEFAULT_WORKERS, DEFAULT_THREADS
+        executar_producao(
+            host=args.host or "0.0.0.0",
+            port=args.port,
+            workers=args.workers or DEFAULT_WORKERS,
+            threads=args.threads or DEFAULT_THREADS
+        )
+    else:
+        # Importada só aqui: no modo de produção cada worker importa a aplicação
+        from server import create_app
+        app = create_app()
+        host = args.host or 'localhost'
+
+        print("=" * 60)
+        print("Servidor Flask da Barbearia")
+        print("=" * 60)
+        print(f"Servidor iniciando em http://{host}:{args.port}")
+        print("Pressione Ctrl+C para parar o servidor")
+        print("=" * 60)
+
+        app.run(host=host, port=args.port, debug=False)
@@ -2,7 +2,13 @@
 Servidor Flask - API REST
 """
 
-from .app import create_app
-
 __all__ = ['create_app']
 
+
+def __getattr__(nome):
+    # Importação tardia: o mestre do modo pré-fork (server.runner) não carrega
+    # as rotas, e cada worker as importa do disco ao subir (recarga por SIGHUP)
+    if nome == 'create_app':
+        from .app import create_app
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -8,7 +8,7 @@ from flask import Blueprint
 api = Blueprint('api', __name__, url_prefix='/api')
 
 # Importar todas as rotas (após criar o blueprint para evitar import circular)
-from . import clientes, funcionarios, servicos, agendamentos, health  # noqa: E402
+from . import clientes, funcionarios, servicos, agendamentos, relatorios, dashboard, snapshot, eventos, health  # noqa: E402
 
 __all__ = ['api']
 
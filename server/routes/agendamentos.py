@@ -3,75 +3,207 @@ Rotas para gerenciamento de agendamentos
 """
 
 from flask import request, jsonify
-from datetime import datetime
-from decimal import Decimal
-from shared.database import SessionLocal, AgendamentoDB
-from server.utils import agendamento_to_dict
+from shared.database import SessionLocal, AgendamentoDB, iniciar_escrita
+from server.utils import (
+    agendamento_to_dict, agendamento_from_dict, upsert_em_lote,
+    ConflitoHorario, verificar_conflitos,
+    encode_cursor, decode_cursor, parse_limit, filtrar_agendamentos,
+    proxima_versao, registrar_exclusao, parse_since, preparar_alteracoes,
+    aceita_ndjson, resposta_ndjson, resposta_json, pede_colunas, condicional, idempotente,
+    agendamento_serializador
+)
 from server.routes import api
 
 
+def _resposta_conflito(erro: ConflitoHorario):
+    """Resposta 409 com a lista de agendamentos em conflito"""
+    return jsonify({'success': False, 'error': str(erro), 'conflitos': erro.conflitos}), 409
+
+
 @api.route('/agendamentos', methods=['GET'])
+@condicional(AgendamentoDB.__tablename__)
 def get_agendamentos():
-    """Retorna todos os agendamentos"""
+    """
+    Retorna agendamentos, opcionalmente filtrados e paginados
+    
+    Sem o parâmetro 'limit' retorna a lista completa (filtrada).
+    Com 'limit' retorna {'agendamentos': [...], 'next_cursor': token ou None};
+    o token deve ser enviado em 'cursor' para obter a próxima página.
+    Com 'since' retorna apenas as alterações desde a versão informada:
+    {'versao': versão atual, 'agendamentos': [...], 'excluidos': [ids]}
+    (os filtros continuam valendo; 'limit' é ignorado).
+    Com o cabeçalho 'Accept: application/x-ndjson' a lista filtrada completa
+    é transmitida em NDJSON, um agendamento por linha, sem paginação (com
+    since, a primeira linha traz 'versao' e 'excluidos').
+    Com ?format=columns a resposta é colunar: {'colunas': [...],
+    'linhas': [[...], ...]} (mais 'versao'/'excluidos' ou 'next_cursor'),
+    com datas em microssegundos desde 1970 e valores em centavos.
+    """
     db = SessionLocal()
     try:
-        agendamentos = db.query(AgendamentoDB).all()
-        return jsonify([agendamento_to_dict(a) for a in agendamentos])
+        serializador = agendamento_serializador
+        colunar = pede_colunas()
+        cabecalho = None
+        limite = None
+        try:
+            consulta = filtrar_agendamentos(serializador.select(colunar), request.args)
+            if 'since' in request.args:
+                since = parse_since(request.args['since'])
+                versao, consulta, excluidos = preparar_alteracoes(db, AgendamentoDB, since, consulta)
+                cabecalho = {'versao': versao, 'excluidos': excluidos}
+            elif not aceita_ndjson():
+                limite = parse_limit(request.args.get('limit'))
+                if request.args.get('cursor'):
+                    consulta = consulta.filter(AgendamentoDB.id > decode_cursor(request.args['cursor']))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        consulta = consulta.order_by(AgendamentoDB.id)
+        if aceita_ndjson():
+            return resposta_ndjson(db, consulta, serializador, cabecalho, colunar)
+        if colunar and limite is None:
+            return resposta_json({**(cabecalho or {}), **serializador.tabela(db.execute(consulta))})
+        if cabecalho is not None:
+            return resposta_json({**cabecalho, 'agendamentos': serializador.converter(db.execute(consulta))})
+        if limite is None:
+            return resposta_json(serializador.converter(db.execute(consulta)))
+        
+        # Busca um registro a mais para saber se existe próxima página
+        linhas = db.execute(consulta.limit(limite + 1)).all()
+        next_cursor = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            next_cursor = encode_cursor(linhas[-1].id)
+        
+        if colunar:
+            return resposta_json({**serializador.tabela(linhas), 'next_cursor': next_cursor})
+        return resposta_json({
+            'agendamentos': serializador.converter(linhas),
+            'next_cursor': next_cursor
+        })
     finally:
         db.close()
 
 
 @api.route('/agendamentos', methods=['POST'])
+@idempotente
 def save_agendamentos():
     """
     Salva/atualiza lista de agendamentos.
+    Com {'agendamentos': [...]} no corpo salva a lista; qualquer outro corpo
+    é tratado como um agendamento único a ser criado.
     IMPORTANTE: Não remove registros que não estão na requisição.
     Apenas atualiza ou cria novos registros baseado nos dados recebidos.
+    
+    Se algum agendamento se sobrepuser a outro do mesmo funcionário (inclusive
+    do próprio lote), nada é gravado e a resposta é 409 com 'conflitos'.
     """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'O corpo da requisição deve ser um objeto JSON'}), 400
+    if 'agendamentos' not in data:
+        return _create_agendamento(data)
+    
     db = SessionLocal()
     try:
-        data = request.json
         agendamentos_data = data.get('agendamentos', [])
         
-        existing_ids = {a.id for a in db.query(AgendamentoDB).all()}
+        iniciar_escrita(db)
+        ids = upsert_em_lote(db, AgendamentoDB, agendamentos_data, agendamento_from_dict)
+        verificar_conflitos(db, ids)
         
-        for agendamento_data in agendamentos_data:
-            if agendamento_data.get('id') and agendamento_data['id'] in existing_ids:
-                agendamento_db = db.query(AgendamentoDB).filter(AgendamentoDB.id == agendamento_data['id']).first()
-                if agendamento_db:
-                    agendamento_db.cliente_id = agendamento_data.get('cliente_id', 0)
-                    agendamento_db.funcionario_id = agendamento_data.get('funcionario_id', 0)
-                    agendamento_db.servico_id = agendamento_data.get('servico_id', 0)
-                    if agendamento_data.get('data_agendamento'):
-                        agendamento_db.data_agendamento = datetime.fromisoformat(agendamento_data['data_agendamento'])
-                    if agendamento_data.get('horario_inicio'):
-                        agendamento_db.horario_inicio = datetime.fromisoformat(agendamento_data['horario_inicio'])
-                    if agendamento_data.get('horario_fim'):
-                        agendamento_db.horario_fim = datetime.fromisoformat(agendamento_data['horario_fim'])
-                    agendamento_db.status = agendamento_data.get('status', 'agendado')
-                    agendamento_db.observacoes = agendamento_data.get('observacoes', '')
-                    agendamento_db.valor_total = Decimal(str(agendamento_data.get('valor_total', 0.00)))
-            else:
-                agendamento_db = AgendamentoDB(
-                    cliente_id=agendamento_data.get('cliente_id', 0),
-                    funcionario_id=agendamento_data.get('funcionario_id', 0),
-                    servico_id=agendamento_data.get('servico_id', 0),
-                    data_agendamento=datetime.fromisoformat(agendamento_data['data_agendamento']) if agendamento_data.get('data_agendamento') else None,
-                    horario_inicio=datetime.fromisoformat(agendamento_data['horario_inicio']) if agendamento_data.get('horario_inicio') else None,
-                    horario_fim=datetime.fromisoformat(agendamento_data['horario_fim']) if agendamento_data.get('horario_fim') else None,
-                    status=agendamento_data.get('status', 'agendado'),
-                    observacoes=agendamento_data.get('observacoes', ''),
-                    valor_total=Decimal(str(agendamento_data.get('valor_total', 0.00)))
-                )
-                db.add(agendamento_db)
-                db.flush()
-                agendamento_data['id'] = agendamento_db.id
+        db.commit()
+        return jsonify({'success': True, 'ids': ids})
+    except ConflitoHorario as e:
+        db.rollback()
+        return _resposta_conflito(e)
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+def _create_agendamento(data: dict):
+    """
+    Cria um agendamento único a partir do corpo da requisição
+    
+    A transação começa com BEGIN IMMEDIATE, então a verificação de conflito
+    e a gravação são atômicas mesmo com vários processos do servidor.
+    """
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        agendamento_db = AgendamentoDB(**agendamento_from_dict(data))
+        agendamento_db.versao = proxima_versao(db, AgendamentoDB.__tablename__)
+        db.add(agendamento_db)
+        db.flush()
+        verificar_conflitos(db, [agendamento_db.id])
+        db.commit()
+        return jsonify({'success': True, 'agendamento': agendamento_to_dict(agendamento_db)}), 201
+    except ConflitoHorario as e:
+        db.rollback()
+        return _resposta_conflito(e)
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+@api.route('/agendamentos/<int:agendamento_id>', methods=['PATCH'])
+@idempotente
+def update_agendamento(agendamento_id):
+    """Atualiza apenas os campos enviados de um agendamento (409 se o novo horário conflitar)"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        agendamento_db = db.get(AgendamentoDB, agendamento_id)
+        if not agendamento_db:
+            return jsonify({'success': False, 'error': 'Agendamento não encontrado'}), 404
         
+        for campo, valor in agendamento_from_dict(request.json or {}, parcial=True).items():
+            setattr(agendamento_db, campo, valor)
+        agendamento_db.versao = proxima_versao(db, AgendamentoDB.__tablename__)
+        verificar_conflitos(db, [agendamento_id])
         db.commit()
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'agendamento': agendamento_to_dict(agendamento_db)})
+    except ConflitoHorario as e:
+        db.rollback()
+        return _resposta_conflito(e)
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         db.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
     finally:
         db.close()
 
+
+@api.route('/agendamentos/<int:agendamento_id>', methods=['DELETE'])
+@idempotente
+def delete_agendamento(agendamento_id):
+    """Remove um agendamento do banco de dados"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        agendamento_db = db.query(AgendamentoDB).filter(AgendamentoDB.id == agendamento_id).first()
+        if not agendamento_db:
+            return jsonify({'success': False, 'error': 'Agendamento não encontrado'}), 404
+        
+        db.delete(agendamento_db)
+        registrar_exclusao(db, AgendamentoDB.__tablename__, agendamento_id)
+        db.commit()
+        return jsonify({'success': True})
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
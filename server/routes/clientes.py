@@ -3,65 +3,131 @@ Rotas para gerenciamento de clientes
 """
 
 from flask import request, jsonify
-from datetime import datetime
-from shared.database import SessionLocal, ClienteDB
-from server.utils import cliente_to_dict
+from shared.database import SessionLocal, ClienteDB, iniciar_escrita
+from server.utils import (
+    cliente_to_dict, cliente_from_dict, upsert_em_lote,
+    proxima_versao, registrar_exclusao, parse_since, preparar_alteracoes,
+    aceita_ndjson, resposta_ndjson, resposta_json, pede_colunas, condicional, idempotente,
+    cliente_serializador
+)
 from server.routes import api
 
 
 @api.route('/clientes', methods=['GET'])
+@condicional(ClienteDB.__tablename__)
 def get_clientes():
-    """Retorna todos os clientes"""
+    """
+    Retorna todos os clientes
+    
+    Com ?since=<versão> retorna apenas as alterações desde essa versão:
+    {'versao': versão atual, 'clientes': [...], 'excluidos': [ids]}
+    (since=0 retorna todos os registros junto com a versão atual).
+    Com o cabeçalho 'Accept: application/x-ndjson' a resposta é transmitida
+    em NDJSON, um registro por linha (com since, a primeira linha traz
+    'versao' e 'excluidos').
+    Com ?format=columns a resposta é colunar: {'colunas': [...],
+    'linhas': [[...], ...]} (mais 'versao' e 'excluidos' com since), com
+    datas em microssegundos desde 1970 e valores monetários em centavos.
+    """
     db = SessionLocal()
     try:
-        clientes = db.query(ClienteDB).all()
-        return jsonify([cliente_to_dict(c) for c in clientes])
+        colunar = pede_colunas()
+        consulta = cliente_serializador.select(colunar).order_by(ClienteDB.id)
+        cabecalho = None
+        if 'since' in request.args:
+            try:
+                since = parse_since(request.args['since'])
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            versao, consulta, excluidos = preparar_alteracoes(db, ClienteDB, since, consulta)
+            cabecalho = {'versao': versao, 'excluidos': excluidos}
+        
+        if aceita_ndjson():
+            return resposta_ndjson(db, consulta, cliente_serializador, cabecalho, colunar)
+        if colunar:
+            return resposta_json({**(cabecalho or {}), **cliente_serializador.tabela(db.execute(consulta))})
+        clientes = cliente_serializador.converter(db.execute(consulta))
+        if cabecalho is None:
+            return resposta_json(clientes)
+        return resposta_json({**cabecalho, 'clientes': clientes})
     finally:
         db.close()
 
 
 @api.route('/clientes', methods=['POST'])
+@idempotente
 def save_clientes():
     """
     Salva/atualiza lista de clientes.
+    Com {'clientes': [...]} no corpo salva a lista; qualquer outro corpo
+    é tratado como um cliente único a ser criado.
     IMPORTANTE: Não remove registros que não estão na requisição.
     Apenas atualiza ou cria novos registros baseado nos dados recebidos.
     """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'O corpo da requisição deve ser um objeto JSON'}), 400
+    if 'clientes' not in data:
+        return _create_cliente(data)
+    
     db = SessionLocal()
     try:
-        data = request.json
+        iniciar_escrita(db)
         clientes_data = data.get('clientes', [])
         
-        existing_ids = {c.id for c in db.query(ClienteDB).all()}
+        ids = upsert_em_lote(db, ClienteDB, clientes_data, cliente_from_dict)
         
-        for cliente_data in clientes_data:
-            if cliente_data.get('id') and cliente_data['id'] in existing_ids:
-                # Atualizar existente
-                cliente_db = db.query(ClienteDB).filter(ClienteDB.id == cliente_data['id']).first()
-                if cliente_db:
-                    cliente_db.nome = cliente_data.get('nome', '')
-                    cliente_db.telefone = cliente_data.get('telefone', '')
-                    cliente_db.email = cliente_data.get('email', '')
-                    if cliente_data.get('data_cadastro'):
-                        cliente_db.data_cadastro = datetime.fromisoformat(cliente_data['data_cadastro'])
-                    cliente_db.observacoes = cliente_data.get('observacoes', '')
-                    cliente_db.ativo = cliente_data.get('ativo', True)
-            else:
-                # Criar novo
-                cliente_db = ClienteDB(
-                    nome=cliente_data.get('nome', ''),
-                    telefone=cliente_data.get('telefone', ''),
-                    email=cliente_data.get('email', ''),
-                    data_cadastro=datetime.fromisoformat(cliente_data['data_cadastro']) if cliente_data.get('data_cadastro') else datetime.now(),
-                    observacoes=cliente_data.get('observacoes', ''),
-                    ativo=cliente_data.get('ativo', True)
-                )
-                db.add(cliente_db)
-                db.flush()
-                cliente_data['id'] = cliente_db.id
+        db.commit()
+        return jsonify({'success': True, 'ids': ids})
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+def _create_cliente(data: dict):
+    """Cria um cliente único a partir do corpo da requisição"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        cliente_db = ClienteDB(**cliente_from_dict(data))
+        cliente_db.versao = proxima_versao(db, ClienteDB.__tablename__)
+        db.add(cliente_db)
+        db.commit()
+        return jsonify({'success': True, 'cliente': cliente_to_dict(cliente_db)}), 201
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+@api.route('/clientes/<int:cliente_id>', methods=['PATCH'])
+@idempotente
+def update_cliente(cliente_id):
+    """Atualiza apenas os campos enviados de um cliente"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        cliente_db = db.get(ClienteDB, cliente_id)
+        if not cliente_db:
+            return jsonify({'success': False, 'error': 'Cliente não encontrado'}), 404
         
+        for campo, valor in cliente_from_dict(request.json or {}, parcial=True).items():
+            setattr(cliente_db, campo, valor)
+        cliente_db.versao = proxima_versao(db, ClienteDB.__tablename__)
         db.commit()
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'cliente': cliente_to_dict(cliente_db)})
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         db.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -70,15 +136,18 @@ def save_clientes():
 
 
 @api.route('/clientes/<int:cliente_id>', methods=['DELETE'])
+@idempotente
 def delete_cliente(cliente_id):
     """Remove um cliente do banco de dados"""
     db = SessionLocal()
     try:
+        iniciar_escrita(db)
         cliente_db = db.query(ClienteDB).filter(ClienteDB.id == cliente_id).first()
         if not cliente_db:
             return jsonify({'success': False, 'error': 'Cliente não encontrado'}), 404
         
         db.delete(cliente_db)
+        registrar_exclusao(db, ClienteDB.__tablename__, cliente_id)
         db.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -0,0 +1,65 @@
+"""
+Rota do resumo do dashboard
+"""
+
+from datetime import datetime, date, timedelta
+from flask import request, jsonify
+from sqlalchemy import func
+from shared.database import SessionLocal, ClienteDB, FuncionarioDB, AgendamentoDB
+from server.utils import parse_data, condicional
+from server.routes import api
+
+
+@api.route('/dashboard', methods=['GET'])
+@condicional(ClienteDB.__tablename__, FuncionarioDB.__tablename__, AgendamentoDB.__tablename__, por_dia=True)
+def get_dashboard():
+    """
+    Retorna os números do dashboard calculados no banco
+    
+    Parâmetro opcional: data (AAAA-MM-DD) usada como "hoje" (padrão: data do servidor).
+    Retorna {'data', 'clientes_ativos', 'funcionarios_ativos',
+    'agendamentos_hoje' (não cancelados), 'receita_mensal' (concluídos no mês)}.
+    """
+    try:
+        hoje = parse_data(request.args['data']) if request.args.get('data') else date.today()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    inicio_dia = datetime.combine(hoje, datetime.min.time())
+    inicio_mes = inicio_dia.replace(day=1)
+    inicio_proximo_mes = (inicio_mes + timedelta(days=32)).replace(day=1)
+    
+    db = SessionLocal()
+    try:
+        clientes_ativos = db.query(func.count(ClienteDB.id)).filter(ClienteDB.ativo.is_(True)).scalar()
+        funcionarios_ativos = db.query(func.count(FuncionarioDB.id)).filter(FuncionarioDB.ativo.is_(True)).scalar()
+        agendamentos_hoje = (
+            db.query(func.count(AgendamentoDB.id))
+            .filter(
+                AgendamentoDB.data_agendamento >= inicio_dia,
+                AgendamentoDB.data_agendamento < inicio_dia + timedelta(days=1),
+                AgendamentoDB.status != 'cancelado'
+            )
+            .scalar()
+        )
+        receita_mensal = (
+            db.query(func.sum(AgendamentoDB.valor_total))
+            .filter(
+                AgendamentoDB.status == 'concluido',
+                AgendamentoDB.data_agendamento >= inicio_mes,
+                AgendamentoDB.data_agendamento < inicio_proximo_mes
+            )
+            .scalar()
+        )
+        
+        return jsonify({
+            'data': hoje.isoformat(),
+            'clientes_ativos': clientes_ativos,
+            'funcionarios_ativos': funcionarios_ativos,
+            'agendamentos_hoje': agendamentos_hoje,
+            'receita_mensal': round(float(receita_mensal or 0), 2)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
@@ -0,0 +1,67 @@
+"""
+Rota do feed de alterações (Server-Sent Events)
+"""
+
+import json
+import queue
+from flask import Response, jsonify, stream_with_context
+from shared.database import SessionLocal
+from server.utils import monitor_alteracoes, versoes_tabelas, TABELAS_MONITORADAS, LimiteConexoesEventos
+from server.routes import api
+
+# Intervalo (s) entre comentários de keep-alive quando não há eventos
+HEARTBEAT_SEGUNDOS = 15
+
+
+def _evento_sse(tipo: str, dados: dict) -> str:
+    return f"event: {tipo}\ndata: {json.dumps(dados, separators=(',', ':'))}\n\n"
+
+
+@api.route('/events', methods=['GET'])
+def get_events():
+    """
+    Stream de eventos (text/event-stream) com as alterações das tabelas
+    
+    Eventos enviados:
+        conectado: {'versoes': {tabela: versão}} ao abrir a conexão
+        alteracao: {'entidade', 'versao', 'ids', 'excluidos'} após cada
+            commit que altere clientes, funcionarios, servicos ou agendamentos
+            ('ids' e 'excluidos' são None quando há muitos registros)
+    A cada HEARTBEAT_SEGUNDOS sem eventos é enviado um comentário de keep-alive.
+    Cada conexão aberta ocupa uma thread do servidor; acima do limite de
+    conexões do processo (monitor_alteracoes.limite) a resposta é 503 com
+    Retry-After, para que o feed não tome todas as threads das requisições.
+    """
+    try:
+        fila = monitor_alteracoes.assinar()
+    except LimiteConexoesEventos as e:
+        resposta = jsonify({'success': False, 'error': str(e)})
+        resposta.headers['Retry-After'] = str(HEARTBEAT_SEGUNDOS)
+        return resposta, 503
+    db = SessionLocal()
+    try:
+        versoes = versoes_tabelas(db, list(TABELAS_MONITORADAS))
+    finally:
+        db.close()
+    
+    def gerar():
+        try:
+            yield "retry: 3000\n\n"
+            yield _evento_sse('conectado', {'versoes': versoes})
+            while True:
+                try:
+                    evento = fila.get(timeout=HEARTBEAT_SEGUNDOS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if evento is None:
+                    return
+                yield _evento_sse('alteracao', evento)
+        finally:
+            monitor_alteracoes.cancelar(fila)
+    
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
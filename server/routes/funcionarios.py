@@ -3,65 +3,131 @@ Rotas para gerenciamento de funcionários
 """
 
 from flask import request, jsonify
-from datetime import datetime
-from shared.database import SessionLocal, FuncionarioDB
-from server.utils import funcionario_to_dict
+from shared.database import SessionLocal, FuncionarioDB, ServicoDB, AgendamentoDB, iniciar_escrita
+from server.utils import (
+    funcionario_to_dict, funcionario_from_dict, upsert_em_lote,
+    proxima_versao, registrar_exclusao, parse_since, preparar_alteracoes,
+    aceita_ndjson, resposta_ndjson, resposta_json, pede_colunas, condicional, idempotente,
+    funcionario_serializador, parse_data, consultar_ocupados, calcular_horarios_livres
+)
 from server.routes import api
 
 
 @api.route('/funcionarios', methods=['GET'])
+@condicional(FuncionarioDB.__tablename__)
 def get_funcionarios():
-    """Retorna todos os funcionários"""
+    """
+    Retorna todos os funcionários
+    
+    Com ?since=<versão> retorna apenas as alterações desde essa versão:
+    {'versao': versão atual, 'funcionarios': [...], 'excluidos': [ids]}
+    (since=0 retorna todos os registros junto com a versão atual).
+    Com o cabeçalho 'Accept: application/x-ndjson' a resposta é transmitida
+    em NDJSON, um registro por linha (com since, a primeira linha traz
+    'versao' e 'excluidos').
+    Com ?format=columns a resposta é colunar: {'colunas': [...],
+    'linhas': [[...], ...]} (mais 'versao' e 'excluidos' com since), com
+    datas em microssegundos desde 1970 e valores monetários em centavos.
+    """
     db = SessionLocal()
     try:
-        funcionarios = db.query(FuncionarioDB).all()
-        return jsonify([funcionario_to_dict(f) for f in funcionarios])
+        colunar = pede_colunas()
+        consulta = funcionario_serializador.select(colunar).order_by(FuncionarioDB.id)
+        cabecalho = None
+        if 'since' in request.args:
+            try:
+                since = parse_since(request.args['since'])
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            versao, consulta, excluidos = preparar_alteracoes(db, FuncionarioDB, since, consulta)
+            cabecalho = {'versao': versao, 'excluidos': excluidos}
+        
+        if aceita_ndjson():
+            return resposta_ndjson(db, consulta, funcionario_serializador, cabecalho, colunar)
+        if colunar:
+            return resposta_json({**(cabecalho or {}), **funcionario_serializador.tabela(db.execute(consulta))})
+        funcionarios = funcionario_serializador.converter(db.execute(consulta))
+        if cabecalho is None:
+            return resposta_json(funcionarios)
+        return resposta_json({**cabecalho, 'funcionarios': funcionarios})
     finally:
         db.close()
 
 
 @api.route('/funcionarios', methods=['POST'])
+@idempotente
 def save_funcionarios():
     """
     Salva/atualiza lista de funcionários.
+    Com {'funcionarios': [...]} no corpo salva a lista; qualquer outro corpo
+    é tratado como um funcionário único a ser criado.
     IMPORTANTE: Não remove registros que não estão na requisição.
     Apenas atualiza ou cria novos registros baseado nos dados recebidos.
     """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'O corpo da requisição deve ser um objeto JSON'}), 400
+    if 'funcionarios' not in data:
+        return _create_funcionario(data)
+    
     db = SessionLocal()
     try:
-        data = request.json
+        iniciar_escrita(db)
         funcionarios_data = data.get('funcionarios', [])
         
-        existing_ids = {f.id for f in db.query(FuncionarioDB).all()}
+        ids = upsert_em_lote(db, FuncionarioDB, funcionarios_data, funcionario_from_dict)
         
-        for funcionario_data in funcionarios_data:
-            if funcionario_data.get('id') and funcionario_data['id'] in existing_ids:
-                funcionario_db = db.query(FuncionarioDB).filter(FuncionarioDB.id == funcionario_data['id']).first()
-                if funcionario_db:
-                    funcionario_db.nome = funcionario_data.get('nome', '')
-                    funcionario_db.telefone = funcionario_data.get('telefone', '')
-                    funcionario_db.email = funcionario_data.get('email', '')
-                    funcionario_db.cargo = funcionario_data.get('cargo', '')
-                    if funcionario_data.get('data_admissao'):
-                        funcionario_db.data_admissao = datetime.fromisoformat(funcionario_data['data_admissao'])
-                    funcionario_db.salario = funcionario_data.get('salario', 0.0)
-                    funcionario_db.ativo = funcionario_data.get('ativo', True)
-            else:
-                funcionario_db = FuncionarioDB(
-                    nome=funcionario_data.get('nome', ''),
-                    telefone=funcionario_data.get('telefone', ''),
-                    email=funcionario_data.get('email', ''),
-                    cargo=funcionario_data.get('cargo', ''),
-                    data_admissao=datetime.fromisoformat(funcionario_data['data_admissao']) if funcionario_data.get('data_admissao') else datetime.now(),
-                    salario=funcionario_data.get('salario', 0.0),
-                    ativo=funcionario_data.get('ativo', True)
-                )
-                db.add(funcionario_db)
-                db.flush()
-                funcionario_data['id'] = funcionario_db.id
+        db.commit()
+        return jsonify({'success': True, 'ids': ids})
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+def _create_funcionario(data: dict):
+    """Cria um funcionário único a partir do corpo da requisição"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        funcionario_db = FuncionarioDB(**funcionario_from_dict(data))
+        funcionario_db.versao = proxima_versao(db, FuncionarioDB.__tablename__)
+        db.add(funcionario_db)
+        db.commit()
+        return jsonify({'success': True, 'funcionario': funcionario_to_dict(funcionario_db)}), 201
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+@api.route('/funcionarios/<int:funcionario_id>', methods=['PATCH'])
+@idempotente
+def update_funcionario(funcionario_id):
+    """Atualiza apenas os campos enviados de um funcionário"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        funcionario_db = db.get(FuncionarioDB, funcionario_id)
+        if not funcionario_db:
+            return jsonify({'success': False, 'error': 'Funcionário não encontrado'}), 404
         
+        for campo, valor in funcionario_from_dict(request.json or {}, parcial=True).items():
+            setattr(funcionario_db, campo, valor)
+        funcionario_db.versao = proxima_versao(db, FuncionarioDB.__tablename__)
         db.commit()
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'funcionario': funcionario_to_dict(funcionario_db)})
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         db.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -70,15 +136,18 @@ def save_funcionarios():
 
 
 @api.route('/funcionarios/<int:funcionario_id>', methods=['DELETE'])
+@idempotente
 def delete_funcionario(funcionario_id):
     """Remove um funcionário do banco de dados"""
     db = SessionLocal()
     try:
+        iniciar_escrita(db)
         funcionario_db = db.query(FuncionarioDB).filter(FuncionarioDB.id == funcionario_id).first()
         if not funcionario_db:
             return jsonify({'success': False, 'error': 'Funcionário não encontrado'}), 404
         
         db.delete(funcionario_db)
+        registrar_exclusao(db, FuncionarioDB.__tablename__, funcionario_id)
         db.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -87,3 +156,49 @@ def delete_funcionario(funcionario_id):
     finally:
         db.close()
 
+
+
+@api.route('/funcionarios/<int:funcionario_id>/disponibilidade', methods=['GET'])
+@condicional(FuncionarioDB.__tablename__, AgendamentoDB.__tablename__, ServicoDB.__tablename__)
+def get_disponibilidade(funcionario_id):
+    """
+    Retorna os horários livres de um funcionário em um dia
+    
+    Parâmetros: data (AAAA-MM-DD, obrigatório) e servico_id (opcional;
+    define a duração, padrão 30 minutos).
+    Retorna {'funcionario_id', 'data', 'duracao_minutos',
+    'horarios': ['HH:MM', ...], 'ocupados': [{'inicio', 'fim'}, ...]}.
+    """
+    try:
+        if not request.args.get('data'):
+            raise ValueError("O parâmetro 'data' é obrigatório")
+        dia = parse_data(request.args['data'])
+        servico_id = int(request.args['servico_id']) if request.args.get('servico_id') else None
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    db = SessionLocal()
+    try:
+        if db.get(FuncionarioDB, funcionario_id) is None:
+            return jsonify({'success': False, 'error': 'Funcionário não encontrado'}), 404
+        
+        duracao_minutos = 30
+        if servico_id is not None:
+            servico_db = db.get(ServicoDB, servico_id)
+            if servico_db is None:
+                return jsonify({'success': False, 'error': 'Serviço não encontrado'}), 404
+            duracao_minutos = servico_db.duracao_minutos
+        
+        ocupados = consultar_ocupados(db, funcionario_id, dia)
+        horarios = calcular_horarios_livres(dia, ocupados, duracao_minutos)
+        return jsonify({
+            'funcionario_id': funcionario_id,
+            'data': dia.isoformat(),
+            'duracao_minutos': duracao_minutos,
+            'horarios': [h.strftime('%H:%M') for h in horarios],
+            'ocupados': [{'inicio': inicio.isoformat(), 'fim': fim.isoformat()} for inicio, fim in ocupados]
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
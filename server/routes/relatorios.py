@@ -0,0 +1,76 @@
+"""
+Rotas de relatórios (agregações calculadas no banco)
+"""
+
+from flask import request, jsonify
+from sqlalchemy import func
+from shared.database import SessionLocal, ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB
+from server.utils import parse_periodo, condicional
+from server.routes import api
+
+
+def _agrupar_por(db, model, coluna_id, filtros):
+    """Quantidade e receita dos agendamentos agrupados por serviço ou funcionário"""
+    quantidade = func.count(AgendamentoDB.id).label('quantidade')
+    linhas = (
+        db.query(model.id, model.nome, quantidade, func.sum(AgendamentoDB.valor_total))
+        .select_from(AgendamentoDB)
+        .join(model, model.id == coluna_id)
+        .filter(*filtros)
+        .group_by(model.id, model.nome)
+        .order_by(quantidade.desc(), model.nome)
+        .all()
+    )
+    return [
+        {'id': item_id, 'nome': nome, 'quantidade': qtd, 'receita': round(float(receita or 0), 2)}
+        for item_id, nome, qtd, receita in linhas
+    ]
+
+
+@api.route('/relatorios', methods=['GET'])
+@condicional(ClienteDB.__tablename__, FuncionarioDB.__tablename__, ServicoDB.__tablename__,
+             AgendamentoDB.__tablename__)
+def get_relatorio():
+    """
+    Retorna o relatório dos agendamentos concluídos em um período
+    
+    Parâmetros: inicio e fim (AAAA-MM-DD, inclusivos).
+    Retorna {'inicio', 'fim', 'total_agendamentos', 'receita_total',
+    'clientes_ativos', 'funcionarios_ativos', 'servicos': [...],
+    'funcionarios': [...]}, onde cada item das listas é
+    {'id', 'nome', 'quantidade', 'receita'}, ordenado por quantidade.
+    """
+    try:
+        inicio, fim = parse_periodo(request.args.get('inicio'), request.args.get('fim'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    db = SessionLocal()
+    try:
+        filtros = (
+            AgendamentoDB.status == 'concluido',
+            AgendamentoDB.data_agendamento >= inicio,
+            AgendamentoDB.data_agendamento < fim,
+        )
+        total, receita = (
+            db.query(func.count(AgendamentoDB.id), func.sum(AgendamentoDB.valor_total))
+            .filter(*filtros)
+            .one()
+        )
+        clientes_ativos = db.query(func.count(ClienteDB.id)).filter(ClienteDB.ativo.is_(True)).scalar()
+        funcionarios_ativos = db.query(func.count(FuncionarioDB.id)).filter(FuncionarioDB.ativo.is_(True)).scalar()
+        
+        return jsonify({
+            'inicio': request.args['inicio'],
+            'fim': request.args['fim'],
+            'total_agendamentos': total,
+            'receita_total': round(float(receita or 0), 2),
+            'clientes_ativos': clientes_ativos,
+            'funcionarios_ativos': funcionarios_ativos,
+            'servicos': _agrupar_por(db, ServicoDB, AgendamentoDB.servico_id, filtros),
+            'funcionarios': _agrupar_por(db, FuncionarioDB, AgendamentoDB.funcionario_id, filtros)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
@@ -3,60 +3,131 @@ Rotas para gerenciamento de serviços
 """
 
 from flask import request, jsonify
-from decimal import Decimal
-from shared.database import SessionLocal, ServicoDB
-from server.utils import servico_to_dict
+from shared.database import SessionLocal, ServicoDB, iniciar_escrita
+from server.utils import (
+    servico_to_dict, servico_from_dict, upsert_em_lote,
+    proxima_versao, registrar_exclusao, parse_since, preparar_alteracoes,
+    aceita_ndjson, resposta_ndjson, resposta_json, pede_colunas, condicional, idempotente,
+    servico_serializador
+)
 from server.routes import api
 
 
 @api.route('/servicos', methods=['GET'])
+@condicional(ServicoDB.__tablename__)
 def get_servicos():
-    """Retorna todos os serviços"""
+    """
+    Retorna todos os serviços
+    
+    Com ?since=<versão> retorna apenas as alterações desde essa versão:
+    {'versao': versão atual, 'servicos': [...], 'excluidos': [ids]}
+    (since=0 retorna todos os registros junto com a versão atual).
+    Com o cabeçalho 'Accept: application/x-ndjson' a resposta é transmitida
+    em NDJSON, um registro por linha (com since, a primeira linha traz
+    'versao' e 'excluidos').
+    Com ?format=columns a resposta é colunar: {'colunas': [...],
+    'linhas': [[...], ...]} (mais 'versao' e 'excluidos' com since), com
+    datas em microssegundos desde 1970 e valores monetários em centavos.
+    """
     db = SessionLocal()
     try:
-        servicos = db.query(ServicoDB).all()
-        return jsonify([servico_to_dict(s) for s in servicos])
+        colunar = pede_colunas()
+        consulta = servico_serializador.select(colunar).order_by(ServicoDB.id)
+        cabecalho = None
+        if 'since' in request.args:
+            try:
+                since = parse_since(request.args['since'])
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            versao, consulta, excluidos = preparar_alteracoes(db, ServicoDB, since, consulta)
+            cabecalho = {'versao': versao, 'excluidos': excluidos}
+        
+        if aceita_ndjson():
+            return resposta_ndjson(db, consulta, servico_serializador, cabecalho, colunar)
+        if colunar:
+            return resposta_json({**(cabecalho or {}), **servico_serializador.tabela(db.execute(consulta))})
+        servicos = servico_serializador.converter(db.execute(consulta))
+        if cabecalho is None:
+            return resposta_json(servicos)
+        return resposta_json({**cabecalho, 'servicos': servicos})
     finally:
         db.close()
 
 
 @api.route('/servicos', methods=['POST'])
+@idempotente
 def save_servicos():
     """
     Salva/atualiza lista de serviços.
+    Com {'servicos': [...]} no corpo salva a lista; qualquer outro corpo
+    é tratado como um serviço único a ser criado.
     IMPORTANTE: Não remove registros que não estão na requisição.
     Apenas atualiza ou cria novos registros baseado nos dados recebidos.
     """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'O corpo da requisição deve ser um objeto JSON'}), 400
+    if 'servicos' not in data:
+        return _create_servico(data)
+    
     db = SessionLocal()
     try:
-        data = request.json
+        iniciar_escrita(db)
         servicos_data = data.get('servicos', [])
         
-        existing_ids = {s.id for s in db.query(ServicoDB).all()}
+        ids = upsert_em_lote(db, ServicoDB, servicos_data, servico_from_dict)
         
-        for servico_data in servicos_data:
-            if servico_data.get('id') and servico_data['id'] in existing_ids:
-                servico_db = db.query(ServicoDB).filter(ServicoDB.id == servico_data['id']).first()
-                if servico_db:
-                    servico_db.nome = servico_data.get('nome', '')
-                    servico_db.descricao = servico_data.get('descricao', '')
-                    servico_db.preco = Decimal(str(servico_data.get('preco', 0.00)))
-                    servico_db.duracao_minutos = servico_data.get('duracao_minutos', 30)
-                    servico_db.ativo = servico_data.get('ativo', True)
-            else:
-                servico_db = ServicoDB(
-                    nome=servico_data.get('nome', ''),
-                    descricao=servico_data.get('descricao', ''),
-                    preco=Decimal(str(servico_data.get('preco', 0.00))),
-                    duracao_minutos=servico_data.get('duracao_minutos', 30),
-                    ativo=servico_data.get('ativo', True)
-                )
-                db.add(servico_db)
-                db.flush()
-                servico_data['id'] = servico_db.id
+        db.commit()
+        return jsonify({'success': True, 'ids': ids})
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+def _create_servico(data: dict):
+    """Cria um serviço único a partir do corpo da requisição"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        servico_db = ServicoDB(**servico_from_dict(data))
+        servico_db.versao = proxima_versao(db, ServicoDB.__tablename__)
+        db.add(servico_db)
+        db.commit()
+        return jsonify({'success': True, 'servico': servico_to_dict(servico_db)}), 201
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        db.close()
+
+
+@api.route('/servicos/<int:servico_id>', methods=['PATCH'])
+@idempotente
+def update_servico(servico_id):
+    """Atualiza apenas os campos enviados de um serviço"""
+    db = SessionLocal()
+    try:
+        iniciar_escrita(db)
+        servico_db = db.get(ServicoDB, servico_id)
+        if not servico_db:
+            return jsonify({'success': False, 'error': 'Serviço não encontrado'}), 404
         
+        for campo, valor in servico_from_dict(request.json or {}, parcial=True).items():
+            setattr(servico_db, campo, valor)
+        servico_db.versao = proxima_versao(db, ServicoDB.__tablename__)
         db.commit()
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'servico': servico_to_dict(servico_db)})
+    except ValueError as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         db.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -65,15 +136,18 @@ def save_servicos():
 
 
 @api.route('/servicos/<int:servico_id>', methods=['DELETE'])
+@idempotente
 def delete_servico(servico_id):
     """Remove um serviço do banco de dados"""
     db = SessionLocal()
     try:
+        iniciar_escrita(db)
         servico_db = db.query(ServicoDB).filter(ServicoDB.id == servico_id).first()
         if not servico_db:
             return jsonify({'success': False, 'error': 'Serviço não encontrado'}), 404
         
         db.delete(servico_db)
+        registrar_exclusao(db, ServicoDB.__tablename__, servico_id)
         db.commit()
         return jsonify({'success': True})
     except Exception as e:
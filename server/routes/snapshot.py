@@ -0,0 +1,56 @@
+"""
+Rota de carga inicial: as quatro coleções em uma única requisição
+"""
+
+from flask import request, jsonify
+from shared.database import SessionLocal, ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB
+from server.utils import (
+    versoes_tabelas, filtrar_agendamentos, resposta_json, condicional,
+    cliente_serializador, funcionario_serializador, servico_serializador, agendamento_serializador
+)
+from server.routes import api
+
+_FILTROS_AGENDAMENTOS = ('data_inicio', 'data_fim', 'funcionario_id', 'cliente_id', 'status')
+
+
+@api.route('/snapshot', methods=['GET'])
+@condicional(ClienteDB.__tablename__, FuncionarioDB.__tablename__, ServicoDB.__tablename__,
+             AgendamentoDB.__tablename__)
+def get_snapshot():
+    """
+    Retorna clientes, funcionários, serviços e agendamentos lidos na mesma transação
+    
+    Os agendamentos aceitam os mesmos filtros de GET /api/agendamentos
+    (data_inicio, data_fim, funcionario_id, cliente_id, status).
+    Retorna {'versoes': {coleção: versão}, 'filtrado': bool, 'clientes': [...],
+    'funcionarios': [...], 'servicos': [...], 'agendamentos': [...]}; as
+    versões correspondem exatamente aos dados e podem ser usadas em ?since=.
+    """
+    db = SessionLocal()
+    try:
+        try:
+            consulta_agendamentos = filtrar_agendamentos(agendamento_serializador.select(), request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Todas as leituras abaixo ocorrem na mesma transação (mesmo snapshot do banco)
+        versoes = versoes_tabelas(db, [
+            ClienteDB.__tablename__, FuncionarioDB.__tablename__,
+            ServicoDB.__tablename__, AgendamentoDB.__tablename__
+        ])
+        colecoes = {}
+        for chave, model, serializador, consulta in (
+            ('clientes', ClienteDB, cliente_serializador, cliente_serializador.select()),
+            ('funcionarios', FuncionarioDB, funcionario_serializador, funcionario_serializador.select()),
+            ('servicos', ServicoDB, servico_serializador, servico_serializador.select()),
+            ('agendamentos', AgendamentoDB, agendamento_serializador, consulta_agendamentos),
+        ):
+            colecoes[chave] = serializador.converter(db.execute(consulta.order_by(model.id)))
+        
+        return resposta_json({
+            'versoes': versoes,
+            'filtrado': any(request.args.get(filtro) for filtro in _FILTROS_AGENDAMENTOS),
+            **colecoes
+        })
+    finally:
+        db.close()
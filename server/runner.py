@@ -0,0 +1,347 @@
+"""
+Execução do servidor em modo de produção
+
+Usa o waitress quando instalado e há um único processo; caso contrário,
+um servidor pré-fork: o processo mestre abre o socket, inicializa o banco
+e cria N processos filhos, cada um atendendo requisições com um pool de
+threads. Uma conexão só é aceita quando o pool tem thread livre, e as
+conexões do feed de eventos (/api/events) são limitadas a uma parte do
+pool (acima disso recebem 503). Sinais tratados pelo mestre:
+    SIGTERM/SIGINT: desligamento gracioso (requisições em andamento terminam)
+    SIGHUP: recarga graciosa (novos workers sobem antes dos antigos saírem)
+
+O mestre não importa a aplicação: cada worker importa server.app (rotas e
+utilitários) depois do fork, portanto os workers criados por SIGHUP já
+usam o código atual do disco. Alterações em shared/ (modelos e conexão com
+o banco) só valem reiniciando o mestre.
+"""
+
+import os
+import select
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from sqlalchemy import text
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from shared.database import engine, init_db
+
+# Padrões (podem ser alterados por variáveis de ambiente ou argumentos)
+DEFAULT_WORKERS = int(os.environ.get("BARBEARIA_WORKERS", str(min(os.cpu_count() or 1, 4))))
+DEFAULT_THREADS = int(os.environ.get("BARBEARIA_THREADS", "8"))
+# Tempo (s) que uma conexão keep-alive ociosa pode ocupar uma thread
+KEEPALIVE_TIMEOUT = int(os.environ.get("BARBEARIA_KEEPALIVE_TIMEOUT", "5"))
+# Conexões de /api/events por processo (padrão: metade das threads)
+MAX_CONEXOES_EVENTOS = os.environ.get("BARBEARIA_EVENTOS_MAX")
+# Tempo (s) máximo de espera pelas requisições em andamento ao desligar
+GRACEFUL_TIMEOUT = int(os.environ.get("BARBEARIA_GRACEFUL_TIMEOUT", "30"))
+# Tempo (s) que os novos workers de uma recarga têm para importar a aplicação
+STARTUP_TIMEOUT = int(os.environ.get("BARBEARIA_STARTUP_TIMEOUT", "30"))
+
+
+class _RequestHandler(WSGIRequestHandler):
+    """Handler HTTP/1.1 com keep-alive limitado por timeout"""
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
+
+class ServidorComPool(BaseWSGIServer):
+    """
+    Servidor WSGI que atende as conexões em um pool fixo de threads
+
+    Uma conexão só é aceita quando há thread livre: com o pool ocupado ela
+    continua na fila do socket, onde outro worker pode aceitá-la, em vez de
+    esperar na fila interna do executor.
+    """
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, threads: int, fd: int = None, multiprocess: bool = False):
+        self.multiprocess = multiprocess
+        super().__init__(host, port, app, handler=_RequestHandler, fd=fd)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        self._threads_livres = threading.Semaphore(threads)
+        self._thread_reservada = False
+
+    def _handle_request_noblock(self):
+        # Chamado pelo serve_forever quando o socket tem conexão pendente.
+        # O timeout mantém o laço respondendo a shutdown() com o pool cheio.
+        if not self._threads_livres.acquire(timeout=0.5):
+            return
+        self._thread_reservada = True
+        try:
+            super()._handle_request_noblock()
+        finally:
+            # Nenhuma conexão aceita (outro worker a pegou): devolver a thread
+            if self._thread_reservada:
+                self._thread_reservada = False
+                self._threads_livres.release()
+
+    def process_request(self, request, client_address):
+        self._thread_reservada = False
+        self._pool.submit(self._processar, request, client_address)
+
+    def _processar(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._threads_livres.release()
+
+    def encerrar(self):
+        """Para de aceitar conexões e aguarda as requisições em andamento"""
+        # shutdown() bloqueia até serve_forever sair, por isso roda em outra thread
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def fechar(self):
+        """Fecha o socket e espera as threads terminarem (chamar após serve_forever)"""
+        from server.utils import monitor_alteracoes
+        self.server_close()
+        # Conexões de /api/events ficam abertas indefinidamente: encerrá-las
+        # para que suas threads terminem
+        monitor_alteracoes.encerrar()
+        self._pool.shutdown(wait=True)
+
+
+def limitar_conexoes_eventos(threads: int) -> int:
+    """
+    Define quantas conexões de /api/events cada processo aceita
+
+    Cada conexão do feed ocupa uma thread enquanto estiver aberta; o limite
+    (BARBEARIA_EVENTOS_MAX ou metade das threads) deixa o restante do pool
+    para as requisições comuns.
+
+    Returns:
+        O limite aplicado
+    """
+    from server.utils import monitor_alteracoes
+    limite = int(MAX_CONEXOES_EVENTOS) if MAX_CONEXOES_EVENTOS else max(1, threads // 2)
+    monitor_alteracoes.limite = limite
+    return limite
+
+
+def verificar_modo_journal(workers: int):
+    """
+    Garante que o modo de journal do SQLite é seguro para vários processos
+
+    Com mais de um processo o banco precisa estar em WAL: no modo rollback
+    cada escrita bloqueia todas as leituras dos outros processos.
+
+    Raises:
+        RuntimeError: Se workers > 1 e o banco não estiver em WAL
+    """
+    with engine.connect() as conn:
+        modo = conn.execute(text("PRAGMA journal_mode")).scalar()
+    if workers > 1 and str(modo).lower() != "wal":
+        raise RuntimeError(
+            f"O banco está em journal_mode={modo}; com {workers} workers é necessário WAL "
+            "(defina BARBEARIA_DB_JOURNAL_MODE=WAL ou use --workers 1)"
+        )
+    return modo
+
+
+def _executar_worker(sock: socket.socket, threads: int, pronto: Optional[int] = None):
+    """
+    Loop de um processo filho: importa a aplicação e atende requisições até receber SIGTERM
+
+    Args:
+        pronto: Pipe em que o worker avisa que criou a aplicação (recarga)
+    """
+    # Conexões abertas pelo mestre não podem ser usadas após o fork
+    engine.dispose(close=False)
+    from server.app import create_app
+    app = create_app()
+    if pronto is not None:
+        os.write(pronto, b"1")
+        os.close(pronto)
+
+    limitar_conexoes_eventos(threads)
+    host, port = sock.getsockname()[:2]
+    servidor = ServidorComPool(host, port, app, threads, fd=sock.fileno(), multiprocess=True)
+    # O socket é compartilhado entre os workers: accept não bloqueante evita
+    # que um worker fique preso em accept depois que outro pegou a conexão
+    servidor.socket.setblocking(False)
+    signal.signal(signal.SIGTERM, lambda signum, frame: servidor.encerrar())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.fechar()
+    os._exit(0)
+
+
+def _executar_prefork(host: str, port: int, workers: int, threads: int):
+    """Processo mestre do modo pré-fork (somente POSIX)"""
+    sock = socket.create_server((host, port), backlog=128)
+    sock.set_inheritable(True)
+
+    filhos: Dict[int, Optional[int]] = {}  # pid -> geração (None: recarga cancelada)
+    estado = {'geracao': 0, 'parar': False, 'recarregar': False}
+
+    def iniciar_worker(avisar: bool = False):
+        """
+        Cria um worker da geração atual
+
+        Returns:
+            (pid, pipe de leitura do aviso de pronto ou None se avisar=False)
+        """
+        leitura, escrita = os.pipe() if avisar else (None, None)
+        pid = os.fork()
+        if pid == 0:
+            if leitura is not None:
+                os.close(leitura)
+            try:
+                _executar_worker(sock, threads, escrita)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+            finally:
+                os._exit(1)
+        if escrita is not None:
+            os.close(escrita)
+        filhos[pid] = estado['geracao']
+        return pid, leitura
+
+    def aguardar_prontos(novos) -> bool:
+        """Espera os workers criarem a aplicação; False se algum falhar ou demorar"""
+        pendentes = {leitura for _, leitura in novos}
+        limite = time.monotonic() + STARTUP_TIMEOUT
+        ok = True
+        while pendentes and ok:
+            restante = limite - time.monotonic()
+            prontos = select.select(list(pendentes), [], [], restante)[0] if restante > 0 else []
+            ok = bool(prontos)
+            for leitura in prontos:
+                pendentes.discard(leitura)
+                # Fim do pipe sem o aviso: o worker saiu antes de ficar pronto
+                if os.read(leitura, 1) != b"1":
+                    ok = False
+        for _, leitura in novos:
+            os.close(leitura)
+        return ok
+
+    def encerrar_filhos(pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def ao_parar(signum, frame):
+        estado['parar'] = True
+
+    def ao_recarregar(signum, frame):
+        estado['recarregar'] = True
+
+    signal.signal(signal.SIGTERM, ao_parar)
+    signal.signal(signal.SIGINT, ao_parar)
+    signal.signal(signal.SIGHUP, ao_recarregar)
+
+    for _ in range(workers):
+        iniciar_worker()
+    print(f"Mestre {os.getpid()}: {workers} workers x {threads} threads em http://{host}:{port}")
+
+    while not estado['parar']:
+        if estado['recarregar']:
+            estado['recarregar'] = False
+            antigos = list(filhos)
+            estado['geracao'] += 1
+            novos = [iniciar_worker(avisar=True) for _ in range(workers)]
+            # Os antigos só saem depois que o código novo importou sem erro
+            if aguardar_prontos(novos):
+                encerrar_filhos(antigos)
+                print(f"Recarga: {workers} novos workers iniciados")
+            else:
+                estado['geracao'] -= 1
+                for pid, _ in novos:
+                    filhos[pid] = None  # não substituir quando saírem
+                encerrar_filhos([pid for pid, _ in novos])
+                print("Recarga cancelada: os novos workers não iniciaram; mantendo os atuais")
+
+        try:
+            pid, _status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid:
+            geracao = filhos.pop(pid, None)
+            # Worker da geração atual saiu inesperadamente: substituir
+            if geracao == estado['geracao'] and not estado['parar']:
+                print(f"Worker {pid} terminou inesperadamente; iniciando outro")
+                time.sleep(1)  # evita laço de reinícios se o worker falhar ao subir
+                iniciar_worker()
+            continue
+        time.sleep(0.5)
+
+    print("Desligando: aguardando requisições em andamento...")
+    encerrar_filhos(list(filhos))
+    limite = time.monotonic() + GRACEFUL_TIMEOUT
+    while filhos and time.monotonic() < limite:
+        try:
+            pid, _status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            filhos.pop(pid, None)
+        else:
+            time.sleep(0.1)
+    for pid in filhos:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    sock.close()
+
+
+def _executar_threaded(host: str, port: int, threads: int):
+    """Servidor de processo único com pool de threads"""
+    from server.app import create_app
+    app = create_app()
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    limitar_conexoes_eventos(threads)
+    if serve is not None:
+        print(f"waitress: {threads} threads em http://{host}:{port}")
+        serve(app, host=host, port=port, threads=threads, channel_timeout=KEEPALIVE_TIMEOUT)
+        return
+
+    servidor = ServidorComPool(host, port, app, threads)
+    signal.signal(signal.SIGTERM, lambda signum, frame: servidor.encerrar())
+    print(f"{threads} threads em http://{host}:{port}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.fechar()
+
+
+def executar_producao(host: str = "0.0.0.0", port: int = 5000,
+                      workers: int = DEFAULT_WORKERS, threads: int = DEFAULT_THREADS):
+    """
+    Inicia o servidor em modo de produção
+
+    Args:
+        host: Endereço de escuta
+        port: Porta de escuta
+        workers: Número de processos (ignorado fora de POSIX)
+        threads: Threads por processo
+    """
+    if workers > 1 and not hasattr(os, "fork"):
+        print("Aviso: vários processos não são suportados nesta plataforma; usando 1 worker")
+        workers = 1
+
+    init_db()
+    modo = verificar_modo_journal(workers)
+    print(f"SQLite journal_mode={modo}")
+
+    if workers > 1:
+        _executar_prefork(host, port, workers, threads)
+    else:
+        _executar_threaded(host, port, threads)
@@ -4,11 +4,44 @@ Utilitários do servidor
 
 from .converters import (
     cliente_to_dict, funcionario_to_dict,
-    servico_to_dict, agendamento_to_dict
+    servico_to_dict, agendamento_to_dict,
+    cliente_from_dict, funcionario_from_dict,
+    servico_from_dict, agendamento_from_dict
 )
+from .pagination import encode_cursor, decode_cursor, parse_limit
+from .parametros import parse_data, parse_periodo, filtrar_agendamentos
+from .disponibilidade import consultar_ocupados, calcular_horarios_livres
+from .conflitos import ConflitoHorario, buscar_conflito, verificar_conflitos
+from .upsert import upsert_em_lote
+from .versoes import (
+    proxima_versao, versao_atual, registrar_exclusao,
+    parse_since, preparar_alteracoes
+)
+from .serializacao import (
+    Serializador, resposta_json, FORMATO_COLUNAS, pede_colunas,
+    cliente_serializador, funcionario_serializador, servico_serializador, agendamento_serializador
+)
+from .etag import versoes_tabelas, calcular_etag, condicional
+from .idempotencia import CABECALHO_IDEMPOTENCIA, idempotente
+from .eventos import MonitorAlteracoes, LimiteConexoesEventos, monitor_alteracoes, TABELAS_MONITORADAS
+from .streaming import MIME_NDJSON, aceita_ndjson, resposta_ndjson
 
 __all__ = [
     'cliente_to_dict', 'funcionario_to_dict',
-    'servico_to_dict', 'agendamento_to_dict'
+    'servico_to_dict', 'agendamento_to_dict',
+    'cliente_from_dict', 'funcionario_from_dict',
+    'servico_from_dict', 'agendamento_from_dict',
+    'encode_cursor', 'decode_cursor', 'parse_limit',
+    'parse_data', 'parse_periodo', 'filtrar_agendamentos',
+    'consultar_ocupados', 'calcular_horarios_livres',
+    'ConflitoHorario', 'buscar_conflito', 'verificar_conflitos',
+    'upsert_em_lote',
+    'proxima_versao', 'versao_atual', 'registrar_exclusao',
+    'parse_since', 'preparar_alteracoes',
+    'Serializador', 'resposta_json', 'FORMATO_COLUNAS', 'pede_colunas',
+    'cliente_serializador', 'funcionario_serializador', 'servico_serializador', 'agendamento_serializador',
+    'versoes_tabelas', 'calcular_etag', 'condicional',
+    'CABECALHO_IDEMPOTENCIA', 'idempotente',
+    'MonitorAlteracoes', 'LimiteConexoesEventos', 'monitor_alteracoes', 'TABELAS_MONITORADAS',
+    'MIME_NDJSON', 'aceita_ndjson', 'resposta_ndjson'
 ]
-
@@ -0,0 +1,101 @@
+"""
+Verificação de conflitos de horário entre agendamentos de um funcionário
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from shared.database import AgendamentoDB
+from .disponibilidade import STATUS_LIVRES
+
+# Duração máxima aceita para um agendamento. Limita a busca por sobreposição
+# no índice (funcionario_id, horario_inicio) a uma janela antes do horário.
+DURACAO_MAXIMA = timedelta(hours=24)
+
+# Tamanho dos lotes de IDs nas consultas com IN
+IN_CHUNK_SIZE = 500
+
+
+class ConflitoHorario(Exception):
+    """Um ou mais agendamentos se sobrepõem a outros do mesmo funcionário"""
+
+    def __init__(self, conflitos: List[dict]):
+        super().__init__("Conflito de horário: o barbeiro já possui agendamento nesse intervalo")
+        self.conflitos = conflitos
+
+
+def _bloqueia_agenda(status: str) -> bool:
+    return status not in STATUS_LIVRES
+
+
+def buscar_conflito(db: Session, funcionario_id: int, inicio: datetime, fim: datetime,
+                    ignorar_id: Optional[int] = None) -> Optional[AgendamentoDB]:
+    """
+    Retorna um agendamento do funcionário que se sobrepõe ao intervalo (ou None)
+
+    A busca usa o índice (funcionario_id, horario_inicio) restrita à janela
+    [inicio - DURACAO_MAXIMA, fim), então lê poucas linhas.
+    """
+    query = db.query(AgendamentoDB).filter(
+        AgendamentoDB.funcionario_id == funcionario_id,
+        AgendamentoDB.horario_inicio < fim,
+        AgendamentoDB.horario_inicio > inicio - DURACAO_MAXIMA,
+        AgendamentoDB.horario_fim > inicio,
+        AgendamentoDB.status.notin_(STATUS_LIVRES)
+    )
+    if ignorar_id is not None:
+        query = query.filter(AgendamentoDB.id != ignorar_id)
+    return query.order_by(AgendamentoDB.horario_inicio).first()
+
+
+def verificar_conflitos(db: Session, ids: List[int]):
+    """
+    Verifica se os agendamentos gravados conflitam com outros do mesmo funcionário
+
+    Deve ser chamada depois da escrita (flush) e antes do commit, dentro de
+    uma transação iniciada com iniciar_escrita, para que nenhum outro
+    terminal grave no mesmo intervalo entre a verificação e o commit.
+    Agendamentos do mesmo lote também são comparados entre si.
+
+    Args:
+        db: Sessão do banco de dados
+        ids: IDs dos agendamentos gravados, na ordem da requisição
+
+    Raises:
+        ValueError: Se algum agendamento tiver horário de fim inválido
+        ConflitoHorario: Se houver sobreposição (com a lista de conflitos)
+    """
+    db.flush()
+    gravados = {}
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        lote = ids[i:i + IN_CHUNK_SIZE]
+        for agendamento in db.query(AgendamentoDB).filter(AgendamentoDB.id.in_(lote)):
+            gravados[agendamento.id] = agendamento
+
+    conflitos = []
+    for indice, agendamento_id in enumerate(ids):
+        agendamento = gravados.get(agendamento_id)
+        if agendamento is None or not _bloqueia_agenda(agendamento.status):
+            continue
+        inicio, fim = agendamento.horario_inicio, agendamento.horario_fim
+        if inicio is None or fim is None:
+            continue
+        if fim <= inicio or fim - inicio > DURACAO_MAXIMA:
+            raise ValueError(f"Agendamento {indice}: horário de fim inválido")
+
+        existente = buscar_conflito(db, agendamento.funcionario_id, inicio, fim, ignorar_id=agendamento.id)
+        if existente is not None:
+            conflitos.append({
+                'indice': indice,
+                'funcionario_id': agendamento.funcionario_id,
+                'horario_inicio': inicio.isoformat(),
+                'horario_fim': fim.isoformat(),
+                'conflita_com': {
+                    'id': existente.id,
+                    'horario_inicio': existente.horario_inicio.isoformat(),
+                    'horario_fim': existente.horario_fim.isoformat()
+                }
+            })
+
+    if conflitos:
+        raise ConflitoHorario(conflitos)
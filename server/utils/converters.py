@@ -3,7 +3,7 @@ Funções de conversão entre modelos de banco e dicionários
 """
 
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from shared.database import ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB
 
 
@@ -61,3 +61,109 @@ def agendamento_to_dict(agendamento_db: AgendamentoDB) -> dict:
         'valor_total': float(agendamento_db.valor_total)
     }
 
+
+
+# Campos aceitos na escrita de cada entidade: nome -> valor padrão (todas
+# as colunas são NOT NULL). Campos de data são tratados à parte: só são
+# gravados quando informados.
+_CAMPOS_CLIENTE = {'nome': '', 'telefone': '', 'email': '', 'observacoes': '', 'ativo': True}
+_CAMPOS_FUNCIONARIO = {'nome': '', 'telefone': '', 'email': '', 'cargo': '', 'salario': 0.0, 'ativo': True}
+_CAMPOS_SERVICO = {'nome': '', 'descricao': '', 'preco': 0.00, 'duracao_minutos': 30, 'ativo': True}
+_CAMPOS_AGENDAMENTO = {
+    'cliente_id': 0, 'funcionario_id': 0, 'servico_id': 0,
+    'status': 'agendado', 'observacoes': '', 'valor_total': 0.00
+}
+
+# Campos que a criação (e cada item de um lote) precisa receber preenchidos
+_OBRIGATORIOS_CLIENTE = ('nome',)
+_OBRIGATORIOS_FUNCIONARIO = ('nome',)
+_OBRIGATORIOS_SERVICO = ('nome',)
+_OBRIGATORIOS_AGENDAMENTO = (
+    'cliente_id', 'funcionario_id', 'servico_id',
+    'data_agendamento', 'horario_inicio', 'horario_fim'
+)
+
+
+def _extrair_valores(data: dict, campos: dict, campos_data: tuple, campos_decimal: tuple,
+                     obrigatorios: tuple, parcial: bool) -> dict:
+    """
+    Extrai os valores de colunas de um dicionário recebido pela API
+    
+    Args:
+        obrigatorios: Campos que precisam estar preenchidos (se parcial,
+            apenas os presentes em data)
+        parcial: Se True, considera apenas os campos presentes em data
+            (sem aplicar valores padrão)
+    
+    Raises:
+        ValueError: Se data não for um objeto, se faltar (ou vier vazio) algum
+            campo obrigatório, se um campo vier nulo, ou se um número ou uma
+            data for inválido
+    """
+    if not isinstance(data, dict):
+        raise ValueError("O registro deve ser um objeto JSON")
+    if parcial:
+        vazios = [campo for campo in obrigatorios if campo in data and data[campo] in (None, '')]
+        if vazios:
+            raise ValueError(f"Campos obrigatórios não podem ficar vazios: {', '.join(vazios)}")
+    else:
+        ausentes = [campo for campo in obrigatorios if data.get(campo) in (None, '')]
+        if ausentes:
+            raise ValueError(f"Campos obrigatórios ausentes: {', '.join(ausentes)}")
+    nulos = [campo for campo in campos if campo in data and data[campo] is None]
+    if nulos:
+        raise ValueError(f"Campos não podem ser nulos: {', '.join(nulos)}")
+    valores = {}
+    for campo, padrao in campos.items():
+        if not parcial or campo in data:
+            valores[campo] = data.get(campo, padrao)
+    for campo in campos_decimal:
+        if campo in valores:
+            valores[campo] = _decimal(campo, valores[campo])
+    for campo in campos_data:
+        if data.get(campo):
+            valores[campo] = _data(campo, data[campo])
+    return valores
+
+
+def _decimal(campo: str, valor) -> Decimal:
+    """Converte um valor monetário (ValueError se não for um número finito)"""
+    try:
+        numero = Decimal(str(valor))
+    except InvalidOperation:
+        numero = None
+    if numero is None or not numero.is_finite():
+        raise ValueError(f"O campo '{campo}' deve ser um número")
+    return numero
+
+
+def _data(campo: str, valor) -> datetime:
+    """Converte uma data ISO 8601 (ValueError se for inválida)"""
+    try:
+        return datetime.fromisoformat(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"O campo '{campo}' deve ser uma data ISO 8601 válida") from None
+
+
+def cliente_from_dict(data: dict, parcial: bool = False) -> dict:
+    """Converte dicionário da API em valores de colunas de ClienteDB"""
+    return _extrair_valores(data, _CAMPOS_CLIENTE, ('data_cadastro',), (), _OBRIGATORIOS_CLIENTE, parcial)
+
+
+def funcionario_from_dict(data: dict, parcial: bool = False) -> dict:
+    """Converte dicionário da API em valores de colunas de FuncionarioDB"""
+    return _extrair_valores(data, _CAMPOS_FUNCIONARIO, ('data_admissao',), (), _OBRIGATORIOS_FUNCIONARIO, parcial)
+
+
+def servico_from_dict(data: dict, parcial: bool = False) -> dict:
+    """Converte dicionário da API em valores de colunas de ServicoDB"""
+    return _extrair_valores(data, _CAMPOS_SERVICO, (), ('preco',), _OBRIGATORIOS_SERVICO, parcial)
+
+
+def agendamento_from_dict(data: dict, parcial: bool = False) -> dict:
+    """Converte dicionário da API em valores de colunas de AgendamentoDB"""
+    return _extrair_valores(
+        data, _CAMPOS_AGENDAMENTO,
+        ('data_agendamento', 'horario_inicio', 'horario_fim'), ('valor_total',),
+        _OBRIGATORIOS_AGENDAMENTO, parcial
+    )
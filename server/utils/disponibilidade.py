@@ -0,0 +1,96 @@
+"""
+Cálculo de horários disponíveis de um funcionário em um dia
+"""
+
+from datetime import datetime, date, timedelta
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from shared.database import AgendamentoDB
+
+# Horário de funcionamento da barbearia e intervalo entre os horários oferecidos
+HORA_ABERTURA = 8
+HORA_FECHAMENTO = 18
+INTERVALO_MINUTOS = 30
+
+# Status que não ocupam a agenda do funcionário
+STATUS_LIVRES = ('cancelado', 'concluido')
+
+Intervalo = Tuple[datetime, datetime]
+
+
+def consultar_ocupados(db: Session, funcionario_id: int, dia: date) -> List[Intervalo]:
+    """
+    Retorna os intervalos ocupados do funcionário no dia, ordenados pelo início
+
+    Usa o índice (funcionario_id, data_agendamento) e lê apenas os horários.
+    """
+    inicio_dia = datetime.combine(dia, datetime.min.time())
+    linhas = (
+        db.query(AgendamentoDB.horario_inicio, AgendamentoDB.horario_fim)
+        .filter(
+            AgendamentoDB.funcionario_id == funcionario_id,
+            AgendamentoDB.data_agendamento >= inicio_dia,
+            AgendamentoDB.data_agendamento < inicio_dia + timedelta(days=1),
+            AgendamentoDB.status.notin_(STATUS_LIVRES),
+            AgendamentoDB.horario_inicio.isnot(None),
+            AgendamentoDB.horario_fim.isnot(None)
+        )
+        .order_by(AgendamentoDB.horario_inicio)
+        .all()
+    )
+    return [(inicio, fim) for inicio, fim in linhas]
+
+
+def mesclar_intervalos(intervalos: List[Intervalo]) -> List[Intervalo]:
+    """Ordena os intervalos e une os que se sobrepõem ou se tocam"""
+    mesclados: List[Intervalo] = []
+    for inicio, fim in sorted(intervalos):
+        if mesclados and inicio <= mesclados[-1][1]:
+            if fim > mesclados[-1][1]:
+                mesclados[-1] = (mesclados[-1][0], fim)
+        else:
+            mesclados.append((inicio, fim))
+    return mesclados
+
+
+def calcular_horarios_livres(dia: date, ocupados: List[Intervalo], duracao_minutos: int) -> List[datetime]:
+    """
+    Calcula os horários de início livres no dia para um serviço
+
+    Varre os horários candidatos (a cada INTERVALO_MINUTOS dentro do
+    funcionamento) e os intervalos ocupados em ordem ao mesmo tempo, portanto
+    o custo é O(n log n + horários) em vez de testar cada horário contra
+    cada agendamento.
+
+    Args:
+        dia: Dia consultado
+        ocupados: Intervalos (início, fim) já agendados
+        duracao_minutos: Duração do serviço
+
+    Returns:
+        Horários de início em que o serviço cabe sem conflito
+    """
+    abertura = datetime.combine(dia, datetime.min.time()).replace(hour=HORA_ABERTURA)
+    fechamento = abertura.replace(hour=HORA_FECHAMENTO)
+    duracao = timedelta(minutes=duracao_minutos)
+    passo = timedelta(minutes=INTERVALO_MINUTOS)
+
+    mesclados = mesclar_intervalos(ocupados)
+    livres = []
+    i = 0
+    horario = abertura
+    while horario + duracao <= fechamento:
+        fim = horario + duracao
+        # Descartar intervalos que terminam antes deste horário: como os
+        # horários só avançam, eles não conflitam com nenhum dos próximos
+        while i < len(mesclados) and mesclados[i][1] <= horario:
+            i += 1
+        if i < len(mesclados) and mesclados[i][0] < fim:
+            # Conflito: pular direto para o primeiro horário após o fim do intervalo
+            ocupado_ate = mesclados[i][1]
+            while horario < ocupado_ate:
+                horario += passo
+            continue
+        livres.append(horario)
+        horario += passo
+    return livres
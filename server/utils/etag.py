@@ -0,0 +1,88 @@
+"""
+GET condicional (ETag / If-None-Match / 304) a partir das versões das tabelas
+
+O ETag não é um hash da resposta: é montado com as versões das tabelas
+consultadas (mantidas a cada escrita em versoes_tabela) e com os parâmetros
+da requisição. Se nenhuma tabela mudou, o servidor responde 304 sem
+executar a consulta nem serializar nada.
+"""
+
+import zlib
+from datetime import date
+from functools import wraps
+from typing import Dict, Sequence
+from flask import Response, make_response, request
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from shared.database import SessionLocal, VersaoTabelaDB
+
+# Parâmetros cujo valor não entra no ETag: quem envia 'since' junto com o
+# ETag já possui os dados daquela versão, então a resposta equivalente é a
+# mesma. A presença do parâmetro entra, porque muda o formato da resposta
+# (lista vs. {'versao', registros, 'excluidos'})
+_PARAMETROS_IGNORADOS = ('since',)
+
+
+def versoes_tabelas(db: Session, tabelas: Sequence[str]) -> Dict[str, int]:
+    """Lê a versão atual de várias tabelas em uma consulta (0 se nunca houve escrita)"""
+    versoes = dict.fromkeys(tabelas, 0)
+    linhas = db.execute(
+        select(VersaoTabelaDB.tabela, VersaoTabelaDB.versao).where(VersaoTabelaDB.tabela.in_(tabelas))
+    )
+    for tabela, versao in linhas:
+        versoes[tabela] = versao
+    return versoes
+
+
+def calcular_etag(versoes: Dict[str, int], por_dia: bool = False) -> str:
+    """
+    Monta o ETag da requisição atual
+
+    Args:
+        versoes: Versão de cada tabela usada pela resposta
+        por_dia: Inclui a data do servidor (respostas que dependem de "hoje")
+    """
+    parametros = sorted(
+        (chave, valor) for chave, valor in request.args.items(multi=True)
+        if chave not in _PARAMETROS_IGNORADOS
+    )
+    presentes = sorted(nome for nome in _PARAMETROS_IGNORADOS if nome in request.args)
+    chave = repr((parametros, presentes, request.headers.get('Accept', ''),
+                  date.today().isoformat() if por_dia else ''))
+    versao = '.'.join(str(versoes[tabela]) for tabela in sorted(versoes))
+    return f"{versao}-{zlib.crc32(chave.encode('utf-8')):08x}"
+
+
+def condicional(*tabelas: str, por_dia: bool = False):
+    """
+    Decorador de rotas GET com suporte a If-None-Match
+
+    As versões são lidas antes da consulta da rota: se uma escrita ocorrer
+    entre as duas, o cliente recebe dados mais novos que o ETag e apenas
+    baixa a resposta de novo na próxima vez, nunca fica com dados antigos.
+
+    Args:
+        tabelas: Tabelas cujo conteúdo a resposta usa
+        por_dia: A resposta depende da data do servidor
+    """
+    def decorador(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            db = SessionLocal()
+            try:
+                versoes = versoes_tabelas(db, tabelas)
+            finally:
+                db.close()
+            etag = calcular_etag(versoes, por_dia)
+
+            if request.if_none_match.contains_weak(etag):
+                resposta = Response(status=304)
+            else:
+                resposta = make_response(view(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            resposta.set_etag(etag, weak=True)
+            resposta.vary.add('Accept')
+            return resposta
+        return wrapper
+    return decorador
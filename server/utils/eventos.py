@@ -0,0 +1,184 @@
+"""
+Feed de alterações para o endpoint de eventos (Server-Sent Events)
+
+Cada processo do servidor tem um monitor que acompanha as versões das
+tabelas (versoes_tabela). Ele é acordado logo após cada commit feito neste
+processo e, para perceber as escritas dos outros processos (modo pré-fork),
+também verifica as versões a cada INTERVALO_VERIFICACAO segundos. Quando
+uma tabela muda, os IDs alterados/excluídos desde a última versão vista são
+enviados a todas as conexões abertas em /api/events.
+
+A thread do monitor só é criada na primeira assinatura, portanto nasce no
+processo worker (depois do fork) e não no mestre.
+"""
+
+import os
+import queue
+import threading
+from typing import Dict, Optional, Set
+from sqlalchemy import event, select
+from shared.database import SessionLocal, ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB, ExclusaoDB
+from .etag import versoes_tabelas
+
+# Intervalo (s) entre verificações das versões (escritas de outros processos)
+INTERVALO_VERIFICACAO = float(os.environ.get("BARBEARIA_EVENTOS_INTERVALO", "0.5"))
+
+# Acima desse número de registros alterados o evento não lista os IDs
+# ('ids': None): o cliente deve sincronizar a coleção inteira
+LIMITE_IDS = 1000
+
+TABELAS_MONITORADAS = {model.__tablename__: model for model in (ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB)}
+
+
+class LimiteConexoesEventos(Exception):
+    """O processo já atende o número máximo de conexões em /api/events"""
+
+    def __init__(self, limite: int):
+        super().__init__(f"Limite de {limite} conexões de eventos atingido; tente novamente mais tarde")
+        self.limite = limite
+
+
+class MonitorAlteracoes:
+    """
+    Detecta alterações nas tabelas e as distribui para as filas dos assinantes
+
+    Args:
+        limite: Máximo de conexões simultâneas (None = sem limite). Cada
+            conexão ocupa uma thread do servidor, então o executor de
+            produção define um limite menor que o pool de threads.
+    """
+
+    def __init__(self, limite: Optional[int] = None):
+        self.limite = limite
+        self._lock = threading.Lock()
+        # Serializa as leituras/atualizações de _versoes (linha de base)
+        self._lock_versoes = threading.Lock()
+        self._assinantes: Set[queue.Queue] = set()
+        self._acordar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._encerrado = False
+        self._versoes: Optional[Dict[str, int]] = None
+
+    def assinar(self) -> queue.Queue:
+        """
+        Registra uma nova conexão e retorna sua fila de eventos
+
+        A fila recebe dicionários de alteração; None indica que o servidor
+        está desligando e a conexão deve ser encerrada. Toda escrita feita
+        após o retorno gera um evento na fila.
+
+        Raises:
+            LimiteConexoesEventos: Se o processo já tiver self.limite conexões abertas
+        """
+        fila: queue.Queue = queue.Queue()
+        with self._lock_versoes:
+            if self._versoes is None:
+                self._versoes = self._ler_versoes()
+        with self._lock:
+            if self._encerrado:
+                fila.put(None)
+                return fila
+            self._verificar_limite()
+            self._assinantes.add(fila)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name="eventos", daemon=True)
+                self._thread.start()
+        return fila
+
+    def _verificar_limite(self):
+        limite = self.limite
+        if limite is not None and len(self._assinantes) >= limite:
+            raise LimiteConexoesEventos(limite)
+
+    def cancelar(self, fila: queue.Queue):
+        """Remove a fila de uma conexão encerrada"""
+        with self._lock:
+            self._assinantes.discard(fila)
+
+    def notificar(self):
+        """Pede uma verificação imediata (chamado após cada commit)"""
+        self._acordar.set()
+
+    def encerrar(self):
+        """Encerra todas as conexões abertas (desligamento do servidor)"""
+        with self._lock:
+            self._encerrado = True
+            assinantes = list(self._assinantes)
+            self._assinantes.clear()
+        for fila in assinantes:
+            fila.put(None)
+        self._acordar.set()
+
+    def _executar(self):
+        while not self._encerrado:
+            self._acordar.wait(INTERVALO_VERIFICACAO)
+            self._acordar.clear()
+            with self._lock:
+                sem_assinantes = not self._assinantes
+            if sem_assinantes:
+                # Sem conexões: a próxima assinatura recomeça da versão atual
+                with self._lock_versoes:
+                    self._versoes = None
+                continue
+            try:
+                eventos = self._verificar()
+            except Exception as e:
+                print(f"Erro ao verificar alterações: {e}")
+                continue
+            if eventos:
+                with self._lock:
+                    assinantes = list(self._assinantes)
+                for fila in assinantes:
+                    for evento in eventos:
+                        fila.put(evento)
+
+    def _ler_versoes(self) -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            return versoes_tabelas(db, list(TABELAS_MONITORADAS))
+        finally:
+            db.close()
+
+    def _verificar(self) -> list:
+        """Compara as versões atuais com as últimas vistas e monta os eventos"""
+        with self._lock_versoes:
+            return self._comparar_versoes()
+
+    def _comparar_versoes(self) -> list:
+        db = SessionLocal()
+        try:
+            atuais = versoes_tabelas(db, list(TABELAS_MONITORADAS))
+            anteriores = self._versoes
+            self._versoes = atuais
+            if anteriores is None:
+                return []
+
+            eventos = []
+            for tabela, versao in atuais.items():
+                desde = anteriores.get(tabela, 0)
+                if versao == desde:
+                    continue
+                model = TABELAS_MONITORADAS[tabela]
+                ids = list(db.scalars(
+                    select(model.id).where(model.versao > desde).order_by(model.id).limit(LIMITE_IDS + 1)
+                ))
+                excluidos = list(db.scalars(
+                    select(ExclusaoDB.registro_id)
+                    .where(ExclusaoDB.tabela == tabela, ExclusaoDB.versao > desde)
+                    .limit(LIMITE_IDS + 1)
+                ))
+                if len(ids) > LIMITE_IDS or len(excluidos) > LIMITE_IDS:
+                    ids = excluidos = None
+                eventos.append({'entidade': tabela, 'versao': versao, 'ids': ids, 'excluidos': excluidos})
+            return eventos
+        finally:
+            db.close()
+
+
+monitor_alteracoes = MonitorAlteracoes()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apos_commit(session):
+    """Acorda o monitor após cada commit deste processo"""
+    monitor_alteracoes.notificar()
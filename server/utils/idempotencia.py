@@ -0,0 +1,176 @@
+"""
+Requisições idempotentes (cabeçalho Idempotency-Key)
+
+O cliente desktop guarda as gravações feitas sem conexão e as reenvia
+quando o servidor volta. Se a resposta de um envio se perder, o mesmo
+pedido chega de novo: com a mesma Idempotency-Key o servidor devolve a
+resposta guardada em vez de criar o registro outra vez.
+
+A chave é reservada dentro da própria transação de escrita da rota: no
+commit da sessão (evento before_commit) é inserida uma linha pendente com
+a chave, então a gravação e a reserva são confirmadas ou desfeitas juntas.
+Se outro pedido com a mesma chave já confirmou a sua, a inserção viola a
+chave primária, o commit falha e a escrita repetida é desfeita; esse
+pedido devolve a resposta do primeiro. A resposta é gravada na linha logo
+depois; enquanto isso a linha fica pendente (a gravação já foi feita) e os
+reenvios esperam por ela até ESPERA_PENDENTE, recebendo 409 depois disso.
+
+As respostas (exceto erros 5xx de rotas que não gravaram nada, que podem
+ser repetidos) ficam guardadas por VALIDADE.
+"""
+
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Optional
+from flask import Response, g, has_request_context, jsonify, make_response, request
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.exc import IntegrityError
+from shared.database import SessionLocal, RespostaIdempotenteDB
+
+CABECALHO_IDEMPOTENCIA = 'Idempotency-Key'
+
+# Tempo que uma resposta fica guardada para reenvios
+VALIDADE = timedelta(days=7)
+
+TAMANHO_MAXIMO_CHAVE = 64
+
+# Status da linha reservada cuja resposta ainda não foi gravada
+STATUS_PENDENTE = 0
+
+# Tempo (s) que um reenvio espera a resposta de uma chave pendente
+ESPERA_PENDENTE = 2.0
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _reservar_chave(session):
+    """Insere a chave pendente na transação da rota que está sendo confirmada"""
+    if not has_request_context():
+        return
+    reserva = g.get('idempotencia')
+    if reserva is None or reserva['reservada']:
+        return
+    try:
+        session.execute(insert(RespostaIdempotenteDB).values(
+            chave=reserva['chave'],
+            metodo=request.method,
+            caminho=request.path,
+            status=STATUS_PENDENTE,
+            corpo='',
+            criado_em=datetime.now(),
+        ))
+    except IntegrityError:
+        # Outro pedido com a mesma chave já gravou: o commit falha e esta
+        # escrita é desfeita pela rota
+        reserva['conflito'] = True
+        raise
+    reserva['reservada'] = True
+
+
+def _guardar_resposta(chave: str, resposta: Response, reservada: bool) -> bool:
+    """
+    Grava a resposta da chave e remove as que passaram da validade
+
+    Args:
+        reservada: A linha pendente da chave foi inserida por este pedido
+
+    Returns:
+        False se a chave já tinha sido usada por outro pedido (nada gravado)
+    """
+    db = SessionLocal()
+    try:
+        db.execute(delete(RespostaIdempotenteDB).where(
+            RespostaIdempotenteDB.criado_em < datetime.now() - VALIDADE
+        ))
+        if reservada:
+            db.execute(
+                update(RespostaIdempotenteDB)
+                .where(RespostaIdempotenteDB.chave == chave)
+                .values(status=resposta.status_code, corpo=resposta.get_data(as_text=True))
+            )
+        else:
+            db.add(RespostaIdempotenteDB(
+                chave=chave,
+                metodo=request.method,
+                caminho=request.path,
+                status=resposta.status_code,
+                corpo=resposta.get_data(as_text=True),
+            ))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()  # já usada por outro pedido com a mesma chave
+        return False
+    finally:
+        db.close()
+
+
+def _resposta_salva(chave: str) -> Optional[Response]:
+    """
+    Resposta guardada para a chave (None se a chave é nova)
+
+    Uma chave pendente (gravação confirmada, resposta ainda não gravada) é
+    consultada de novo até ESPERA_PENDENTE; depois disso a resposta é 409.
+    """
+    limite = time.monotonic() + ESPERA_PENDENTE
+    while True:
+        db = SessionLocal()
+        try:
+            salva = db.get(RespostaIdempotenteDB, chave)
+        finally:
+            db.close()
+        if salva is None:
+            return None
+        if salva.metodo != request.method or salva.caminho != request.path:
+            return make_response(jsonify({
+                'success': False,
+                'error': f'{CABECALHO_IDEMPOTENCIA} já usada em outra requisição'
+            }), 422)
+        if salva.status != STATUS_PENDENTE:
+            resposta = Response(salva.corpo, status=salva.status, mimetype='application/json')
+            resposta.headers['Idempotent-Replayed'] = 'true'
+            return resposta
+        if time.monotonic() >= limite:
+            resposta = make_response(jsonify({
+                'success': False,
+                'error': f'Requisição com esta {CABECALHO_IDEMPOTENCIA} em andamento'
+            }), 409)
+            resposta.headers['Retry-After'] = '1'
+            return resposta
+        time.sleep(0.05)
+
+
+def idempotente(view):
+    """
+    Decorador de rotas de escrita com suporte a Idempotency-Key
+
+    Sem o cabeçalho a rota é executada normalmente. Com uma chave já vista
+    a resposta original é devolvida (com 'Idempotent-Replayed: true') sem
+    executar a rota; a chave usada em outro método/caminho é recusada com 422
+    e uma chave cuja resposta ainda não foi gravada, com 409.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        chave = request.headers.get(CABECALHO_IDEMPOTENCIA)
+        if not chave:
+            return view(*args, **kwargs)
+        if len(chave) > TAMANHO_MAXIMO_CHAVE:
+            return jsonify({'success': False, 'error': f'{CABECALHO_IDEMPOTENCIA} inválida'}), 400
+
+        salva = _resposta_salva(chave)
+        if salva is not None:
+            return salva
+
+        reserva = g.idempotencia = {'chave': chave, 'reservada': False, 'conflito': False}
+        try:
+            resposta = make_response(view(*args, **kwargs))
+        finally:
+            g.idempotencia = None
+        if reserva['conflito']:
+            # Um pedido simultâneo com a mesma chave gravou primeiro
+            return _resposta_salva(chave)
+        if reserva['reservada'] or resposta.status_code < 500:
+            if not _guardar_resposta(chave, resposta, reserva['reservada']):
+                return _resposta_salva(chave)
+        return resposta
+    return wrapper
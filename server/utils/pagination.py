@@ -0,0 +1,46 @@
+"""
+Funções auxiliares para paginação por cursor (keyset)
+"""
+
+import base64
+from typing import Optional
+
+# Tamanho máximo de página aceito nas rotas paginadas
+MAX_LIMIT = 1000
+
+
+def encode_cursor(ultimo_id: int) -> str:
+    """Gera o token opaco de cursor a partir do último ID retornado"""
+    return base64.urlsafe_b64encode(str(ultimo_id).encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodifica o token de cursor gerado por encode_cursor
+
+    Raises:
+        ValueError: Se o token for inválido
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(cursor + padding).decode('ascii'))
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+
+def parse_limit(valor: Optional[str]) -> Optional[int]:
+    """
+    Converte o parâmetro 'limit' da query string
+
+    Returns:
+        None se não informado, senão o limite entre 1 e MAX_LIMIT
+
+    Raises:
+        ValueError: Se o valor não for um inteiro positivo
+    """
+    if valor is None or valor == '':
+        return None
+    limite = int(valor)
+    if limite < 1:
+        raise ValueError("O parâmetro 'limit' deve ser positivo")
+    return min(limite, MAX_LIMIT)
@@ -0,0 +1,71 @@
+"""
+Funções auxiliares para leitura de parâmetros da query string
+"""
+
+from datetime import datetime, date, timedelta
+from typing import Optional, Tuple
+from shared.database import AgendamentoDB
+
+
+def parse_data(valor: str) -> date:
+    """
+    Converte parâmetro de data (AAAA-MM-DD ou ISO completo) para date
+
+    Raises:
+        ValueError: Se o valor não for uma data válida
+    """
+    try:
+        return datetime.fromisoformat(valor).date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Data inválida: '{valor}'. Use o formato AAAA-MM-DD")
+
+
+def parse_periodo(inicio: Optional[str], fim: Optional[str]) -> Tuple[datetime, datetime]:
+    """
+    Converte um período de datas inclusivo em limites para a consulta
+
+    Returns:
+        (início, fim exclusivo): meia-noite do primeiro dia e meia-noite do
+        dia seguinte ao último, para filtrar com >= início e < fim
+
+    Raises:
+        ValueError: Se alguma data estiver ausente ou inválida, ou se o fim for anterior ao início
+    """
+    if not inicio or not fim:
+        raise ValueError("Os parâmetros 'inicio' e 'fim' são obrigatórios")
+    data_inicio = parse_data(inicio)
+    data_fim = parse_data(fim)
+    if data_fim < data_inicio:
+        raise ValueError("A data final deve ser igual ou posterior à data inicial")
+    return (
+        datetime.combine(data_inicio, datetime.min.time()),
+        datetime.combine(data_fim + timedelta(days=1), datetime.min.time())
+    )
+
+
+def filtrar_agendamentos(query, args):
+    """
+    Aplica os filtros da query string à consulta de agendamentos
+    
+    Filtros suportados:
+        data_inicio, data_fim: intervalo (inclusivo) de data_agendamento
+        funcionario_id, cliente_id: IDs exatos
+        status: um status ou vários separados por vírgula
+    
+    Raises:
+        ValueError: Se alguma data ou ID for inválido
+    """
+    if args.get('data_inicio'):
+        inicio = parse_data(args['data_inicio'])
+        query = query.filter(AgendamentoDB.data_agendamento >= datetime.combine(inicio, datetime.min.time()))
+    if args.get('data_fim'):
+        fim = parse_data(args['data_fim']) + timedelta(days=1)
+        query = query.filter(AgendamentoDB.data_agendamento < datetime.combine(fim, datetime.min.time()))
+    if args.get('funcionario_id'):
+        query = query.filter(AgendamentoDB.funcionario_id == int(args['funcionario_id']))
+    if args.get('cliente_id'):
+        query = query.filter(AgendamentoDB.cliente_id == int(args['cliente_id']))
+    if args.get('status'):
+        status = [s.strip() for s in args['status'].split(',') if s.strip()]
+        query = query.filter(AgendamentoDB.status.in_(status))
+    return query
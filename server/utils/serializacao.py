@@ -0,0 +1,177 @@
+"""
+Serialização rápida das listagens
+
+As rotas de listagem não carregam objetos ORM: fazem um select() do Core
+apenas com as colunas expostas pela API e convertem cada tupla com uma
+função montada uma única vez por entidade (pares campo/conversor fixos,
+sem getattr nem decisões por célula). As datas são lidas como o texto gravado pelo
+SQLite e ajustadas para ISO 8601, evitando criar e formatar um datetime por
+célula; os valores DECIMAL são lidos como float, sem passar por Decimal.
+
+O resultado é idêntico ao de cliente_to_dict, agendamento_to_dict, etc.
+Quando o orjson está instalado ele é usado para gerar o JSON.
+
+Formato colunar (?format=columns): em vez de repetir os nomes dos campos
+em cada registro, a resposta traz os nomes uma vez em 'colunas' e cada
+registro como uma lista de valores em 'linhas', na mesma ordem. As datas
+vão como inteiros (microssegundos desde 1970-01-01, sem fuso, como estão
+gravadas) e os valores monetários como inteiros em centavos. As duas
+conversões são feitas pelo próprio SQLite na consulta, então as linhas
+saem do banco prontas para o JSON.
+"""
+
+import json
+from typing import Callable, Iterable, Optional, Sequence
+from flask import Response, request
+from sqlalchemy import Float, Integer, String, cast, func, select, type_coerce
+from sqlalchemy.sql import Select
+from shared.database import ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Valor do parâmetro 'format' que pede a resposta colunar
+FORMATO_COLUNAS = "columns"
+
+
+def _iso(valor):
+    """Converte o texto de data do SQLite ('AAAA-MM-DD HH:MM:SS.ffffff') para isoformat()"""
+    if valor is None:
+        return None
+    if valor.endswith('.000000'):
+        valor = valor[:-7]
+    return valor[:10] + 'T' + valor[11:]
+
+
+def dumps(obj) -> bytes:
+    """Serializa para JSON (UTF-8) com orjson, se instalado, ou com o módulo json"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def resposta_json(obj, status: int = 200) -> Response:
+    """Equivalente a jsonify(obj) usando o serializador rápido"""
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+def pede_colunas() -> bool:
+    """Indica se a requisição atual pediu o formato colunar (?format=columns)"""
+    return request.args.get('format') == FORMATO_COLUNAS
+
+
+def _epoca(coluna):
+    """Expressão SQLite: data gravada como texto -> microssegundos desde 1970-01-01"""
+    texto = type_coerce(coluna, String)
+    # strftime('%s') descarta a fração; os microssegundos vêm do texto ('...SS.ffffff')
+    return cast(func.strftime('%s', texto), Integer) * 1000000 + cast(func.substr(texto, 21), Integer)
+
+
+def _centavos(coluna):
+    """Expressão SQLite: valor monetário -> inteiro em centavos"""
+    return cast(func.round(type_coerce(coluna, Float) * 100), Integer)
+
+
+def _conversor_dict(campos: Sequence[str], conversores: Sequence[Optional[Callable]]) -> Callable[[tuple], dict]:
+    """
+    Função que converte uma linha da consulta em dicionário
+
+    Args:
+        campos: Nome de cada coluna, na ordem da consulta
+        conversores: Conversor de cada coluna (None mantém o valor)
+    """
+    pares = tuple(zip(campos, conversores))
+
+    def para_dict(linha) -> dict:
+        return {campo: valor if conversor is None else conversor(valor)
+                for (campo, conversor), valor in zip(pares, linha)}
+    return para_dict
+
+
+class Serializador:
+    """
+    Consulta e conversão de uma entidade para a API sem objetos ORM
+
+    Args:
+        model: Classe do modelo
+        campos: Colunas expostas pela API, na ordem da resposta
+        datas: Campos DateTime (enviados em ISO 8601)
+        decimais: Campos DECIMAL (enviados como float)
+        centavos: Campos monetários (enviados em centavos no formato colunar)
+    """
+
+    def __init__(self, model, campos: Sequence[str], datas: Sequence[str] = (), decimais: Sequence[str] = (),
+                 centavos: Sequence[str] = ()):
+        self.model = model
+        self.campos = tuple(campos)
+        colunas = []
+        colunas_compactas = []
+        conversores = []
+        for campo in self.campos:
+            coluna = getattr(model, campo)
+            if campo in datas:
+                colunas_compactas.append(_epoca(coluna).label(campo))
+            elif campo in centavos:
+                colunas_compactas.append(_centavos(coluna).label(campo))
+            else:
+                colunas_compactas.append(coluna)
+
+            if campo in datas:
+                coluna = type_coerce(coluna, String).label(campo)
+                conversores.append(_iso)
+            elif campo in decimais:
+                coluna = type_coerce(coluna, Float).label(campo)
+                conversores.append(float)
+            else:
+                conversores.append(None)
+            colunas.append(coluna)
+        self._colunas = colunas
+        self._colunas_compactas = colunas_compactas
+        self.para_dict: Callable[[tuple], dict] = _conversor_dict(self.campos, tuple(conversores))
+
+    def select(self, colunar: bool = False) -> Select:
+        """
+        Consulta base com as colunas da API (aceita .filter/.where/.order_by)
+
+        Args:
+            colunar: Seleciona as datas em microssegundos e os valores
+                monetários em centavos (formato colunar)
+        """
+        return select(*(self._colunas_compactas if colunar else self._colunas))
+
+    def converter(self, linhas: Iterable[tuple]) -> list:
+        """Converte as linhas de uma consulta em lista de dicionários"""
+        para_dict = self.para_dict
+        return [para_dict(linha) for linha in linhas]
+
+    def tabela(self, linhas: Iterable[tuple]) -> dict:
+        """
+        Monta a resposta colunar a partir das linhas de select(colunar=True)
+
+        Returns:
+            {'colunas': [nomes dos campos], 'linhas': [[valores], ...]}
+        """
+        return {'colunas': list(self.campos), 'linhas': [tuple(linha) for linha in linhas]}
+
+
+cliente_serializador = Serializador(
+    ClienteDB, ('id', 'nome', 'telefone', 'email', 'data_cadastro', 'observacoes', 'ativo'),
+    datas=('data_cadastro',)
+)
+funcionario_serializador = Serializador(
+    FuncionarioDB, ('id', 'nome', 'telefone', 'email', 'cargo', 'data_admissao', 'salario', 'ativo'),
+    datas=('data_admissao',), centavos=('salario',)
+)
+servico_serializador = Serializador(
+    ServicoDB, ('id', 'nome', 'descricao', 'preco', 'duracao_minutos', 'ativo'),
+    decimais=('preco',), centavos=('preco',)
+)
+agendamento_serializador = Serializador(
+    AgendamentoDB,
+    ('id', 'cliente_id', 'funcionario_id', 'servico_id', 'data_agendamento',
+     'horario_inicio', 'horario_fim', 'status', 'observacoes', 'valor_total'),
+    datas=('data_agendamento', 'horario_inicio', 'horario_fim'),
+    decimais=('valor_total',), centavos=('valor_total',)
+)
@@ -0,0 +1,64 @@
+"""
+Respostas em streaming (NDJSON) para as listagens grandes
+
+Em vez de montar a lista inteira de objetos, de dicionários e a string JSON
+final, os registros são lidos do banco em blocos (yield_per) e cada linha
+é enviada assim que é convertida. A memória usada não cresce com a tabela.
+
+Formato (application/x-ndjson): um objeto JSON por linha. Nas consultas
+incrementais (?since=) a primeira linha é o cabeçalho
+{"versao": ..., "excluidos": [...]} e as seguintes são os registros.
+No formato colunar (?format=columns) o cabeçalho é sempre enviado e traz
+também "colunas"; cada linha seguinte é a lista de valores de um registro.
+"""
+
+from typing import Optional
+from flask import Response, request, stream_with_context
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from .serializacao import Serializador, dumps
+
+MIME_NDJSON = "application/x-ndjson"
+
+# Registros lidos do banco (e linhas enviadas) por bloco
+YIELD_PER = 500
+
+
+def aceita_ndjson() -> bool:
+    """Indica se a requisição atual pediu a resposta em NDJSON (cabeçalho Accept)"""
+    return request.accept_mimetypes.best_match(["application/json", MIME_NDJSON]) == MIME_NDJSON
+
+
+def resposta_ndjson(db: Session, consulta: Select, serializador: Serializador,
+                    cabecalho: Optional[dict] = None, colunar: bool = False) -> Response:
+    """
+    Cria a resposta que transmite os registros da consulta em NDJSON
+
+    A consulta só é executada durante o envio da resposta. A rota pode
+    fechar a sessão normalmente ao retornar: isso só devolve a conexão ao
+    pool, e a consulta roda em uma nova transação que é encerrada ao fim
+    do envio (ou se o cliente desconectar).
+
+    Args:
+        db: Sessão do banco de dados (fechada ao fim do envio)
+        consulta: Consulta dos registros, montada a partir de serializador.select()
+        serializador: Serializador da entidade
+        cabecalho: Objeto enviado na primeira linha (ex: versão e excluídos)
+        colunar: Consulta montada com select(colunar=True); envia as linhas
+            como listas, com os nomes das colunas no cabeçalho
+    """
+    para_dict = tuple if colunar else serializador.para_dict
+    if colunar:
+        cabecalho = {**(cabecalho or {}), 'colunas': list(serializador.campos)}
+
+    def gerar():
+        try:
+            if cabecalho is not None:
+                yield dumps(cabecalho) + b"\n"
+            resultado = db.execute(consulta.execution_options(yield_per=YIELD_PER))
+            for linhas in resultado.partitions():
+                yield b"".join(dumps(para_dict(linha)) + b"\n" for linha in linhas)
+        finally:
+            db.close()
+
+    return Response(stream_with_context(gerar()), mimetype=MIME_NDJSON)
@@ -0,0 +1,72 @@
+"""
+Gravação em lote (upsert) com custo proporcional ao tamanho do lote
+"""
+
+from typing import Callable, List, Optional
+from sqlalchemy import select, update, insert
+from sqlalchemy.orm import Session
+from .versoes import proxima_versao
+
+# Quantidade máxima de IDs por cláusula IN (limite de variáveis do SQLite)
+IN_CHUNK_SIZE = 500
+
+
+def upsert_em_lote(db: Session, model, registros: List[dict],
+                   to_values: Callable[[dict], dict]) -> List[Optional[int]]:
+    """
+    Atualiza os registros cujo ID já existe e insere os demais
+    
+    Os IDs existentes são obtidos com uma única consulta IN por bloco de
+    IN_CHUNK_SIZE registros; atualizações e inserções são enviadas em lote.
+    O custo não depende do tamanho da tabela. Todos os registros gravados
+    recebem a mesma nova versão da tabela.
+    
+    Args:
+        db: Sessão do banco de dados
+        model: Classe do modelo (ClienteDB, FuncionarioDB, ...)
+        registros: Dicionários recebidos pela API
+        to_values: Função que converte um dicionário em valores de colunas
+    
+    Returns:
+        IDs finais de cada registro, na mesma ordem de registros
+    
+    Raises:
+        ValueError: Se registros não for uma lista de objetos ou se to_values
+            rejeitar algum registro
+    """
+    if not isinstance(registros, list) or not all(isinstance(r, dict) for r in registros):
+        raise ValueError("O lote deve ser uma lista de objetos JSON")
+    if not registros:
+        return []
+    
+    versao = proxima_versao(db, model.__tablename__)
+    ids_recebidos = [r['id'] for r in registros if r.get('id')]
+    existentes = set()
+    for i in range(0, len(ids_recebidos), IN_CHUNK_SIZE):
+        bloco = ids_recebidos[i:i + IN_CHUNK_SIZE]
+        existentes.update(db.scalars(select(model.id).where(model.id.in_(bloco))))
+    
+    ids_finais: List[Optional[int]] = [None] * len(registros)
+    atualizacoes = []
+    novos = []
+    for indice, registro in enumerate(registros):
+        valores = to_values(registro)
+        valores['versao'] = versao
+        if registro.get('id') and registro['id'] in existentes:
+            atualizacoes.append({'id': registro['id'], **valores})
+            ids_finais[indice] = registro['id']
+        else:
+            novos.append((indice, valores))
+    
+    if atualizacoes:
+        db.execute(update(model), atualizacoes)
+    
+    if novos:
+        ids_novos = db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [valores for _, valores in novos]
+        ).all()
+        for (indice, _), novo_id in zip(novos, ids_novos):
+            ids_finais[indice] = novo_id
+    
+    return ids_finais
@@ -2,11 +2,12 @@
 Modelos e configuração de banco de dados compartilhados
 """
 
-from .database import Base, engine, SessionLocal, init_db
-from .models import ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB
+from .database import Base, engine, SessionLocal, init_db, iniciar_escrita
+from .models import ClienteDB, FuncionarioDB, ServicoDB, AgendamentoDB, VersaoTabelaDB, ExclusaoDB, RespostaIdempotenteDB
 
 __all__ = [
-    'Base', 'engine', 'SessionLocal', 'init_db',
-    'ClienteDB', 'FuncionarioDB', 'ServicoDB', 'AgendamentoDB'
+    'Base', 'engine', 'SessionLocal', 'init_db', 'iniciar_escrita',
+    'ClienteDB', 'FuncionarioDB', 'ServicoDB', 'AgendamentoDB',
+    'VersaoTabelaDB', 'ExclusaoDB', 'RespostaIdempotenteDB'
 ]
 
@@ -3,9 +3,10 @@ Configuração do Banco de Dados
 Usa SQLite para armazenamento local dos dados
 """
 
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, SingletonThreadPool, StaticPool
 from pathlib import Path
 
 # Base para os modelos
@@ -19,20 +20,111 @@ DB_PATH = DB_DIR / "barbearia.db"
 # String de conexão SQLite
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# Configuração do engine (pode ser alterada por variáveis de ambiente)
+#   BARBEARIA_DB_POOL: 'queue' (pool de conexões, padrão), 'thread' (uma conexão
+#       por thread) ou 'static' (uma única conexão compartilhada, modo antigo)
+DB_POOL = os.environ.get("BARBEARIA_DB_POOL", "queue").lower()
+DB_POOL_SIZE = int(os.environ.get("BARBEARIA_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("BARBEARIA_DB_MAX_OVERFLOW", "10"))
+# WAL permite leituras simultâneas a uma escrita em andamento
+DB_JOURNAL_MODE = os.environ.get("BARBEARIA_DB_JOURNAL_MODE", "WAL").upper()
+DB_SYNCHRONOUS = os.environ.get("BARBEARIA_DB_SYNCHRONOUS", "NORMAL").upper()
+# Tempo (ms) que uma conexão espera pelo lock de escrita antes de falhar
+DB_BUSY_TIMEOUT = int(os.environ.get("BARBEARIA_DB_BUSY_TIMEOUT", "5000"))
+DB_MMAP_SIZE = int(os.environ.get("BARBEARIA_DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+# Valor negativo = tamanho em KiB (padrão do SQLite para cache_size)
+DB_CACHE_SIZE = int(os.environ.get("BARBEARIA_DB_CACHE_SIZE", "-16000"))
+
+
+def _criar_engine():
+    """Cria o engine de acordo com o modo de pool configurado"""
+    # check_same_thread=False: a conexão volta ao pool e pode ser usada
+    # depois por outra thread (nunca por duas ao mesmo tempo)
+    connect_args = {"check_same_thread": False, "timeout": DB_BUSY_TIMEOUT / 1000}
+    if DB_POOL == "static":
+        return create_engine(DATABASE_URL, connect_args=connect_args, poolclass=StaticPool, echo=False)
+    if DB_POOL == "thread":
+        return create_engine(DATABASE_URL, connect_args=connect_args, poolclass=SingletonThreadPool,
+                             pool_size=DB_POOL_SIZE, echo=False)
+    if DB_POOL == "queue":
+        return create_engine(DATABASE_URL, connect_args=connect_args, poolclass=QueuePool,
+                             pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, echo=False)
+    raise ValueError(f"BARBEARIA_DB_POOL inválido: '{DB_POOL}' (use 'queue', 'thread' ou 'static')")
+
+
 # Engine do banco de dados
-# Usa StaticPool para SQLite com check_same_thread=False para permitir threads
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-    echo=False
-)
+engine = _criar_engine()
+
+
+@event.listens_for(engine, "connect")
+def _configurar_conexao(dbapi_connection, connection_record):
+    """Aplica os PRAGMAs de desempenho em cada nova conexão SQLite"""
+    # Desliga o BEGIN implícito do pysqlite: as transações passam a ser
+    # iniciadas pelo evento "begin" abaixo, que permite BEGIN IMMEDIATE
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={DB_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={DB_CACHE_SIZE}")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def _iniciar_transacao(conn):
+    """Inicia a transação; com a opção sqlite_immediate usa BEGIN IMMEDIATE"""
+    if conn.get_execution_options().get("sqlite_immediate"):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        conn.exec_driver_sql("BEGIN")
+
+
+def iniciar_escrita(db):
+    """
+    Inicia a transação da sessão com BEGIN IMMEDIATE
+    
+    O lock de escrita é obtido já no início (esperando até busy_timeout se
+    outro processo estiver escrevendo), então as leituras feitas dentro da
+    transação continuam válidas até o commit. Deve ser chamada antes de
+    qualquer outro comando na sessão.
+    """
+    db.connection(execution_options={"sqlite_immediate": True})
+
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Colunas adicionadas após a criação das tabelas: (tabela, coluna, definição SQL)
+COLUNAS_ADICIONADAS = [
+    ("clientes", "versao", "INTEGER NOT NULL DEFAULT 0"),
+    ("funcionarios", "versao", "INTEGER NOT NULL DEFAULT 0"),
+    ("servicos", "versao", "INTEGER NOT NULL DEFAULT 0"),
+    ("agendamentos", "versao", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def _migrar_colunas():
+    """Adiciona em bancos existentes as colunas que create_all não altera (idempotente)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for tabela, coluna, definicao in COLUNAS_ADICIONADAS:
+            existentes = {c['name'] for c in inspector.get_columns(tabela)}
+            if coluna not in existentes:
+                conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}"))
+
+
+def _criar_indices():
+    """Cria em bancos existentes os índices declarados nos modelos (idempotente)"""
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(bind=engine, checkfirst=True)
+
+
 def init_db():
     """Inicializa o banco de dados criando todas as tabelas"""
     from . import models  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    _migrar_colunas()
+    _criar_indices()
 
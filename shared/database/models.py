@@ -2,7 +2,7 @@
 Modelos de Banco de Dados usando SQLAlchemy
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, DECIMAL
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -11,6 +11,11 @@ from .database import Base
 class ClienteDB(Base):
     """Modelo de banco de dados para Cliente"""
     __tablename__ = "clientes"
+    __table_args__ = (
+        Index("ix_clientes_ativo", "ativo"),
+        Index("ix_clientes_nome", "nome"),
+        Index("ix_clientes_versao", "versao"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(255), nullable=False)
@@ -19,11 +24,17 @@ class ClienteDB(Base):
     data_cadastro = Column(DateTime, nullable=False, default=datetime.now)
     observacoes = Column(Text, nullable=False, default="")
     ativo = Column(Boolean, nullable=False, default=True)
+    versao = Column(Integer, nullable=False, default=0)
 
 
 class FuncionarioDB(Base):
     """Modelo de banco de dados para Funcionario"""
     __tablename__ = "funcionarios"
+    __table_args__ = (
+        Index("ix_funcionarios_ativo", "ativo"),
+        Index("ix_funcionarios_nome", "nome"),
+        Index("ix_funcionarios_versao", "versao"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(255), nullable=False)
@@ -33,11 +44,17 @@ class FuncionarioDB(Base):
     data_admissao = Column(DateTime, nullable=False, default=datetime.now)
     salario = Column(Float, nullable=False, default=0.0)
     ativo = Column(Boolean, nullable=False, default=True)
+    versao = Column(Integer, nullable=False, default=0)
 
 
 class ServicoDB(Base):
     """Modelo de banco de dados para Servico"""
     __tablename__ = "servicos"
+    __table_args__ = (
+        Index("ix_servicos_ativo", "ativo"),
+        Index("ix_servicos_nome", "nome"),
+        Index("ix_servicos_versao", "versao"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(255), nullable=False)
@@ -45,11 +62,24 @@ class ServicoDB(Base):
     preco = Column(DECIMAL(10, 2), nullable=False, default=0.00)
     duracao_minutos = Column(Integer, nullable=False, default=30)
     ativo = Column(Boolean, nullable=False, default=True)
+    versao = Column(Integer, nullable=False, default=0)
 
 
 class AgendamentoDB(Base):
     """Modelo de banco de dados para Agendamento"""
     __tablename__ = "agendamentos"
+    __table_args__ = (
+        # Agenda de um funcionário em um dia/período
+        Index("ix_agendamentos_funcionario_data", "funcionario_id", "data_agendamento"),
+        # Verificação de conflito de horário ao gravar
+        Index("ix_agendamentos_funcionario_horario", "funcionario_id", "horario_inicio"),
+        # Relatórios por status em um período (ex: concluídos no mês)
+        Index("ix_agendamentos_status_data", "status", "data_agendamento"),
+        Index("ix_agendamentos_cliente", "cliente_id"),
+        # Filtro só por período (tela de agendamentos)
+        Index("ix_agendamentos_data", "data_agendamento"),
+        Index("ix_agendamentos_versao", "versao"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
@@ -61,9 +91,45 @@ class AgendamentoDB(Base):
     status = Column(String(50), nullable=False, default="agendado")
     observacoes = Column(Text, nullable=False, default="")
     valor_total = Column(DECIMAL(10, 2), nullable=False, default=0.00)
+    versao = Column(Integer, nullable=False, default=0)
     
     # Relacionamentos
     cliente = relationship("ClienteDB", foreign_keys=[cliente_id])
     funcionario = relationship("FuncionarioDB", foreign_keys=[funcionario_id])
     servico = relationship("ServicoDB", foreign_keys=[servico_id])
 
+
+class VersaoTabelaDB(Base):
+    """Contador monotônico de versão por tabela, incrementado a cada escrita"""
+    __tablename__ = "versoes"
+    
+    tabela = Column(String(50), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+
+
+class ExclusaoDB(Base):
+    """Registro de exclusão (tombstone) usado na sincronização incremental"""
+    __tablename__ = "exclusoes"
+    __table_args__ = (
+        Index("ix_exclusoes_tabela_versao", "tabela", "versao"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tabela = Column(String(50), nullable=False)
+    registro_id = Column(Integer, nullable=False)
+    versao = Column(Integer, nullable=False)
+
+
+class RespostaIdempotenteDB(Base):
+    """Resposta já enviada a uma requisição com Idempotency-Key (reenvios do cliente)"""
+    __tablename__ = "respostas_idempotentes"
+    __table_args__ = (
+        Index("ix_respostas_idempotentes_criado_em", "criado_em"),
+    )
+    
+    chave = Column(String(64), primary_key=True)
+    metodo = Column(String(10), nullable=False)
+    caminho = Column(String(200), nullable=False)
+    status = Column(Integer, nullable=False)
+    corpo = Column(Text, nullable=False)
+    criado_em = Column(DateTime, nullable=False, default=datetime.now)
@@ -0,0 +1,57 @@
+"""
+Cache local do cliente: gravação registro a registro
+"""
+
+import json
+import sqlite3
+from client.repositories.cache_local import CacheLocal
+
+SERVIDOR = "http://127.0.0.1:9"
+
+
+def _clientes(*ids):
+    return [{'id': i, 'nome': f"Cliente {i}", 'ativo': True} for i in ids]
+
+
+def test_atualizar_colecao_grava_so_os_registros_alterados(tmp_path):
+    cache = CacheLocal(str(tmp_path / 'cache.db'), SERVIDOR)
+    cache.salvar_colecao('clientes', 1, 'etag-1', _clientes(1, 2, 3))
+
+    alterado = {'id': 2, 'nome': 'Outro nome', 'ativo': True}
+    cache.atualizar_colecao('clientes', 2, 'etag-2', [alterado] + _clientes(-1), removidos=[3])
+
+    versao, etag, registros = cache.carregar()['clientes']
+    assert (versao, etag) == (2, 'etag-2')
+    # O registro alterado continua na mesma posição; o novo vai para o fim
+    assert registros == _clientes(1) + [alterado] + _clientes(-1)
+
+
+def test_salvar_colecao_substitui_os_registros(tmp_path):
+    cache = CacheLocal(str(tmp_path / 'cache.db'), SERVIDOR)
+    cache.salvar_colecao('clientes', 1, None, _clientes(1, 2, 3))
+    cache.salvar_colecao('clientes', 5, None, _clientes(4))
+
+    assert cache.carregar()['clientes'] == (5, None, _clientes(4))
+
+
+def test_arquivo_antigo_com_a_colecao_em_uma_lista(tmp_path):
+    caminho = str(tmp_path / 'cache.db')
+    conn = sqlite3.connect(caminho)
+    conn.execute(
+        "CREATE TABLE colecoes (servidor TEXT NOT NULL, chave TEXT NOT NULL,"
+        " versao INTEGER NOT NULL DEFAULT 0, etag TEXT, dados TEXT NOT NULL,"
+        " atualizado_em TEXT NOT NULL, PRIMARY KEY (servidor, chave))"
+    )
+    conn.execute("INSERT INTO colecoes VALUES (?, ?, ?, ?, ?, ?)",
+                 (SERVIDOR, 'clientes', 3, 'etag', json.dumps(_clientes(1, 2)), ''))
+    conn.execute("INSERT INTO colecoes VALUES (?, ?, ?, ?, ?, ?)",
+                 (SERVIDOR, 'dashboard', 0, None, json.dumps({'total': 1}), ''))
+    conn.commit()
+    conn.close()
+
+    cache = CacheLocal(caminho, SERVIDOR)
+    cache.atualizar_colecao('clientes', 4, 'etag', _clientes(3))
+
+    carregado = cache.carregar()
+    assert carregado['clientes'] == (4, 'etag', _clientes(1, 2, 3))
+    assert carregado['dashboard'] == (0, None, {'total': 1})
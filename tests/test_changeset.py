@@ -0,0 +1,77 @@
+"""
+Envio só do que mudou: ChangeSet e save_* com rastreamento de alterações
+"""
+
+import pytest
+from client.models import Cliente
+from client.repositories.api_client import ApiClient
+from client.repositories.changeset import ChangeSet
+from client.repositories.colecao import ColecaoIndexada
+
+# Endereço sem servidor: as gravações permanecem na outbox
+SERVER_URL = "http://127.0.0.1:9"
+
+REGISTROS = 5000
+
+
+def _clientes(quantidade: int) -> ColecaoIndexada:
+    """Clientes como recebidos do servidor (rastreamento ligado)"""
+    return ColecaoIndexada(
+        Cliente.from_dict({
+            'id': i, 'nome': f"Cliente {i}", 'telefone': '(11) 99999-0000',
+            'email': f"cliente{i}@exemplo.com", 'data_cadastro': '2025-01-01T08:00:00',
+            'observacoes': '', 'ativo': True
+        }).rastrear()
+        for i in range(1, quantidade + 1)
+    )
+
+
+@pytest.fixture
+def api():
+    api = ApiClient(server_url=SERVER_URL, tentativas=0)
+    yield api
+    api.encerrar()
+
+
+def test_editar_um_de_5000_envia_um_patch_so_com_o_campo_alterado(api):
+    clientes = _clientes(REGISTROS)
+    api._clientes = clientes
+    alterado = clientes[REGISTROS // 2]
+    alterado.telefone = '(11) 91234-5678'
+
+    api.save_clientes(clientes)
+
+    pendencias = api._outbox.pendentes('clientes')
+    assert [(p.metodo, p.registro_id, p.dados) for p in pendencias] == [
+        ('PATCH', alterado.id, {'telefone': '(11) 91234-5678'})
+    ]
+
+
+def test_salvar_sem_alteracoes_nao_envia_nada(api):
+    clientes = _clientes(REGISTROS)
+    api._clientes = clientes
+
+    api.save_clientes(clientes)
+
+    assert api._outbox.pendentes('clientes') == []
+
+
+def test_changeset_separa_novos_e_alterados():
+    clientes = _clientes(3)
+    clientes[0].nome = 'Outro nome'
+    novo = Cliente(nome='Novo')
+
+    alteracoes = ChangeSet('clientes', list(clientes) + [novo])
+
+    assert alteracoes.novos == [novo]
+    assert alteracoes.alterados == [(clientes[0], ['nome'])]
+    assert len(alteracoes) == 2
+
+
+def test_atribuir_o_mesmo_valor_nao_conta_como_alteracao():
+    cliente = _clientes(1)[0]
+    cliente.telefone = cliente.telefone
+    cliente.id = 99
+
+    assert not cliente.modificado
+    assert ChangeSet('clientes', [cliente]).vazio